@@ -0,0 +1,179 @@
+# src/pipeline/batch_runner.py
+import os
+import json
+import time
+from glob import glob
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from .orchestrator import run_pipeline, load_pipeline_rules, REPORTS_DIR
+
+# -------------------------
+# Input discovery
+# -------------------------
+def collect_inputs(targets, pattern="*.csv"):
+    """
+    Expand directories (matched against `pattern`), globs and plain file
+    paths into a sorted, de-duplicated list of absolute CSV paths.
+    """
+    paths = set()
+    for target in targets:
+        if os.path.isdir(target):
+            paths.update(glob(os.path.join(target, pattern)))
+        elif any(ch in target for ch in "*?["):
+            paths.update(glob(target, recursive=True))
+        elif os.path.exists(target):
+            paths.add(target)
+    return sorted(os.path.abspath(p) for p in paths if os.path.isfile(p))
+
+# -------------------------
+# Worker side
+# -------------------------
+def _init_worker(rules_path):
+    """
+    Runs once per worker process: the heavy imports (pandas, sklearn) already
+    happened when this module was unpickled, and loading the rules here warms
+    the orchestrator's rules cache. Models are cached per worker on first use.
+    """
+    try:
+        load_pipeline_rules("", rules_path)
+    except FileNotFoundError:
+        pass
+
+def _run_one(path, rules_path, chunksize, n_jobs):
+    started = time.perf_counter()
+    try:
+        result = run_pipeline(path, rules_path=rules_path, chunksize=chunksize, n_jobs=n_jobs)
+        status, error = "ok", None
+    except Exception as exc:
+        result, status, error = {}, "failed", f"{type(exc).__name__}: {exc}"
+    report = result.get("report") or {}
+    gates = report.get("gates") or {}
+    if not gates.get("passed", True):
+        # outputs were written, but the file did not meet the quality gates
+        status, error = "gate_failed", f"Quality gates failed: {'; '.join(gates['failures'])}"
+    return {
+        "input_path": path,
+        "status": status,
+        "error": error,
+        "seconds": round(time.perf_counter() - started, 3),
+        "total_records": report.get("total_records", 0),
+        "cleaned_records": report.get("cleaned_records", 0),
+        "quarantined_records": report.get("quarantined_records", 0),
+        "pass_rate_pct": report.get("pass_rate_pct"),
+        "clean_path": result.get("clean_path"),
+        "quarantine_path": result.get("quarantine_path"),
+        "report_path": result.get("report_path"),
+    }
+
+def _failed(path, exc):
+    """Result entry for a file whose run never returned (its worker died, or the result was lost)."""
+    return {"input_path": path, "status": "failed", "error": f"{type(exc).__name__}: {exc}",
+            "seconds": None, "total_records": 0, "cleaned_records": 0, "quarantined_records": 0,
+            "pass_rate_pct": None, "clean_path": None, "quarantine_path": None, "report_path": None}
+
+def _run_pool(paths, workers, rules_path, chunksize):
+    """
+    Run the files on a process pool. A worker that dies takes the whole pool
+    down (BrokenProcessPool on every unfinished future), so those files are
+    rerun on a fresh single-worker pool, which runs them in order: the first
+    one to break it again is the culprit and is recorded as failed, and the
+    rest go back to a full pool.
+    """
+    files, pending, isolate = [], list(paths), False
+    while pending:
+        broken = {}
+        # one process per core already: keep IsolationForest single-threaded inside each
+        with ProcessPoolExecutor(max_workers=1 if isolate else workers, initializer=_init_worker,
+                                 initargs=(rules_path,)) as pool:
+            futures = {pool.submit(_run_one, p, rules_path, chunksize, 1): p for p in pending}
+            for future in as_completed(futures):
+                try:
+                    files.append(future.result())
+                except BrokenProcessPool as exc:
+                    broken[futures[future]] = exc
+                except Exception as exc:
+                    files.append(_failed(futures[future], exc))
+        broken_paths = [p for p in pending if p in broken]  # submission order
+        if not broken_paths:
+            break
+        if isolate or len(broken_paths) == 1:
+            culprit = broken_paths[0]
+            files.append(_failed(culprit, broken[culprit]))
+            pending, isolate = broken_paths[1:], False
+        else:
+            pending, isolate = broken_paths, True
+    return files
+
+# -------------------------
+# Batch entry point
+# -------------------------
+def summarize(files, started_at, seconds):
+    """
+    Consolidated batch summary. Files that ran but failed a quality gate
+    count in the record totals and under `gate_failed`, not `succeeded`.
+    """
+    ran = [f for f in files if f["status"] in ("ok", "gate_failed")]
+    total = sum(f["total_records"] for f in ran)
+    cleaned = sum(f["cleaned_records"] for f in ran)
+    return {
+        "timestamp": started_at,
+        "seconds": round(seconds, 3),
+        "files": len(files),
+        "succeeded": sum(f["status"] == "ok" for f in files),
+        "gate_failed": sum(f["status"] == "gate_failed" for f in files),
+        "failed": len(files) - len(ran),
+        "total_records": total,
+        "cleaned_records": cleaned,
+        "quarantined_records": sum(f["quarantined_records"] for f in ran),
+        "pass_rate_pct": round(cleaned / total * 100, 2) if total > 0 else 0.0,
+        "failures": [{"input_path": f["input_path"], "error": f["error"]} for f in files if f["status"] != "ok"],
+        "results": files,
+    }
+
+def run_batch(targets, workers=None, rules_path=None, chunksize=None, pattern="*.csv",
+              output_dir=REPORTS_DIR):
+    """
+    Run the pipeline over every CSV found in `targets` (directories, globs or
+    files) on a pool of `workers` processes (default: CPU count). A failing
+    file is recorded in the summary instead of stopping the batch. The
+    consolidated summary is written to <output_dir>/batch_<ts>.json.
+    Returns (summary, summary_path).
+    """
+    if isinstance(targets, str):
+        targets = [targets]
+    paths = collect_inputs(targets, pattern)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths) or 1))
+
+    started_at = datetime.utcnow().isoformat()
+    t0 = time.perf_counter()
+    files = []
+    if workers == 1:
+        files = [_run_one(p, rules_path, chunksize, None) for p in paths]
+    else:
+        files = _run_pool(paths, workers, rules_path, chunksize)
+        files.sort(key=lambda f: f["input_path"])
+
+    summary = summarize(files, started_at, time.perf_counter() - t0)
+    os.makedirs(output_dir, exist_ok=True)
+    summary_path = os.path.join(output_dir, f"batch_{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.json")
+    with open(summary_path, "w") as f:
+        json.dump(summary, f, indent=2)
+    return summary, summary_path
+
+# CLI helper
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the data quality pipeline over many CSV files")
+    parser.add_argument("targets", nargs="+", help="directories, globs or CSV files")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--rules", default=None, help="optional rules override YAML")
+    parser.add_argument("--chunksize", type=int, default=None, help="stream each file in chunks of N rows")
+    parser.add_argument("--pattern", default="*.csv", help="file pattern inside directories")
+    args = parser.parse_args()
+    summary, summary_path = run_batch(args.targets, workers=args.workers, rules_path=args.rules,
+                                      chunksize=args.chunksize, pattern=args.pattern)
+    print(f"{summary['succeeded']}/{summary['files']} files succeeded, summary: {summary_path}")
+    if summary["failed"] or summary["gate_failed"]:
+        raise SystemExit(f"{summary['failed']} file(s) failed, {summary['gate_failed']} failed quality gates")
@@ -0,0 +1,190 @@
+# src/pipeline/benchmark.py
+import os
+import sys
+import json
+import time
+import platform
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+import yaml
+
+from .orchestrator import run_pipeline, BASE_DIR
+from .sample_data_generator import write_customers, write_orders, COUNTRIES, STATUSES
+
+BENCH_DIR = os.path.join(BASE_DIR, "data", "benchmarks")
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+BENCH_DEFECTS = {
+    "null_rate": 0.02,
+    "out_of_range_rate": 0.01,
+    "bad_regex_rate": 0.01,
+    "duplicate_rate": 0.01,
+    "near_duplicate_rate": 0.01,
+    "outlier_rate": 0.005,
+}
+# Column rules the injected defects violate (out-of-range and outlier values,
+# malformed emails, unknown statuses), and near-duplicate detection blocked on
+# the id a near-duplicate copy keeps: every defect kind takes its real path.
+BENCH_RULES = {
+    "customers": {
+        "columns": {
+            "age": {"type": "numeric", "min": 18, "max": 90},
+            "email": {"type": "string", "regex": r"[a-z]\.[a-z]+@example\.com"},
+            "country": {"type": "categorical", "allowed_values": COUNTRIES.tolist()},
+        },
+        "dedup": {"near": {"columns": ["first_name", "last_name", "email"], "block_on": ["customer_id"]}},
+    },
+    "orders": {
+        "columns": {
+            "total_amount": {"type": "numeric", "min": 0, "max": 500},
+            "status": {"type": "categorical", "allowed_values": STATUSES.tolist()},
+            "order_date": {"type": "datetime", "format": "%Y-%m-%d"},
+        },
+        "dedup": {"near": {"columns": ["ship_city"], "block_on": ["order_id"]}},
+    },
+}
+
+def _write_input(kind, rows, out_dir, seed=42):
+    path = os.path.join(out_dir, f"bench_{kind}_{rows}.csv")
+    if not os.path.exists(path):
+        if kind == "customers":
+            write_customers(rows, path, seed=seed, defects=BENCH_DEFECTS)
+        else:
+            write_orders(rows, max(rows // 10, 1), path, seed=seed, defects=BENCH_DEFECTS)
+    return path
+
+def _bench_rules(out_dir, kind, profile_memory):
+    """
+    Rules override for benchmark runs: the dataset's BENCH_RULES, result
+    cache off and the stage profiler in the given memory mode ("off" for the
+    timing pass, so memory probes do not distort it; "tracemalloc" for the
+    memory pass).
+    """
+    path = os.path.join(out_dir, f"bench_rules_{kind}_{profile_memory}.yml")
+    rules = dict(BENCH_RULES.get(kind, {}), pipeline={"result_cache": False, "profile_memory": profile_memory})
+    with open(path, "w") as f:
+        yaml.safe_dump(rules, f)
+    return path
+
+def bench_run(path, out_dir, chunksize=None, trace_memory=False, kind=None):
+    """
+    One run_pipeline on `path` -> (stages, end_to_end). Per-stage metrics are
+    the `stages` section of the run's own report, so every stage the pipeline
+    has is measured exactly as it runs. The run writes into a scratch data
+    directory (outputs, history, drift baselines, a fresh model store) that
+    is removed afterwards, never into the project's data/. `kind` picks the
+    BENCH_RULES entry (none: pipeline defaults only).
+    """
+    rules_path = _bench_rules(out_dir, kind, "tracemalloc" if trace_memory else "off")
+    with tempfile.TemporaryDirectory(dir=out_dir, prefix="run_") as data_dir:
+        wall, cpu = time.perf_counter(), time.process_time()
+        result = run_pipeline(path, rules_path=rules_path, chunksize=chunksize, use_cache=False,
+                              data_dir=data_dir)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+    rows = result["report"].get("total_records", 0)
+    if trace_memory:
+        stages = {name: {"peak_mb": m["peak_mb_delta"]} for name, m in result["stages"].items()}
+        # the profiler resets the tracemalloc peak per stage: the run's peak is its largest stage's
+        peaks = [m["peak_mb"] for m in stages.values() if m["peak_mb"] is not None]
+        return stages, {"peak_mb": max(peaks) if peaks else None}
+
+    stages = {name: {"seconds": m["seconds"], "cpu_seconds": m["cpu_seconds"], "rows": m["rows"],
+                     "rows_per_sec": m["rows_per_sec"], "calls": m["calls"]}
+              for name, m in result["stages"].items()}
+    end_to_end = {
+        "seconds": round(wall, 4),
+        "cpu_seconds": round(cpu, 4),
+        "rows_per_sec": round(rows / wall) if wall > 0 else None,
+    }
+    return stages, end_to_end
+
+def _with_memory(timed, traced):
+    for name, metrics in traced.items():
+        timed.setdefault(name, {}).update(metrics)
+    return timed
+
+def run_benchmark(sizes=None, kinds=("customers", "orders"), out_dir=BENCH_DIR, chunksize=None,
+                  memory=True):
+    """
+    Generate inputs of each size (cached between runs), time run_pipeline on
+    each (stage metrics from its report, result cache off, isolated data
+    directory), then optionally repeat under tracemalloc for peak memory.
+    Returns a JSON-serialisable result.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    results = []
+    for kind in kinds:
+        for rows in sizes or DEFAULT_SIZES:
+            path = _write_input(kind, rows, out_dir)
+            stages, end_to_end = bench_run(path, out_dir, chunksize, kind=kind)
+            if memory:
+                traced_stages, traced_e2e = bench_run(path, out_dir, chunksize, trace_memory=True, kind=kind)
+                stages = _with_memory(stages, traced_stages)
+                end_to_end.update(traced_e2e)
+
+            results.append({
+                "dataset": kind,
+                "rows": rows,
+                "input_mb": round(os.path.getsize(path) / 2**20, 2),
+                "stages": stages,
+                "end_to_end": end_to_end,
+            })
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "pandas": pd.__version__,
+        "cpu_count": os.cpu_count(),
+        "chunksize": chunksize,
+        "results": results,
+    }
+
+def compare(current, baseline, tolerance=0.2):
+    """
+    Regressions of `current` vs `baseline`: every (dataset, rows, stage)
+    whose rows/sec dropped by more than `tolerance`.
+    """
+    def index(result):
+        out = {}
+        for r in result["results"]:
+            for stage, m in dict(r["stages"], end_to_end=r["end_to_end"]).items():
+                out[(r["dataset"], r["rows"], stage)] = m.get("rows_per_sec")
+        return out
+
+    base = index(baseline)
+    regressions = []
+    for key, rps in index(current).items():
+        old = base.get(key)
+        if old and rps and rps < old * (1 - tolerance):
+            regressions.append({"dataset": key[0], "rows": key[1], "stage": key[2],
+                                "baseline_rows_per_sec": old, "rows_per_sec": rps,
+                                "change_pct": round((rps / old - 1) * 100, 1)})
+    return regressions
+
+# CLI helper
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark run_pipeline stages across data sizes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--kinds", nargs="+", default=["customers", "orders"])
+    parser.add_argument("--chunksize", type=int, default=None)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--out", default=None, help="result JSON path")
+    parser.add_argument("--baseline", default=None, help="earlier result JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed rows/sec drop (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.sizes, args.kinds, chunksize=args.chunksize, memory=not args.no_memory)
+    out = args.out or os.path.join(BENCH_DIR, f"bench_{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.json")
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            result["regressions"] = compare(result, json.load(f), args.tolerance)
+    with open(out, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Benchmark result: {out}")
+    if result.get("regressions"):
+        print(f"{len(result['regressions'])} throughput regression(s) beyond {args.tolerance:.0%}")
+        sys.exit(1)
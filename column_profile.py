@@ -0,0 +1,279 @@
+# src/pipeline/column_profile.py
+import base64
+import zlib
+import numpy as np
+import pandas as pd
+
+QUANTILES = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+DIGEST_DELTA = 200      # t-digest compression: at most ~delta centroids per column
+HLL_PRECISION = 12      # 4096 registers, ~1.6% distinct-count error
+TOP_VALUES = 50         # value frequencies kept per categorical column
+
+# -------------------------
+# Sketches
+# -------------------------
+class QuantileDigest:
+    """
+    Merging t-digest: (mean, weight) centroids that are small in the tails
+    and coarse in the middle (arcsine scale). Values are added a whole
+    array at a time, and two digests merge by pooling and re-compressing
+    their centroids, so chunk and worker digests combine freely.
+    """
+
+    def __init__(self, means=None, weights=None, delta=DIGEST_DELTA):
+        self.delta = delta
+        self.means = np.asarray(means if means is not None else [], dtype=np.float64)
+        self.weights = np.asarray(weights if weights is not None else [], dtype=np.float64)
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        cum = np.cumsum(weights)
+        q = (cum - weights / 2) / cum[-1]
+        k = np.floor(self.delta * (np.arcsin(2 * q - 1) / np.pi + 0.5))
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(k)) + 1])
+        w = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / w
+        self.weights = w
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values):
+            self._compress(np.concatenate([self.means, values]),
+                           np.concatenate([self.weights, np.ones(len(values))]))
+        return self
+
+    def merge(self, other):
+        if len(other.weights):
+            self._compress(np.concatenate([self.means, other.means]),
+                           np.concatenate([self.weights, other.weights]))
+        return self
+
+    def quantiles(self, qs, lo, hi):
+        """Interpolated quantiles; lo / hi (the exact min / max) pin the ends."""
+        if not len(self.weights):
+            return [None] * len(qs)
+        cum = np.cumsum(self.weights)
+        total = cum[-1]
+        positions = np.concatenate([[0.0], cum - self.weights / 2, [total]])
+        values = np.concatenate([[lo], self.means, [hi]])
+        return [float(v) for v in np.interp(np.asarray(qs) * total, positions, values)]
+
+    def cdf(self, xs, lo, hi):
+        """Approximate share of values <= each x (the inverse of quantiles)."""
+        xs = np.asarray(xs, dtype=np.float64)
+        if not len(self.weights):
+            return np.zeros(len(xs))
+        cum = np.cumsum(self.weights)
+        total = cum[-1]
+        positions = np.concatenate([[0.0], cum - self.weights / 2, [total]])
+        values = np.maximum.accumulate(np.concatenate([[lo], self.means, [hi]]))
+        return np.interp(xs, values, positions, left=0.0, right=total) / total
+
+class DistinctCounter:
+    """HyperLogLog over pandas' 64-bit value hashes; merging is a register-wise max."""
+
+    def __init__(self, registers=None, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = registers if registers is not None else np.zeros(1 << precision, dtype=np.uint8)
+
+    def update_hashes(self, hashes):
+        if not len(hashes):
+            return self
+        p = self.precision
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - p)) - 1)
+        # rank = leading zeros of the remaining 64-p bits + 1 (frexp's exponent is the bit length;
+        # exact here because rest < 2**52)
+        rank = (64 - p) - np.frexp(rest.astype(np.float64))[1] + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+        return self
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)  # linear counting for small cardinalities
+        return int(round(estimate))
+
+    def to_string(self):
+        return base64.b64encode(zlib.compress(self.registers.tobytes())).decode("ascii")
+
+    @classmethod
+    def from_string(cls, text, precision=HLL_PRECISION):
+        registers = np.frombuffer(zlib.decompress(base64.b64decode(text)), dtype=np.uint8).copy()
+        return cls(registers, precision)
+
+# -------------------------
+# Column / frame profiles
+# -------------------------
+def _value_hashes(series):
+    """64-bit hashes of the non-null values (category columns hash each category once)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = pd.util.hash_array(series.cat.categories.astype(str).to_numpy(dtype=object))
+        codes = series.cat.codes.to_numpy()
+        return categories[np.unique(codes[codes >= 0])]
+    values = series.dropna()
+    if pd.api.types.is_numeric_dtype(values):
+        values = values.astype(np.float64)  # 42 and 42.0 (int vs float chunks) hash alike
+    else:
+        values = values.astype(str)
+    return pd.util.hash_array(values.to_numpy())
+
+def _value_counts(series):
+    """{value (as text): rows} of a column, via the codes for category columns."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+        return {str(c): int(n) for c, n in zip(series.cat.categories, counts) if n}
+    return {str(k): int(n) for k, n in series.value_counts(dropna=True).items()}
+
+def _top(counts, n=TOP_VALUES):
+    return dict(sorted(counts.items(), key=lambda kv: -kv[1])[:n])
+
+class ColumnProfile:
+    """
+    Mergeable summary of one column: rows, nulls, distinct-count sketch and,
+    by type, min / max / mean / variance (Chan's parallel update) with a
+    quantile digest for numeric columns, or the top value frequencies for
+    categorical ones.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.count = 0
+        self.nulls = 0
+        self.distinct = DistinctCounter()
+        self.n = 0              # non-null numeric values behind the moments
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.digest = QuantileDigest() if kind == "numeric" else None
+        self.top = {} if kind == "categorical" else None
+
+    def update(self, series):
+        self.count += len(series)
+        self.nulls += int(series.isna().sum())
+        self.distinct.update_hashes(_value_hashes(series))
+        if self.digest is not None:
+            values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[np.isfinite(values)]
+            if len(values):
+                self._merge_moments(len(values), values.mean(), ((values - values.mean()) ** 2).sum(),
+                                    values.min(), values.max())
+                self.digest.update(values)
+        if self.top is not None:
+            merged = dict(self.top)
+            for value, n in _value_counts(series).items():
+                merged[value] = merged.get(value, 0) + n
+            self.top = _top(merged)
+        return self
+
+    def _merge_moments(self, n, mean, m2, lo, hi):
+        total = self.n + n
+        delta = mean - self.mean
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.mean += delta * n / total
+        self.n = total
+        self.min = float(lo) if self.min is None else min(self.min, float(lo))
+        self.max = float(hi) if self.max is None else max(self.max, float(hi))
+
+    def merge(self, other):
+        self.count += other.count
+        self.nulls += other.nulls
+        self.distinct.merge(other.distinct)
+        if other.n:
+            self._merge_moments(other.n, other.mean, other.m2, other.min, other.max)
+        if self.digest is not None and other.digest is not None:
+            self.digest.merge(other.digest)
+        if self.top is not None and other.top is not None:
+            merged = dict(self.top)
+            for value, n in other.top.items():
+                merged[value] = merged.get(value, 0) + n
+            self.top = _top(merged)
+        return self
+
+    def to_dict(self):
+        out = {"type": self.kind, "count": self.count, "nulls": self.nulls,
+               "null_rate": round(self.nulls / self.count, 6) if self.count else 0.0,
+               "distinct": self.distinct.count()}
+        sketch = {"hll": self.distinct.to_string()}
+        if self.digest is not None:
+            std = float(np.sqrt(self.m2 / (self.n - 1))) if self.n > 1 else None
+            out.update(min=self.min, max=self.max, mean=float(self.mean) if self.n else None, std=std,
+                       quantiles=dict(zip([f"p{round(q * 100):02d}" for q in QUANTILES],
+                                          self.digest.quantiles(QUANTILES, self.min, self.max))))
+            sketch.update(n=self.n, m2=float(self.m2),
+                          digest=[self.digest.means.tolist(), self.digest.weights.tolist()])
+        if self.top is not None:
+            out["top"] = self.top
+        out["sketch"] = sketch
+        return out
+
+    @classmethod
+    def from_dict(cls, data):
+        profile = cls(data["type"])
+        profile.count, profile.nulls = data["count"], data["nulls"]
+        sketch = data.get("sketch") or {}
+        if sketch.get("hll"):
+            profile.distinct = DistinctCounter.from_string(sketch["hll"])
+        if profile.digest is not None and "digest" in sketch:
+            profile.n, profile.m2 = sketch["n"], sketch["m2"]
+            profile.mean = data.get("mean") or 0.0
+            profile.min, profile.max = data.get("min"), data.get("max")
+            profile.digest = QuantileDigest(*sketch["digest"])
+        if profile.top is not None:
+            profile.top = dict(data.get("top") or {})
+        return profile
+
+class FrameProfile:
+    """
+    ColumnProfile per column of a run's input, built in one vectorized pass
+    per frame or chunk. Profiles of chunks or parallel workers merge into
+    the profile of the whole input; to_dict() is what the report stores and
+    from_dict() restores it (sketches included) without the data.
+    """
+
+    def __init__(self, schema=None):
+        self.schema = schema or {}
+        self.columns = {}
+
+    def _kind(self, col, series):
+        kind = self.schema.get(col)
+        if kind is None:
+            kind = "numeric" if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series) \
+                else "string"
+        return kind
+
+    def update(self, df):
+        for col in df.columns:
+            series = df[col]
+            if col not in self.columns:
+                self.columns[col] = ColumnProfile(self._kind(col, series))
+            self.columns[col].update(series)
+        return self
+
+    def merge(self, other):
+        for col, profile in other.columns.items():
+            if col in self.columns:
+                self.columns[col].merge(profile)
+            else:
+                self.columns[col] = profile
+        return self
+
+    def to_dict(self):
+        return {col: profile.to_dict() for col, profile in self.columns.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        frame = cls()
+        frame.columns = {col: ColumnProfile.from_dict(d) for col, d in (data or {}).items()}
+        return frame
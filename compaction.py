@@ -0,0 +1,81 @@
+# src/pipeline/compaction.py
+import numpy as np
+import pandas as pd
+
+# A "categorical" column with more distinct values than this share of its rows
+# gains nothing from the category dtype (the schema is inferred from a sample).
+CATEGORY_MAX_RATIO = 0.5
+
+def _downcast_numeric(series):
+    """Smallest integer width that holds every value; float32 only when lossless."""
+    if pd.api.types.is_bool_dtype(series) or not isinstance(series.dtype, np.dtype):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast="integer")
+    if series.dtype == np.float64:
+        values = series.to_numpy()
+        narrow = values.astype(np.float32)
+        if np.array_equal(narrow.astype(np.float64), values, equal_nan=True):
+            return pd.Series(narrow, index=series.index, name=series.name)
+    return series
+
+def _to_category(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    if series.nunique(dropna=True) > max(1, len(series) * CATEGORY_MAX_RATIO):
+        return series
+    return series.astype("category")
+
+def _to_arrow_string(series):
+    if not pd.api.types.is_object_dtype(series) and not pd.api.types.is_string_dtype(series):
+        return series
+    try:
+        return series.astype("string[pyarrow]")
+    except (ImportError, TypeError, ValueError):
+        return series
+
+def compact_frame(df, schema, arrow_strings=False):
+    """
+    Shrink df's in-memory dtypes using the detected schema:
+      categorical -> category
+      numeric     -> narrowest safe int width / float32 when no precision is lost
+      string      -> Arrow-backed string dtype (only with arrow_strings=True)
+    Values are unchanged, so rules, ML and the written outputs see the same data.
+    Returns a new frame; columns missing from the schema are left as they are.
+    """
+    out = {}
+    for col in df.columns:
+        series = df[col]
+        kind = schema.get(col)
+        if kind == "numeric" and pd.api.types.is_numeric_dtype(series):
+            series = _downcast_numeric(series)
+        elif kind == "categorical" and not pd.api.types.is_numeric_dtype(series):
+            series = _to_category(series)
+        elif kind == "string" and arrow_strings:
+            series = _to_arrow_string(series)
+        out[col] = series
+    return pd.DataFrame(out, index=df.index)
+
+def compact_options(config):
+    """Compaction switches from the `pipeline:` section of the rules."""
+    config = config or {}
+    return {"enabled": bool(config.get("compact_dtypes", True)),
+            "arrow_strings": bool(config.get("arrow_strings", False))}
+
+def canonical_frame(df):
+    """
+    Undo per-frame dtype choices before hashing rows: numerics (any int
+    width, float32, ints that picked up NaN) become float64, everything
+    else (category, Arrow strings, object) becomes object with None for
+    nulls. The same values then hash the same whichever chunk, compaction
+    or earlier load they came from.
+    """
+    out = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            out[col] = series.astype(np.float64)
+        else:
+            values = series.astype(object)
+            out[col] = values.where(series.notna(), None)
+    return pd.DataFrame(out, index=df.index)
@@ -13,14 +13,24 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 import json
-from glob import glob
 from datetime import datetime
 
+from src.pipeline.outputs import count_output_rows, is_columnar, read_output
+from src.pipeline.failure_codes import ReasonCodes, render_reasons
+from src.pipeline.run_history import (
+    count_runs, get_report, history_version, import_reports, query_runs, record_run,
+)
+
+HISTORY_DB = os.path.join(PROJECT_ROOT, "data", "reports", "history.sqlite")
+HISTORY_PAGE_SIZE = 20
+JOB_POLL_SECONDS = 2
+
 # import the orchestrator runner
 try:
     from src.pipeline.orchestrator import run_pipeline
+    from src.pipeline.jobs import JobManager
 except Exception as e:
-    run_pipeline = None
+    run_pipeline = JobManager = None
     ORCHESTRATOR_IMPORT_ERROR = e
 else:
     ORCHESTRATOR_IMPORT_ERROR = None
@@ -59,19 +69,24 @@ with st.sidebar:
 
 uploaded = st.file_uploader("Upload a CSV file", type=["csv"], key="file_uploader")
 
-def safe_read_csv(path, nrows=None):
+def safe_read_output(path, nrows=None):
+    """Leading rows of a CSV file or a Parquet / Arrow output directory."""
     try:
-        return pd.read_csv(path, nrows=nrows)
+        return read_output(path, limit=nrows)
     except Exception:
         return pd.DataFrame()
 
+def count_rows(path):
+    """Row count without loading the data (Parquet answers from its metadata)."""
+    try:
+        return count_output_rows(path)
+    except Exception:
+        return 0
+
 def compute_report_fallback(raw_path, clean_path, quarantine_path):
-    raw_df = safe_read_csv(raw_path)
-    clean_df = safe_read_csv(clean_path)
-    q_df = safe_read_csv(quarantine_path)
-    total = len(raw_df)
-    cleaned = len(clean_df)
-    quarantined = len(q_df)
+    total = count_rows(raw_path)
+    cleaned = count_rows(clean_path)
+    quarantined = count_rows(quarantine_path)
     pass_rate = round((cleaned / total) * 100, 2) if total > 0 else 0.0
     return {
         "total_records": total,
@@ -81,30 +96,62 @@ def compute_report_fallback(raw_path, clean_path, quarantine_path):
         "timestamp": datetime.utcnow().isoformat() + "Z"
     }
 
-def load_run_history(reports_dir="data/reports"):
-    files = sorted(glob(os.path.join(reports_dir, "report_*.json")), reverse=True)
-    rows = []
-    for p in files:
-        try:
-            with open(p, "r") as f:
-                js = json.load(f)
-            js["_path"] = p
-            rows.append(js)
-        except Exception:
-            continue
-    if rows:
-        df = pd.DataFrame(rows)
-        # normalize common fields
-        df = df.rename(columns={
-            "total_records":"total",
-            "cleaned_records":"cleaned",
-            "quarantined_records":"quarantined",
-            "pass_rate_pct":"pass_rate_pct"
-        })
-        # show newest first
-        df = df.sort_values(by="timestamp", ascending=False).reset_index(drop=True)
-        return df
-    return pd.DataFrame(columns=["timestamp","total","cleaned","quarantined","pass_rate_pct","_path"])
+def _zip_output(path):
+    """Zip a columnar run directory in memory (stored, parts are already compressed) -> bytes."""
+    import io
+    import zipfile
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_STORED) as zf:
+        for root, _, files in os.walk(path):
+            for name in files:
+                full = os.path.join(root, name)
+                zf.write(full, os.path.relpath(full, path))
+    return buf.getvalue()
+
+def _read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def file_download(container, label, path, file_name, key):
+    """
+    Download button that reads the file only when clicked, so large outputs
+    are never held by the page script on every rerun. Columnar outputs (a
+    run directory) are zipped on click, in memory: no temp files are left.
+    """
+    if not path or not os.path.exists(path):
+        return False
+    if is_columnar(path):
+        size_mb = sum(os.path.getsize(os.path.join(r, f)) for r, _, fs in os.walk(path) for f in fs) / 2**20
+        container.download_button(f"{label} ({size_mb:,.1f} MB, zip)", data=lambda: _zip_output(path),
+                                  file_name=f"{os.path.splitext(file_name)[0]}.zip", key=key, on_click="ignore")
+        return True
+    size_mb = os.path.getsize(path) / 2**20
+    container.download_button(f"{label} ({size_mb:,.1f} MB)", data=lambda: _read_bytes(path),
+                              file_name=file_name, key=key, on_click="ignore")
+    return True
+
+@st.cache_resource
+def get_job_manager():
+    """One background executor per Streamlit server, shared by all sessions."""
+    return JobManager()
+
+@st.cache_resource
+def _backfill_history(db_path, reports_dir):
+    """One-time import of report_*.json files written before the history store existed."""
+    return import_reports(db_path, reports_dir)
+
+@st.cache_data(max_entries=64)
+def load_run_history(db_path, version, start=None, end=None, limit=HISTORY_PAGE_SIZE, offset=0):
+    """
+    One page of runs (newest first) plus the matching run count. `version`
+    is history_version(db_path): it only serves as the cache key, so a new
+    run invalidates the cached pages while ordinary reruns hit the cache.
+    """
+    return query_runs(db_path, start, end, limit, offset), count_runs(db_path, start, end)
+
+@st.cache_data(max_entries=32)
+def load_history_report(db_path, version, run_id):
+    return get_report(db_path, run_id)
 
 def render_gauge(value_pct):
     """
@@ -146,18 +193,178 @@ def render_gauge(value_pct):
     st.plotly_chart(fig, use_container_width=True)
     return True
 
+def render_result(result):
+    """Metrics, charts, previews and downloads for one finished run."""
+    raw_path = result.get("input_path", "")
+    file_name = os.path.basename(raw_path)
+
+    # read report, fallback if not present
+    report = result.get("report") or {}
+    if not report:
+        report = compute_report_fallback(raw_path, result.get("clean_path",""), result.get("quarantine_path",""))
+        # also save this fallback report to the reports folder for run history
+        try:
+            timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+            report_path = f"data/reports/report_{timestamp}.json"
+            with open(report_path, "w") as f:
+                json.dump(report, f, indent=2)
+            result["report_path"] = report_path
+            record_run(HISTORY_DB, report, report_path, input_path=raw_path)
+        except Exception:
+            pass
+
+    total = report.get("total_records", report.get("total", 0))
+    cleaned = report.get("cleaned_records", report.get("cleaned", 0))
+    quarantined = report.get("quarantined_records", report.get("quarantined", 0))
+    pass_rate = report.get("pass_rate_pct", report.get("pass_rate_pct", 0.0))
+
+    # Top metrics row
+    col1, col2, col3, col4 = st.columns([1,1,1,1])
+    col1.metric("Total rows", f"{int(total):,}")
+    col2.metric("Cleaned rows", f"{int(cleaned):,}", delta=f"{int(cleaned) - int(quarantined):,}")
+    col3.metric("Quarantined rows", f"{int(quarantined):,}")
+    col4.metric("Pass rate", f"{pass_rate} %")
+
+    # Success card (styled with company color)
+    st.markdown("---")
+    st.markdown("## ⭐ Overall Data Quality Score")
+
+    st.markdown(f"""
+    <div style="
+        padding: 18px;
+        border-radius: 10px;
+        background-color: #ffffff;
+        border-left: 8px solid {COMPANY_COLOR};
+        box-shadow: 0 2px 6px rgba(0,0,0,0.06);
+        margin-bottom: 10px;
+    ">
+        <h2 style="color:{COMPANY_COLOR}; margin:0; font-size:28px;">{pass_rate}% Success Rate</h2>
+        <p style="margin:0; color:#666;">Percentage of rows that passed validation and anomaly checks.</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Render Plotly gauge if available, else fallback to progress bar
+    gauge_ok = render_gauge(pass_rate)
+    if not gauge_ok:
+        st.info("Plotly not available — showing a progress bar instead. (Install `plotly` to enable the gauge.)")
+        try:
+            st.progress(min(max(pass_rate / 100.0, 0.0), 1.0))
+        except Exception:
+            pass
+
+    # Status badge
+    if pass_rate >= 90:
+        st.success(f"Excellent — {pass_rate}% of your data is clean and ready for use.")
+    elif pass_rate >= 70:
+        st.warning(f"Moderate Quality — {pass_rate}% passed. Some records require review.")
+    else:
+        st.error(f"Low Quality — Only {pass_rate}% passed. Review the raw data and rules.")
+
+    # Quality gates (pipeline.fail_if_* in the rules)
+    for failure in (report.get("gates") or {}).get("failures") or []:
+        st.error(f"Quality gate failed: {failure}")
+
+    # Pie chart
+    st.markdown("---")
+    if show_pie:
+        labels = ["Cleaned", "Quarantined"]
+        sizes = [cleaned, quarantined]
+        if sum(sizes) == 0:
+            sizes = [1, 0]
+        fig, ax = plt.subplots()
+        ax.pie(sizes, labels=labels, autopct="%1.1f%%", startangle=90)
+        ax.axis("equal")
+        ax.set_title("Clean vs Quarantined")
+        st.pyplot(fig)
+
+    # Failure reasons bar (counts come with the run result)
+    if show_failure_bar:
+        reasons = pd.Series(result.get("failure_reasons") or {}, dtype="int64")
+        if not reasons.empty:
+            st.markdown("### Top failure reasons")
+            top = reasons.nlargest(10)
+            fig2, ax2 = plt.subplots()
+            top.plot.barh(ax=ax2)
+            ax2.invert_yaxis()
+            st.pyplot(fig2)
+        else:
+            st.info("No failure reasons recorded for this run.")
+        columns = pd.Series(result.get("failure_columns") or {}, dtype="int64")
+        if not columns.empty:
+            st.markdown("### Failing rows per column")
+            st.bar_chart(columns.nlargest(20))
+
+    # Column profile (computed in the run, sketches stay in the report)
+    profile = report.get("columns") or {}
+    if profile:
+        st.markdown("### Column profile")
+        st.dataframe(pd.DataFrame({
+            col: {k: v for k, v in summary.items() if k not in ("sketch", "quantiles", "top")}
+            | (summary.get("quantiles") or {})
+            for col, summary in profile.items()
+        }).T)
+
+    # Drift against the rolling baseline of earlier runs of this dataset
+    drift = report.get("drift") or {}
+    if drift.get("columns"):
+        drifted = drift.get("drifted_columns") or []
+        st.markdown(f"### Drift vs. last {drift.get('baseline_runs')} runs")
+        if drifted:
+            st.warning(f"Drift flagged in: {', '.join(drifted)}")
+        st.dataframe(pd.DataFrame({
+            col: {**entry, "flags": ", ".join(entry.get("flags") or []),
+                  "new_values": ", ".join(map(str, entry.get("new_values") or []))}
+            for col, entry in drift["columns"].items()
+        }).T)
+
+    # Cleaned & quarantine previews (bounded slices returned by run_pipeline)
+    st.markdown("---")
+    st.subheader(f"Cleaned Data (preview, {int(cleaned):,} rows total)")
+    clean_df = result.get("clean_preview")
+    if clean_df is None:
+        clean_df = safe_read_output(result.get("clean_path",""), nrows=preview_rows)
+    if clean_df.empty:
+        st.info("Cleaned data is empty or could not be read.")
+    else:
+        st.dataframe(clean_df.head(preview_rows))
+
+    st.subheader(f"Quarantined Records (preview, {int(quarantined):,} rows total)")
+    q_df = result.get("quarantine_preview")
+    if q_df is None:
+        q_df = safe_read_output(result.get("quarantine_path",""), nrows=preview_rows)
+        # quarantine files hold failure codes; the run's report holds their text
+        q_df = render_reasons(q_df, ReasonCodes.from_dict((result.get("report") or {}).get("failure_codes")))
+    if q_df.empty:
+        st.info("No quarantined records.")
+    else:
+        st.dataframe(q_df.head(preview_rows))
+
+    # Downloads (streamed from disk on click)
+    st.markdown("---")
+    c1, c2 = st.columns(2)
+    if not file_download(c1, "Download cleaned CSV", result.get("clean_path"),
+                         f"cleaned_{file_name}", "download_clean"):
+        c1.info("Cleaned file not available for download.")
+    if not file_download(c2, "Download quarantined CSV", result.get("quarantine_path"),
+                         f"quarantine_{file_name}", "download_quarantine"):
+        c2.info("Quarantine file not available for download.")
+
+    # Files & report paths
+    st.markdown("---")
+    st.write("Files written:")
+    st.write(f"- Raw: `{raw_path}`")
+    st.write(f"- Clean: `{result.get('clean_path')}`")
+    st.write(f"- Quarantine: `{result.get('quarantine_path')}`")
+    st.write(f"- Report: `{result.get('report_path')}`")
+
+
 # -------------------------
 # Upload / Run pipeline UI
 # -------------------------
 if uploaded:
-    raw_path = os.path.join("data", "raw", uploaded.name)
-    with open(raw_path, "wb") as f:
-        f.write(uploaded.getvalue())
-    st.success(f"Saved {uploaded.name} -> {raw_path}")
-
-    # preview uploaded file
+    # preview straight from the upload; the file is saved per job on submit
     try:
-        preview_df = pd.read_csv(raw_path)
+        preview_df = pd.read_csv(uploaded, nrows=preview_rows)
         st.subheader("Uploaded file preview")
         st.dataframe(preview_df.head(preview_rows))
     except Exception as e:
@@ -168,144 +375,60 @@ if uploaded:
             st.error("Pipeline cannot run because orchestrator import failed. See sidebar for details.")
             st.stop()
 
-        with st.spinner("Running pipeline (rule engine + ML checks + DB load)..."):
-            try:
-                result = run_pipeline(raw_path)
-            except Exception as exc:
-                st.error("Pipeline failed:")
-                st.exception(exc)
-                st.stop()
-
-        st.success("Pipeline finished successfully.")
-
-        # read report, fallback if not present
-        report = result.get("report") or {}
-        if not report:
-            report = compute_report_fallback(raw_path, result.get("clean_path",""), result.get("quarantine_path",""))
-            # also save this fallback report to the reports folder for run history
-            try:
-                timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-                report_path = f"data/reports/report_{timestamp}.json"
-                with open(report_path, "w") as f:
-                    json.dump(report, f, indent=2)
-                result["report_path"] = report_path
-            except Exception:
-                pass
-
-        total = report.get("total_records", report.get("total", 0))
-        cleaned = report.get("cleaned_records", report.get("cleaned", 0))
-        quarantined = report.get("quarantined_records", report.get("quarantined", 0))
-        pass_rate = report.get("pass_rate_pct", report.get("pass_rate_pct", 0.0))
-
-        # Top metrics row
-        col1, col2, col3, col4 = st.columns([1,1,1,1])
-        col1.metric("Total rows", f"{int(total):,}")
-        col2.metric("Cleaned rows", f"{int(cleaned):,}", delta=f"{int(cleaned) - int(quarantined):,}")
-        col3.metric("Quarantined rows", f"{int(quarantined):,}")
-        col4.metric("Pass rate", f"{pass_rate} %")
-
-        # Success card (styled with company color)
-        st.markdown("---")
-        st.markdown("## ⭐ Overall Data Quality Score")
-
-        st.markdown(f"""
-        <div style="
-            padding: 18px;
-            border-radius: 10px;
-            background-color: #ffffff;
-            border-left: 8px solid {COMPANY_COLOR};
-            box-shadow: 0 2px 6px rgba(0,0,0,0.06);
-            margin-bottom: 10px;
-        ">
-            <h2 style="color:{COMPANY_COLOR}; margin:0; font-size:28px;">{pass_rate}% Success Rate</h2>
-            <p style="margin:0; color:#666;">Percentage of rows that passed validation and anomaly checks.</p>
-        </div>
-        """, unsafe_allow_html=True)
-
-        # Render Plotly gauge if available, else fallback to progress bar
-        gauge_ok = render_gauge(pass_rate)
-        if not gauge_ok:
-            st.info("Plotly not available — showing a progress bar instead. (Install `plotly` to enable the gauge.)")
-            try:
-                st.progress(min(max(pass_rate / 100.0, 0.0), 1.0))
-            except Exception:
-                pass
-
-        # Status badge
-        if pass_rate >= 90:
-            st.success(f"Excellent — {pass_rate}% of your data is clean and ready for use.")
-        elif pass_rate >= 70:
-            st.warning(f"Moderate Quality — {pass_rate}% passed. Some records require review.")
-        else:
-            st.error(f"Low Quality — Only {pass_rate}% passed. Review the raw data and rules.")
-
-        # Pie chart
-        st.markdown("---")
-        if show_pie:
-            labels = ["Cleaned", "Quarantined"]
-            sizes = [cleaned, quarantined]
-            if sum(sizes) == 0:
-                sizes = [1, 0]
-            fig, ax = plt.subplots()
-            ax.pie(sizes, labels=labels, autopct="%1.1f%%", startangle=90)
-            ax.axis("equal")
-            ax.set_title("Clean vs Quarantined")
-            st.pyplot(fig)
-
-        # Failure reasons bar
-        if show_failure_bar:
-            qpath = result.get("quarantine_path")
-            qdf = safe_read_csv(qpath)
-            if not qdf.empty and "failure_reason" in qdf.columns:
-                st.markdown("### Top failure reasons")
-                top = qdf["failure_reason"].value_counts().nlargest(10)
-                fig2, ax2 = plt.subplots()
-                top.plot.barh(ax=ax2)
-                ax2.invert_yaxis()
-                st.pyplot(fig2)
-            else:
-                st.info("No failure_reason column available in quarantine file to build failure reasons chart.")
-
-        # Cleaned & quarantine previews
-        st.markdown("---")
-        st.subheader("Cleaned Data (preview)")
-        clean_df = safe_read_csv(result.get("clean_path",""))
-        if clean_df.empty:
-            st.info("Cleaned data is empty or could not be read.")
-        else:
-            st.dataframe(clean_df.head(preview_rows))
+        # runs in a background worker; progress is polled in the jobs panel below
+        job_id, raw_path = get_job_manager().submit_upload(uploaded.name, uploaded.getvalue(),
+                                                           preview_rows=preview_rows)
+        st.session_state.setdefault("job_ids", []).insert(0, job_id)
+        st.session_state["selected_job"] = job_id
+        st.info(f"Submitted job `{job_id}` for {uploaded.name} (saved to `{raw_path}`).")
 
-        st.subheader("Quarantined Records (preview)")
-        q_df = safe_read_csv(result.get("quarantine_path",""))
-        if q_df.empty:
-            st.info("No quarantined records.")
+# -------------------------
+# Background jobs (polled)
+# -------------------------
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def render_jobs():
+    """Re-runs on its own every few seconds, without rerunning the rest of the page."""
+    job_ids = st.session_state.get("job_ids", [])
+    manager = get_job_manager()
+    running = False
+    for job_id in job_ids:
+        status = manager.status(job_id) or {"status": "unknown"}
+        state = status.get("status")
+        name = os.path.basename(status.get("input_path", ""))
+        line = f"`{job_id}` {name} — **{state}**"
+        if state == "running":
+            running = True
+            line += f" · stage `{status.get('stage')}` · {int(status.get('rows') or 0):,} rows · {status.get('elapsed', 0)}s"
+        elif state in ("failed", "gate_failed"):
+            line += f" · {status.get('error')}"
+        elif state == "done":
+            line += f" · {status.get('elapsed', 0)}s"
+        st.markdown(line)
+    # once the selected job finishes, rerun the full page so its results render
+    selected = st.session_state.get("selected_job")
+    if selected and not st.session_state.get("rendered_" + selected):
+        status = manager.status(selected) or {}
+        if status.get("status") in ("done", "gate_failed", "failed"):
+            st.session_state["rendered_" + selected] = True
+            st.rerun()
+
+if JobManager is not None and st.session_state.get("job_ids"):
+    st.markdown("---")
+    st.markdown("## ⏳ Pipeline jobs")
+    render_jobs()
+
+    finished = [j for j in st.session_state["job_ids"]
+                if (get_job_manager().status(j) or {}).get("status") in ("done", "gate_failed")]
+    if finished:
+        default = st.session_state.get("selected_job")
+        sel_job = st.selectbox("Show results for job", finished,
+                               index=finished.index(default) if default in finished else 0, key="select_job")
+        result = get_job_manager().result(sel_job)
+        if result is None:
+            st.info("Results of this job are no longer in memory; see run history below.")
         else:
-            st.dataframe(q_df.head(preview_rows))
-
-        # Downloads
-        st.markdown("---")
-        c1, c2 = st.columns(2)
-        try:
-            with open(result.get("clean_path",""), "rb") as f:
-                c_bytes = f.read()
-            c1.download_button("Download cleaned CSV", data=c_bytes, file_name=f"cleaned_{uploaded.name}", key="download_clean")
-        except Exception:
-            c1.info("Cleaned file not available for download.")
-
-        try:
-            with open(result.get("quarantine_path",""), "rb") as f:
-                q_bytes = f.read()
-            c2.download_button("Download quarantined CSV", data=q_bytes, file_name=f"quarantine_{uploaded.name}", key="download_quarantine")
-        except Exception:
-            c2.info("Quarantine file not available for download.")
-
-        # Files & report paths
-        st.markdown("---")
-        st.write("Files written:")
-        st.write(f"- Raw: `{raw_path}`")
-        st.write(f"- Clean: `{result.get('clean_path')}`")
-        st.write(f"- Quarantine: `{result.get('quarantine_path')}`")
-        st.write(f"- Report: `{result.get('report_path')}`")
+            st.success("Pipeline finished successfully.")
+            render_result(result)
 
 # -------------------------
 # Run history (bottom panel)
@@ -313,27 +436,40 @@ if uploaded:
 st.markdown("---")
 st.markdown("## 🕘 Recent pipeline runs (history)")
 
-history_df = load_run_history("data/reports")
+_backfill_history(HISTORY_DB, "data/reports")
+version = history_version(HISTORY_DB)
+
+h1, h2 = st.columns(2)
+date_range = h1.date_input("Time range", value=(), key="history_range")
+start = end = None
+if len(date_range) == 2:
+    start = date_range[0].isoformat()
+    end = (pd.Timestamp(date_range[1]) + pd.Timedelta(days=1)).date().isoformat()
+
+_, n_runs = load_run_history(HISTORY_DB, version, start, end, limit=0)
+n_pages = max(1, -(-n_runs // HISTORY_PAGE_SIZE))
+page = h2.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, key="history_page")
+
+history_df, _ = load_run_history(HISTORY_DB, version, start, end,
+                                 limit=HISTORY_PAGE_SIZE, offset=(page - 1) * HISTORY_PAGE_SIZE)
 if history_df.empty:
     st.info("No historical reports found in data/reports. Runs will be saved there automatically when pipeline runs.")
 else:
     # show a concise table
     display_df = history_df[["timestamp","total","cleaned","quarantined","pass_rate_pct"]].copy()
     display_df["timestamp"] = pd.to_datetime(display_df["timestamp"], errors="coerce")
-    display_df = display_df.sort_values("timestamp", ascending=False).reset_index(drop=True)
-    st.dataframe(display_df.head(20), use_container_width=True, key="history_table")
+    st.caption(f"{n_runs:,} runs")
+    st.dataframe(display_df, use_container_width=True, key="history_table")
 
     # allow user to select a report and download
-    sel = st.selectbox("Select a report to download or view", history_df["_path"].tolist(), key="select_report")
+    sel = st.selectbox("Select a report to download or view", history_df["run_id"].tolist(), key="select_report")
     if sel:
-        try:
-            with open(sel, "r") as f:
-                rawj = json.load(f)
+        rawj = load_history_report(HISTORY_DB, version, sel)
+        if rawj is None:
+            st.error(f"Could not open selected report: {sel}")
+        else:
             st.json(rawj)
-            with open(sel, "rb") as f:
-                sel_bytes = f.read()
-            st.download_button("Download selected report (JSON)", data=sel_bytes, file_name=os.path.basename(sel), key="download_report")
-        except Exception as e:
-            st.error(f"Could not open selected report: {e}")
+            st.download_button("Download selected report (JSON)", data=json.dumps(rawj, indent=2),
+                               file_name=f"report_{sel}.json", key="download_report")
 
 st.markdown("End of dashboard.")
@@ -0,0 +1,290 @@
+# src/pipeline/dedup.py
+import numpy as np
+import pandas as pd
+
+from .compaction import canonical_frame
+from .failure_codes import ReasonCodes, attach_failures
+
+DEDUP_DEFAULTS = {
+    "enabled": True,
+    "exact": True,
+    "id_column": None,      # survivor id reported in duplicate_of; None -> first column
+    "ignore_columns": [],   # left out of the exact-duplicate hash (e.g. load timestamps)
+    "near": None,
+}
+NEAR_DEFAULTS = {
+    "columns": None,        # text columns compared for near duplicates (required)
+    "block_on": [],         # only rows with equal (normalized) values here are compared
+    "threshold": 0.8,       # estimated Jaccard similarity of the shingle sets
+    "num_perm": 32,
+    "bands": 8,
+    "shingle": 3,
+    "max_chars": 64,
+    "seed": 1,
+}
+MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+SIGNATURE_BATCH_ROWS = 50_000
+
+def dedup_options(config):
+    """Options from the `dedup:` section of the rules, filled with the defaults."""
+    options = dict(DEDUP_DEFAULTS)
+    options.update({k: v for k, v in (config or {}).items() if k in DEDUP_DEFAULTS})
+    near = options.get("near")
+    if near and near.get("columns"):
+        options["near"] = dict(NEAR_DEFAULTS, **{k: v for k, v in near.items() if k in NEAR_DEFAULTS})
+    else:
+        options["near"] = None
+    return options
+
+# -------------------------
+# Exact duplicates
+# -------------------------
+def row_hashes(df, ignore=()):
+    """
+    Vectorized 64-bit hash of every row over all columns except `ignore`.
+    Hashed from the dtype-normalized frame, so chunks that were read or
+    compacted with different dtypes (float32 / float64, category / object)
+    still hash the same rows alike.
+    """
+    cols = [c for c in df.columns if c not in set(ignore)]
+    return pd.util.hash_pandas_object(canonical_frame(df[cols]), index=False).to_numpy()
+
+def _first_positions(keys):
+    """For each row, the position of the first row with the same key."""
+    codes, _ = pd.factorize(keys)
+    _, first = np.unique(codes, return_index=True)
+    return first[codes]
+
+def _id_array(ids):
+    """Survivor ids as a flat numpy array: int64 / float64 when numeric, fixed-width str otherwise."""
+    ids = pd.Series(np.asarray(ids, dtype=object)).infer_objects()
+    if pd.api.types.is_numeric_dtype(ids) and not pd.api.types.is_bool_dtype(ids):
+        return ids.to_numpy(dtype=np.int64 if pd.api.types.is_integer_dtype(ids) else np.float64)
+    return ids.fillna("").astype(str).to_numpy(dtype=str)
+
+def _concat_ids(a, b):
+    """Concatenate two id arrays; numeric and text ids mixed across chunks fall back to text."""
+    if (a.dtype.kind in "iuf") != (b.dtype.kind in "iuf"):
+        a, b = a.astype(str), b.astype(str)
+    return np.concatenate([a, b])
+
+class SeenHashes:
+    """
+    Row hashes already kept by earlier chunks, with their survivor ids.
+    Stored as sorted uint64 runs (hashes plus the ids in the same order);
+    a new run is merged into the previous one while that is no more than
+    twice its size, so there are O(log n) runs and every hash is copied
+    O(log n) times over a whole run, never once per chunk. Ids are kept in
+    plain numpy arrays, not as Python objects: memory per distinct kept row
+    is 8 bytes of hash plus 8 bytes for a numeric id, or 4 bytes per
+    character of the longest text id. A lookup is a searchsorted per run.
+    """
+
+    def __init__(self):
+        self._runs = []   # [(sorted hashes, ids)], largest first
+
+    def __len__(self):
+        return sum(len(hashes) for hashes, _ in self._runs)
+
+    def lookup(self, hashes):
+        """(found, ids): which hashes were seen before, and their survivor ids."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        found = np.zeros(len(hashes), dtype=bool)
+        out = np.full(len(hashes), None, dtype=object)
+        for run, ids in self._runs:
+            pos = np.minimum(np.searchsorted(run, hashes), len(run) - 1)
+            hit = run[pos] == hashes
+            found |= hit
+            out[hit] = ids[pos[hit]].tolist()
+        return found, out
+
+    def add(self, hashes, ids):
+        """Record hashes not seen before (callers pass each hash once)."""
+        if not len(hashes):
+            return self
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        order = np.argsort(hashes, kind="stable")
+        run, run_ids = hashes[order], _id_array(ids)[order]
+        while self._runs and len(self._runs[-1][0]) <= 2 * len(run):
+            prev, prev_ids = self._runs.pop()
+            merged = np.concatenate([prev, run])
+            order = np.argsort(merged, kind="stable")
+            run, run_ids = merged[order], _concat_ids(prev_ids, run_ids)[order]
+        self._runs.append((run, run_ids))
+        return self
+
+# -------------------------
+# Near duplicates (MinHash + LSH)
+# -------------------------
+def _normalize(series):
+    """Lowercase, alphanumerics only: 'Jerry.Barr@X.com' == 'jerrybarr@x.com', '(485)100-7891' == '485.100.7891'."""
+    return series.astype("string").str.lower().str.replace(r"[^0-9a-z]", "", regex=True).fillna("")
+
+def _near_text(df, columns, max_chars):
+    parts = [_normalize(df[c]) for c in columns]
+    text = parts[0]
+    for part in parts[1:]:
+        text = text + "|" + part
+    return text.str.slice(0, max_chars)
+
+def _shingles(text, k, max_chars):
+    """
+    (codes, valid): every k-char shingle of every row packed into an integer,
+    as an (n, max_chars - k + 1) matrix, plus the mask of real (not padding)
+    positions. Strings shorter than k count as a single shingle.
+    """
+    n = len(text)
+    raw = np.array(text.tolist(), dtype=f"S{max_chars}")
+    chars = np.frombuffer(raw.tobytes(), dtype=np.uint8).reshape(n, max_chars).astype(np.uint64)
+    width = max_chars - k + 1
+    codes = np.zeros((n, width), dtype=np.uint64)
+    for j in range(k):
+        codes = codes * np.uint64(256) + chars[:, j:j + width]
+    lengths = text.str.len().to_numpy(dtype=np.int64)
+    valid = np.arange(width)[None, :] < np.maximum(lengths - k + 1, (lengths > 0).astype(np.int64))[:, None]
+    return codes, valid
+
+def minhash_signatures(text, num_perm=32, shingle=3, max_chars=64, seed=1):
+    """(n, num_perm) MinHash signatures of the rows' character shingles, in row batches."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, int(MERSENNE_PRIME), num_perm, dtype=np.uint64)
+    b = rng.integers(0, int(MERSENNE_PRIME), num_perm, dtype=np.uint64)
+    signatures = np.empty((len(text), num_perm), dtype=np.uint64)
+    for start in range(0, len(text), SIGNATURE_BATCH_ROWS):
+        codes, valid = _shingles(text.iloc[start:start + SIGNATURE_BATCH_ROWS], shingle, max_chars)
+        codes %= MERSENNE_PRIME  # keeps a * code inside 64 bits
+        for p in range(num_perm):
+            hashed = (a[p] * codes + b[p]) % MERSENNE_PRIME
+            hashed[~valid] = MERSENNE_PRIME
+            signatures[start:start + len(codes), p] = hashed.min(axis=1)
+    return signatures
+
+def _band_keys(signatures, bands, block_codes):
+    """One bucket key per row and band: the band's signature rows folded into 64 bits, salted with the block."""
+    rows = signatures.shape[1] // bands
+    with np.errstate(over="ignore"):
+        for band in range(bands):
+            key = block_codes.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15) + np.uint64(band)
+            for value in signatures[:, band * rows:(band + 1) * rows].T:
+                key = key * np.uint64(1099511628211) ^ value
+            yield key
+
+def near_duplicate_groups(df, columns, block_on=(), threshold=0.8, num_perm=32, bands=8,
+                          shingle=3, max_chars=64, seed=1):
+    """
+    For every row, the position of the row it is a near duplicate of (itself
+    if none). Only rows sharing a blocking key are compared, and only through
+    LSH buckets: each row is checked against its bucket's first row, pairs
+    whose estimated Jaccard similarity reaches `threshold` are linked, and
+    every linked group collapses onto its earliest row. Near-linear: no
+    pairwise comparison anywhere.
+    """
+    n = len(df)
+    survivors = np.arange(n)
+    text = _near_text(df, columns, max_chars)
+    if block_on:
+        block_codes, _ = pd.factorize(_near_text(df, block_on, max_chars))
+    else:
+        block_codes = np.zeros(n, dtype=np.int64)
+
+    # rows alone in their block, or with nothing to compare, cannot have near duplicates
+    sizes = np.bincount(block_codes, minlength=1) if n else np.zeros(1, dtype=np.int64)
+    candidates = np.flatnonzero((sizes[block_codes] > 1) & (text.str.len().to_numpy() > 0))
+    if len(candidates) < 2:
+        return survivors
+
+    signatures = minhash_signatures(text.iloc[candidates], num_perm, shingle, max_chars, seed)
+    edges = []
+    for key in _band_keys(signatures, bands, block_codes[candidates]):
+        leader = _first_positions(key)
+        linked = np.flatnonzero(leader != np.arange(len(key)))
+        edges.append(np.column_stack([linked, leader[linked]]))
+    edges = np.unique(np.concatenate(edges), axis=0)
+    if len(edges) == 0:
+        return survivors
+
+    similarity = (signatures[edges[:, 0]] == signatures[edges[:, 1]]).mean(axis=1)
+    edges = edges[similarity >= threshold]
+    if len(edges) == 0:
+        return survivors
+
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+    m = len(candidates)
+    graph = coo_matrix((np.ones(len(edges)), (edges[:, 0], edges[:, 1])), shape=(m, m))
+    _, labels = connected_components(graph, directed=False)
+    earliest = pd.Series(np.arange(m)).groupby(labels).transform("min").to_numpy()
+    survivors[candidates] = candidates[earliest]
+    return survivors
+
+# -------------------------
+# Stage
+# -------------------------
+class Deduplicator:
+    """
+    Dedup stage run before the rules. split(df, codes) -> (kept, duplicates),
+    where duplicates carry a failure_code into `codes` ("exact duplicate" /
+    "near duplicate"; failure_reason text without one) and duplicate_of
+    (the surviving record's id). Exact duplicates are also caught across the
+    chunks of a streaming run; near duplicates are looked for within each
+    frame.
+    """
+
+    def __init__(self, **options):
+        self.options = dedup_options(options)
+        self._seen = SeenHashes()  # row hash -> survivor id, across chunks
+        self._offset = 0
+
+    def _ids(self, df):
+        id_column = self.options["id_column"] or df.columns[0]
+        if id_column in df.columns:
+            return df[id_column].to_numpy(dtype=object)
+        return np.array([f"row {i}" for i in range(self._offset, self._offset + len(df))], dtype=object)
+
+    def _near_options(self, df):
+        """Near-duplicate options limited to the columns this frame has (None if none are left)."""
+        near = self.options["near"]
+        if not near:
+            return None
+        columns = [c for c in near["columns"] if c in df.columns]
+        if not columns:
+            return None
+        return dict(near, columns=columns, block_on=[c for c in near["block_on"] if c in df.columns])
+
+    def split(self, df, codes=None):
+        df = df.reset_index(drop=True)
+        n = len(df)
+        ids = self._ids(df)
+        survivor_ids = np.full(n, None, dtype=object)
+        reasons = np.full(n, "", dtype=object)
+
+        if self.options["exact"] and n:
+            hashes = row_hashes(df, self.options["ignore_columns"])
+            first = _first_positions(hashes)
+            within = first != np.arange(n)
+            survivor_ids[within] = ids[first[within]]
+            # rows first seen in an earlier chunk
+            before, earlier = self._seen.lookup(hashes)
+            survivor_ids[before] = earlier[before]
+            dup = within | before
+            reasons[dup] = "exact duplicate"
+            fresh = ~dup
+            self._seen.add(hashes[fresh], ids[fresh])
+
+        near = self._near_options(df)
+        if near and n:
+            remaining = np.flatnonzero(reasons == "")
+            survivors = near_duplicate_groups(df.iloc[remaining], **near)
+            hit = survivors != np.arange(len(remaining))
+            rows = remaining[hit]
+            survivor_ids[rows] = ids[remaining[survivors[hit]]]
+            reasons[rows] = "near duplicate"
+
+        self._offset += n
+        dup_mask = reasons != ""
+        df_dups = df[dup_mask].copy()
+        if not df_dups.empty:
+            df_dups["duplicate_of"] = survivor_ids[dup_mask]
+            book = codes if codes is not None else ReasonCodes()
+            attach_failures(df_dups, book.encode_labels(reasons[dup_mask]), book, coded=codes is not None)
+        return df[~dup_mask].reset_index(drop=True), df_dups.reset_index(drop=True)
@@ -0,0 +1,105 @@
+# src/pipeline/drift.py
+import numpy as np
+
+from .column_profile import FrameProfile
+
+DRIFT_DEFAULTS = {
+    "enabled": True,
+    "baseline_runs": 10,       # rolling baseline: the last N runs of the same dataset
+    "min_baseline_runs": 1,    # fewer stored runs than this -> no comparison yet
+    "ks_threshold": 0.1,       # numeric: max CDF distance between the quantile sketches
+    "psi_threshold": 0.2,      # categorical: population stability index of value frequencies
+    "null_rate_delta": 0.05,   # absolute change of the null share
+}
+PSI_EPSILON = 1e-4
+OTHER_VALUES = "__other__"
+
+def drift_options(config):
+    """Options from the `drift:` section of the rules, filled with the defaults."""
+    options = dict(DRIFT_DEFAULTS)
+    options.update({k: v for k, v in (config or {}).items() if k in DRIFT_DEFAULTS})
+    return options
+
+def baseline_profile(stored):
+    """Merge stored column summaries (report["columns"] dicts, newest first) into one FrameProfile."""
+    baseline = FrameProfile()
+    for columns in stored:
+        baseline.merge(FrameProfile.from_dict(columns))
+    return baseline
+
+# -------------------------
+# Distances
+# -------------------------
+def ks_distance(current, baseline):
+    """
+    Kolmogorov-Smirnov style distance of two numeric ColumnProfiles: the
+    largest gap between their sketched CDFs, checked at both digests'
+    centroids (0 = same distribution, 1 = disjoint).
+    """
+    if not current.n or not baseline.n:
+        return None
+    lo, hi = min(current.min, baseline.min), max(current.max, baseline.max)
+    xs = np.unique(np.concatenate([current.digest.means, baseline.digest.means, [lo, hi]]))
+    gap = current.digest.cdf(xs, current.min, current.max) - baseline.digest.cdf(xs, baseline.min, baseline.max)
+    return float(np.abs(gap).max())
+
+def _shares(top, count, keys):
+    """Share of the non-null rows per key, the untracked rest under OTHER_VALUES."""
+    counts = np.array([top.get(k, 0) for k in keys] + [max(count - sum(top.values()), 0)], dtype=np.float64)
+    total = counts.sum()
+    return counts / total if total else counts
+
+def psi(current, baseline):
+    """Population stability index of two categorical ColumnProfiles' value frequencies."""
+    keys = sorted(set(current.top) | set(baseline.top))
+    if not keys:
+        return None
+    p = np.maximum(_shares(current.top, current.count - current.nulls, keys), PSI_EPSILON)
+    q = np.maximum(_shares(baseline.top, baseline.count - baseline.nulls, keys), PSI_EPSILON)
+    return float(np.sum((p - q) * np.log(p / q)))
+
+def _null_rate(profile):
+    return profile.nulls / profile.count if profile.count else 0.0
+
+# -------------------------
+# Comparison
+# -------------------------
+def compare_profiles(current, baseline, options=None, baseline_runs=None):
+    """
+    Compare the run's FrameProfile to the baseline FrameProfile, column by
+    column, from the sketches alone. Returns the report["drift"] dict:
+    per-column metrics and flags ("null_rate", "distribution", "new_values",
+    "new_column"), plus the list of drifted columns.
+    """
+    options = drift_options(options)
+    columns = {}
+    for col, cur in current.columns.items():
+        base = baseline.columns.get(col)
+        if base is None or not base.count:
+            columns[col] = {"flags": ["new_column"]}
+            continue
+        entry = {"null_rate_delta": round(_null_rate(cur) - _null_rate(base), 6)}
+        flags = []
+        if abs(entry["null_rate_delta"]) > options["null_rate_delta"]:
+            flags.append("null_rate")
+        if cur.digest is not None and base.digest is not None:
+            entry["ks"] = ks_distance(cur, base)
+            if entry["ks"] is not None and entry["ks"] > options["ks_threshold"]:
+                flags.append("distribution")
+        if cur.top is not None and base.top is not None:
+            entry["psi"] = psi(cur, base)
+            if entry["psi"] is not None and entry["psi"] > options["psi_threshold"]:
+                flags.append("distribution")
+            # values never seen in the baseline (only knowable while its top list is complete)
+            if base.count - base.nulls == sum(base.top.values()):
+                new_values = sorted(set(cur.top) - set(base.top))
+                if new_values:
+                    entry["new_values"] = new_values
+                    flags.append("new_values")
+        entry["flags"] = flags
+        columns[col] = entry
+    return {
+        "baseline_runs": baseline_runs,
+        "columns": columns,
+        "drifted_columns": [col for col, entry in columns.items() if entry["flags"]],
+    }
@@ -0,0 +1,149 @@
+# src/pipeline/failure_codes.py
+import numpy as np
+import pandas as pd
+
+REASON_SEP = "; "
+CODE_COLUMN = "failure_code"
+REASON_COLUMN = "failure_reason"
+NO_FAILURE = -1
+
+class ReasonCodes:
+    """
+    Run-wide dictionary of failure reasons. Every distinct combination of
+    reasons a row fails with gets one integer code, so quarantined rows only
+    carry an int32 `failure_code`; the dictionary goes into the run's report
+    and the readable text is produced when rendering. Counts come from a
+    bincount over the codes, expanded through the (few) combinations.
+    """
+
+    def __init__(self, reasons=None, patterns=None):
+        self.reasons = []    # reason id -> {"reason", "column"}
+        self.patterns = []   # code -> tuple of reason ids, in evaluation order
+        self._reason_ids = {}
+        self._codes = {}
+        for entry in reasons or []:
+            self.reason_id(entry["reason"], entry.get("column"))
+        for ids in patterns or []:
+            self.code(ids)
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def reason_id(self, reason, column=None):
+        reason = str(reason)
+        if reason not in self._reason_ids:
+            self._reason_ids[reason] = len(self.reasons)
+            self.reasons.append({"reason": reason, "column": column})
+        return self._reason_ids[reason]
+
+    def code(self, reason_ids):
+        """Code of one combination of reason ids (assigned on first use)."""
+        key = tuple(int(i) for i in reason_ids)
+        if key not in self._codes:
+            self._codes[key] = len(self.patterns)
+            self.patterns.append(key)
+        return self._codes[key]
+
+    # -------------------------
+    # Encoding
+    # -------------------------
+    def encode(self, matrix, reason_ids):
+        """
+        matrix     -> (rows, k) boolean failures, one column per reason
+        reason_ids -> the k reason ids
+        Returns int32 codes (NO_FAILURE for rows that passed). Codes are looked
+        up once per distinct failure pattern, not once per row.
+        """
+        out = np.full(len(matrix), NO_FAILURE, dtype=np.int32)
+        bad = matrix.any(axis=1)
+        if not bad.any():
+            return out
+        reason_ids = np.asarray(reason_ids)
+        failing = matrix[bad]
+        packed = np.packbits(failing, axis=1)
+        keys = packed.view(np.dtype((np.void, packed.shape[1]))).ravel()
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        pattern_codes = np.array([self.code(reason_ids[failing[i]]) for i in first], dtype=np.int32)
+        out[bad] = pattern_codes[inverse.ravel()]
+        return out
+
+    def encode_labels(self, labels, column=None):
+        """Codes for an array of single reasons (e.g. "exact duplicate" / "near duplicate")."""
+        unique, inverse = np.unique(np.asarray(labels, dtype=object).astype(str), return_inverse=True)
+        codes = np.array([self.code((self.reason_id(label, column),)) for label in unique], dtype=np.int32)
+        return codes[inverse.ravel()]
+
+    def constant(self, reason, n, column=None):
+        """The same single reason for n rows."""
+        return np.full(n, self.code((self.reason_id(reason, column),)), dtype=np.int32)
+
+    # -------------------------
+    # Rendering / aggregation
+    # -------------------------
+    def labels(self):
+        """Readable text of every code, reasons joined by REASON_SEP."""
+        return np.array([REASON_SEP.join(self.reasons[i]["reason"] for i in ids) for ids in self.patterns]
+                        + [""], dtype=object)  # the trailing "" renders NO_FAILURE
+
+    def render(self, codes):
+        codes = np.asarray(codes)
+        return self.labels()[np.where(codes >= 0, codes, len(self.patterns))]
+
+    def tally(self, codes, counts=None):
+        """Rows per code, added onto an earlier tally (streaming runs tally chunk by chunk)."""
+        codes = np.asarray(codes, dtype=np.int64)
+        new = np.bincount(codes[codes >= 0], minlength=len(self.patterns))
+        if counts is not None and len(counts):
+            new[:len(counts)] += counts
+        return new
+
+    def reason_counts(self, counts):
+        """{reason: rows failing it}, most frequent first."""
+        per_reason = np.zeros(len(self.reasons), dtype=np.int64)
+        for ids, n in zip(self.patterns, counts):
+            per_reason[list(ids)] += n
+        order = np.argsort(-per_reason, kind="stable")
+        return {self.reasons[i]["reason"]: int(per_reason[i]) for i in order if per_reason[i]}
+
+    def column_counts(self, counts):
+        """{column: rows failing at least one check on it}, most frequent first."""
+        per_column = {}
+        for ids, n in zip(self.patterns, counts):
+            for column in {self.reasons[i]["column"] for i in ids} - {None}:
+                per_column[column] = per_column.get(column, 0) + int(n)
+        return dict(sorted(per_column.items(), key=lambda kv: -kv[1]))
+
+    def to_dict(self, counts=None):
+        """The dictionary as stored in the report (with rows per code when a tally is given)."""
+        codes = []
+        for code, ids in enumerate(self.patterns):
+            entry = {"code": code, "reasons": list(ids)}
+            if counts is not None:
+                entry["rows"] = int(counts[code]) if code < len(counts) else 0
+            codes.append(entry)
+        return {"reasons": [dict(r, id=i) for i, r in enumerate(self.reasons)], "codes": codes}
+
+    @classmethod
+    def from_dict(cls, data):
+        data = data or {}
+        return cls(data.get("reasons"), [entry["reasons"] for entry in data.get("codes") or []])
+
+def attach_failures(frame, row_codes, codes, coded=True):
+    """
+    Record failures on `frame`: the failure_code column when the caller keeps
+    a run-wide dictionary (coded=True), otherwise the rendered failure_reason.
+    """
+    if coded:
+        frame[CODE_COLUMN] = np.asarray(row_codes, dtype=np.int32)
+    else:
+        frame[REASON_COLUMN] = codes.render(row_codes)
+    return frame
+
+def render_reasons(df, codes):
+    """Display copy of a quarantine frame with failure_reason text next to failure_code."""
+    if df is None or CODE_COLUMN not in df.columns or codes is None:
+        return df
+    df = df.copy()
+    row_codes = pd.to_numeric(df[CODE_COLUMN], errors="coerce").fillna(NO_FAILURE).astype(np.int64)
+    df.insert(df.columns.get_loc(CODE_COLUMN) + 1, REASON_COLUMN, codes.render(row_codes.to_numpy()))
+    return df
@@ -0,0 +1,65 @@
+# src/pipeline/fingerprint.py
+import os
+import json
+import hashlib
+
+SAMPLE_BYTES = 1 << 16
+
+def file_fingerprint(path, sample_bytes=SAMPLE_BYTES):
+    """
+    Cheap identity of an input file: inode, size, mtime / ctime (ns) and a
+    hash of its first and last `sample_bytes`. Reads at most 2 * sample_bytes
+    regardless of file size.
+
+    A heuristic, not a content hash: a same-size edit in the middle of the
+    file that keeps both timestamps would go unnoticed (any write through the
+    filesystem moves ctime, and a replaced file gets a new inode). Good
+    enough for the schema and reference-index caches it keys; results that
+    must match the bytes exactly use content_hash / result_key.
+    """
+    st = os.stat(path)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{st.st_ino}:{st.st_size}:{st.st_mtime_ns}:{st.st_ctime_ns}".encode())
+    with open(path, "rb") as f:
+        h.update(f.read(sample_bytes))
+        if st.st_size > 2 * sample_bytes:
+            f.seek(-sample_bytes, os.SEEK_END)
+            h.update(f.read(sample_bytes))
+    return h.hexdigest()
+
+def rules_version(rules):
+    """Stable hash of a (merged) rules dict, so any config change yields a new version."""
+    payload = json.dumps(rules, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+HASH_BLOCK_BYTES = 1 << 20
+_CODE_VERSION = None
+
+def content_hash(path, block_bytes=HASH_BLOCK_BYTES):
+    """Hash of every byte of the file (streamed), independent of name and mtime."""
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_bytes), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def code_version():
+    """
+    Hash of the pipeline's own source files, computed once per process, so a
+    code change invalidates results produced by the old code.
+    """
+    global _CODE_VERSION
+    if _CODE_VERSION is None:
+        here = os.path.dirname(os.path.abspath(__file__))
+        h = hashlib.blake2b(digest_size=8)
+        for name in sorted(os.listdir(here)):
+            if name.endswith(".py"):
+                with open(os.path.join(here, name), "rb") as f:
+                    h.update(name.encode() + b"\0" + f.read())
+        _CODE_VERSION = h.hexdigest()
+    return _CODE_VERSION
+
+def result_key(path, rules, *extra):
+    """Content-addressed key of a pipeline run: input bytes + rules + code (+ run options)."""
+    parts = [content_hash(path), rules_version(rules), code_version()] + [str(e) for e in extra]
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=16).hexdigest()
@@ -0,0 +1,151 @@
+# src/pipeline/jobs.py
+import os
+import json
+import time
+import uuid
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from .orchestrator import run_pipeline, BASE_DIR
+
+JOBS_DIR = os.path.join(BASE_DIR, "data", "jobs")
+UPLOAD_DIR = os.path.join(BASE_DIR, "data", "raw")
+DEFAULT_WORKERS = 2
+FINISHED = ("done", "gate_failed", "failed")
+
+# -------------------------
+# Job status files
+# -------------------------
+def _status_path(jobs_dir, job_id):
+    return os.path.join(jobs_dir, f"job_{job_id}.json")
+
+def _write_status(jobs_dir, job_id, **fields):
+    """
+    Merge `fields` into the job's status file. Written to a temp file and
+    renamed, so a reader polling from another process never sees half a file.
+    """
+    path = _status_path(jobs_dir, job_id)
+    status = read_status(jobs_dir, job_id) or {"job_id": job_id}
+    status.update(fields, updated_at=datetime.utcnow().isoformat())
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(status, f)
+    os.replace(tmp, path)
+    return status
+
+def read_status(jobs_dir, job_id):
+    """Latest status dict of a job, or None if it is unknown."""
+    try:
+        with open(_status_path(jobs_dir, job_id)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+# -------------------------
+# Worker side
+# -------------------------
+def _run_job(jobs_dir, job_id, path, kwargs):
+    """
+    Runs in a worker process: run_pipeline with its stage progress mirrored
+    into the job's status file. Returns the full result (previews included).
+    """
+    started = time.perf_counter()
+    _write_status(jobs_dir, job_id, status="running", stage="starting", rows=0)
+
+    def progress(info):
+        _write_status(jobs_dir, job_id, stage=info["stage"], stage_state=info["state"],
+                      rows=info["rows"], elapsed=round(time.perf_counter() - started, 1))
+
+    try:
+        result = run_pipeline(path, progress=progress, **kwargs)
+    except Exception as exc:
+        _write_status(jobs_dir, job_id, status="failed", error=f"{type(exc).__name__}: {exc}",
+                      elapsed=round(time.perf_counter() - started, 1))
+        raise
+    # the run finished, but a failed quality gate is not a successful job
+    gates = (result.get("report") or {}).get("gates") or {}
+    passed = gates.get("passed", True)
+    _write_status(jobs_dir, job_id, status="done" if passed else "gate_failed", stage="finished",
+                  error=None if passed else f"Quality gates failed: {'; '.join(gates['failures'])}",
+                  elapsed=round(time.perf_counter() - started, 1),
+                  report_path=result.get("report_path"), report=result.get("report"))
+    return result
+
+# -------------------------
+# Executor
+# -------------------------
+class JobManager:
+    """
+    Local background executor for pipeline runs. submit() returns a job ID
+    straight away; status() reads the progress the worker writes to
+    <jobs_dir>/job_<id>.json and result() returns the run_pipeline result
+    once the job has finished. Jobs run in separate processes, so several
+    runs proceed in parallel without holding up the caller.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, jobs_dir=JOBS_DIR, upload_dir=UPLOAD_DIR):
+        self.jobs_dir = jobs_dir
+        self.upload_dir = upload_dir
+        self.workers = workers
+        self._pool = None
+        self._futures = {}
+        os.makedirs(jobs_dir, exist_ok=True)
+
+    def _executor(self):
+        if self._pool is None:
+            # spawn, not fork: the caller (Streamlit) is multi-threaded
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def submit(self, path, **kwargs):
+        """Queue run_pipeline(path, **kwargs) -> job ID."""
+        return self._submit(uuid.uuid4().hex[:12], path, kwargs)
+
+    def submit_upload(self, file_name, data, **kwargs):
+        """
+        Save uploaded bytes as <upload_dir>/<job id>/<file_name> and queue a
+        run on them -> (job ID, saved path). Every job gets its own copy, so a
+        re-upload of the same file name never rewrites a running job's input;
+        the file name is kept, so per-dataset rules and drift baselines apply.
+        """
+        job_id = uuid.uuid4().hex[:12]
+        path = os.path.join(self.upload_dir, job_id, os.path.basename(file_name))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        return self._submit(job_id, path, kwargs), path
+
+    def _submit(self, job_id, path, kwargs):
+        _write_status(self.jobs_dir, job_id, status="queued", input_path=os.path.abspath(path),
+                      submitted_at=datetime.utcnow().isoformat())
+        self._futures[job_id] = self._executor().submit(_run_job, self.jobs_dir, job_id, path, kwargs)
+        return job_id
+
+    def status(self, job_id):
+        status = read_status(self.jobs_dir, job_id)
+        future = self._futures.get(job_id)
+        # a worker that died outright never gets to write "failed"
+        if status and future is not None and future.done() and status.get("status") not in FINISHED:
+            exc = future.exception()
+            status = _write_status(self.jobs_dir, job_id, status="failed" if exc else "done",
+                                   error=f"{type(exc).__name__}: {exc}" if exc else None)
+        return status
+
+    def result(self, job_id):
+        """run_pipeline result of a finished job, None while it is still running."""
+        future = self._futures.get(job_id)
+        if future is None or not future.done() or future.exception() is not None:
+            return None
+        return future.result()
+
+    def jobs(self):
+        """Status of every job submitted through this manager, newest first."""
+        statuses = [self.status(job_id) for job_id in self._futures]
+        return sorted((s for s in statuses if s), key=lambda s: s.get("submitted_at", ""), reverse=True)
+
+    def shutdown(self, wait=True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
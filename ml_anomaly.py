@@ -1,30 +1,274 @@
 from sklearn.ensemble import IsolationForest
 import pandas as pd
+import numpy as np
+import hashlib
+import joblib
+import json
+import os
+from datetime import datetime, timedelta
 
-def ml_anomaly_detection(df, contamination=0.05):
-    if df is None or df.empty:
-        return df, pd.DataFrame()
+from .failure_codes import ReasonCodes, attach_failures
 
-    numeric = df.select_dtypes(include="number")
-    if numeric.empty:
-        return df, pd.DataFrame()
+ANOMALY_REASON = "ML anomaly detected"
+MODEL_DEFAULTS = {
+    "contamination": 0.05,
+    "max_samples": "auto",
+    "max_fit_rows": 100000,
+    "n_jobs": None,
+    "refit_after_days": 7,
+    "refit_after_runs": None,
+    "persist": True,
+}
+
+def numeric_columns(df, schema=None):
+    """Numeric feature columns: taken from the run's schema when given, else from dtypes."""
+    if schema is None:
+        return list(df.select_dtypes(include="number").columns)
+    return [c for c, t in schema.items()
+            if t == "numeric" and c in df.columns and pd.api.types.is_numeric_dtype(df[c])]
+
+def ml_options(config):
+    """Model options from the `ml:` section of the rules, filled with MODEL_DEFAULTS."""
+    options = dict(MODEL_DEFAULTS)
+    options.update({k: v for k, v in (config or {}).items() if k in MODEL_DEFAULTS})
+    return options
+
+# -------------------------
+# Fit / score
+# -------------------------
+def fit_model(numeric, contamination=0.05, max_samples="auto", n_jobs=None,
+              max_fit_rows=100000, random_state=42):
+    """
+    Fit an IsolationForest on the numeric frame and return a model bundle.
+    Training uses at most `max_fit_rows` rows (evenly spaced), so fit cost,
+    including the contamination threshold pass, stays flat as inputs grow.
+    """
+    if max_fit_rows and len(numeric) > max_fit_rows:
+        numeric = numeric.iloc[np.linspace(0, len(numeric) - 1, max_fit_rows).astype(np.int64)]
+
+    fill_values = numeric.mean()
+    model = IsolationForest(
+        contamination=contamination, max_samples=max_samples,
+        n_jobs=n_jobs, random_state=random_state,
+    )
+    model.fit(numeric.fillna(fill_values).to_numpy())
+
+    return {
+        "model": model,
+        "columns": list(numeric.columns),
+        "fill_values": fill_values.fillna(0.0).to_dict(),
+        # predict() flags decision_function < 0, i.e. anomaly_score > -offset_
+        "threshold": float(-model.offset_),
+        "fitted_at": datetime.utcnow().isoformat(),
+    }
+
+def score_samples(bundle, df):
+    """Anomaly score per row (higher = more anomalous), comparable to bundle["threshold"]."""
+    X = df[bundle["columns"]].fillna(bundle["fill_values"]).to_numpy()
+    return -bundle["model"].score_samples(X)
+
+# -------------------------
+# Model store
+# -------------------------
+def feature_signature(columns):
+    return hashlib.blake2b(",".join(columns).encode(), digest_size=8).hexdigest()
+
+def _model_paths(model_dir, dataset, columns):
+    base = os.path.join(model_dir, f"{dataset}_{feature_signature(columns)}")
+    return f"{base}.joblib", f"{base}.json"
+
+def _runs_path(meta_path):
+    """Append-only run counter next to the meta file: one byte per served run."""
+    return f"{meta_path}.runs"
+
+def _replace_file(path, write):
+    """
+    write(tmp_path) then rename onto `path`, so a concurrent reader sees the
+    old file or the new one, never a partial write.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+def _needs_refit(meta, params, refit_after_days, refit_after_runs):
+    if meta is None or meta.get("params") != params:
+        return True
+    if refit_after_days is not None:
+        fitted_at = datetime.fromisoformat(meta["fitted_at"])
+        if datetime.utcnow() - fitted_at >= timedelta(days=refit_after_days):
+            return True
+    if refit_after_runs is not None and meta.get("runs", 0) >= refit_after_runs:
+        return True
+    return False
+
+_LOADED_MODELS = {}
+
+def _load_bundle(model_path):
+    """joblib.load memoized on (path, mtime): a long-lived worker unpickles each model once."""
+    key = (model_path, os.path.getmtime(model_path))
+    if key not in _LOADED_MODELS:
+        _LOADED_MODELS[key] = joblib.load(model_path)
+    return _LOADED_MODELS[key]
+
+def load_stored_model(model_dir, dataset, columns, params,
+                      refit_after_days=7, refit_after_runs=None):
+    """
+    Stored bundle for (dataset, columns) if it is still fresh, else None.
+    Every successful load counts as one run towards `refit_after_runs`.
+    """
+    model_path, meta_path = _model_paths(model_dir, dataset, columns)
+    if not (os.path.exists(model_path) and os.path.exists(meta_path)):
+        return None
+    with open(meta_path, "r") as f:
+        meta = json.load(f)
+    runs_path = _runs_path(meta_path)
+    meta["runs"] = meta.get("runs", 1) + (os.path.getsize(runs_path) if os.path.exists(runs_path) else 0)
+    if _needs_refit(meta, params, refit_after_days, refit_after_runs):
+        return None
 
-    model = IsolationForest(contamination=contamination, random_state=42)
-    model.fit(numeric.fillna(numeric.mean()))
+    bundle = _load_bundle(model_path)
+    # an O_APPEND write of one byte is atomic, so concurrent runs never lose a count
+    with open(runs_path, "ab") as f:
+        f.write(b".")
+    return bundle
+
+def save_model(model_dir, dataset, bundle, params):
+    os.makedirs(model_dir, exist_ok=True)
+    model_path, meta_path = _model_paths(model_dir, dataset, bundle["columns"])
+    _replace_file(model_path, lambda tmp: joblib.dump(bundle, tmp))
+    meta = {"fitted_at": bundle["fitted_at"], "params": params, "columns": bundle["columns"]}
+
+    def write_meta(tmp):
+        with open(tmp, "w") as f:
+            json.dump(meta, f, indent=2)
+    _replace_file(meta_path, write_meta)
+    # the fit itself is the model's first run
+    _replace_file(_runs_path(meta_path), lambda tmp: open(tmp, "wb").close())
+
+# -------------------------
+# Chunked (two-phase) scoring
+# -------------------------
+class ReservoirSample:
+    """
+    Uniform sample of at most `size` rows over a stream of frames
+    (Algorithm R, vectorized per frame). Holds only the sampled rows.
+    """
+
+    def __init__(self, columns, size=100000, random_state=42):
+        self.columns = list(columns)
+        self.size = size
+        self.seen = 0
+        self.rows = np.empty((0, len(self.columns)), dtype=float)
+        self.rng = np.random.default_rng(random_state)
+
+    def add(self, df):
+        values = df[self.columns].to_numpy(dtype=float, na_value=np.nan)
+        n = len(values)
+        if n == 0:
+            return
+
+        # fill the free slots first
+        free = max(0, min(self.size - self.seen, n))
+        if free:
+            self.rows = np.concatenate([self.rows, values[:free]])
+        rest = values[free:]
+        if len(rest):
+            # row i (0-based over the stream) replaces slot j ~ U[0, i] when j < size;
+            # for repeated slots the last row wins, as in the sequential algorithm
+            positions = np.arange(self.seen + free, self.seen + n)
+            slots = self.rng.integers(0, positions + 1)
+            keep = slots < self.size
+            slots, rest = slots[keep], rest[keep]
+            if len(slots):
+                last_slots, last_idx = np.unique(slots[::-1], return_index=True)
+                self.rows[last_slots] = rest[::-1][last_idx]
+        self.seen += n
+
+    def frame(self):
+        return pd.DataFrame(self.rows, columns=self.columns)
+
+
+class ChunkedAnomalyDetector:
+    """
+    Anomaly stage for the orchestrator. Phase one feeds rule-clean frames to
+    observe() to build a reservoir sample, fit() trains one model on it, and
+    phase two scores every frame with split() against that model's single
+    global threshold, so chunked runs flag the same rows a full in-memory run
+    would instead of ~contamination of every chunk. If a fresh stored model
+    exists for the dataset, phase one is skipped (needs_fit is False).
+    """
+
+    def __init__(self, columns, dataset, model_dir, contamination=0.05, max_samples="auto",
+                 n_jobs=None, max_fit_rows=100000, refit_after_days=7,
+                 refit_after_runs=None, persist=True):
+        self.columns = list(columns)
+        self.dataset = dataset
+        self.model_dir = model_dir
+        self.persist = persist
+        self.fit_kwargs = {"contamination": contamination, "max_samples": max_samples,
+                           "n_jobs": n_jobs, "max_fit_rows": None}
+        self.params = {"contamination": contamination, "max_samples": max_samples}
+        self.model = None
+        if persist:
+            self.model = load_stored_model(model_dir, dataset, self.columns, self.params,
+                                           refit_after_days, refit_after_runs)
+        self.reservoir = None if self.model is not None else ReservoirSample(self.columns, size=max_fit_rows)
+
+    @property
+    def needs_fit(self):
+        return self.model is None
+
+    def observe(self, df):
+        if self.reservoir is not None:
+            self.reservoir.add(df)
+
+    def fit(self):
+        sample = self.reservoir.frame()
+        if not sample.empty:
+            self.model = fit_model(sample, **self.fit_kwargs)
+            if self.persist:
+                save_model(self.model_dir, self.dataset, self.model, self.params)
+        self.reservoir = None
+        return self.model
+
+    def split(self, df, codes=None):
+        """(good, anomalies) for one frame, scored against the global threshold."""
+        if self.model is None:
+            return df, pd.DataFrame()
+        return ml_anomaly_detection(df, model=self.model, codes=codes)
+
+# -------------------------
+# Detection
+# -------------------------
+def ml_anomaly_detection(df, contamination=0.05, schema=None, model=None, codes=None):
+    """
+    Split df into (good, anomalies). With `model` (a bundle from fit_model /
+    ChunkedAnomalyDetector) rows are only scored; without one a model is fit on df.
+    Anomalies carry their `anomaly_score` and a failure_code into `codes`
+    (failure_reason text without a ReasonCodes).
+    """
+    if df is None or df.empty:
+        return df, pd.DataFrame()
 
-    preds = model.predict(numeric.fillna(numeric.mean()))
+    if model is None:
+        numeric = df[numeric_columns(df, schema)]
+        if numeric.empty:
+            return df, pd.DataFrame()
+        model = fit_model(numeric, contamination=contamination)
 
-    mask_bad = preds == -1
-    mask_good = preds == 1
+    scores = score_samples(model, df)
+    mask_bad = scores > model["threshold"]
 
     df_bad = df[mask_bad].copy()
-    df_good = df[mask_good].copy()
+    df_good = df[~mask_bad].copy()
 
     if not df_bad.empty:
-        df_bad["failure_reason"] = "ML anomaly detected"
+        book = codes if codes is not None else ReasonCodes()
+        attach_failures(df_bad, book.constant(ANOMALY_REASON, len(df_bad)), book, coded=codes is not None)
+        df_bad["anomaly_score"] = np.round(scores[mask_bad], 6)
 
     return df_good.reset_index(drop=True), df_bad.reset_index(drop=True)
 
 # backwards compatibility
-def detect_anomalies(df, contamination=0.05):
-    return ml_anomaly_detection(df, contamination)
+def detect_anomalies(df, contamination=0.05, schema=None, model=None):
+    return ml_anomaly_detection(df, contamination, schema=schema, model=model)
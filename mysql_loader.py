@@ -1,44 +1,395 @@
-import mysql.connector
-from mysql.connector import Error
+import os
+import csv
+import sqlite3
+import hashlib
+import tempfile
 import pandas as pd
 
-def load_to_mysql(df, table_name, db_config):
+try:
+    import mysql.connector
+    from mysql.connector import Error
+    from mysql.connector import pooling
+except ImportError:  # SQLite-only environments (tests, local runs)
+    mysql = None
+    Error = sqlite3.Error
 
+from .schema_detector import detect_schema
+from .rule_engine import parse_datetimes
+from .outputs import iter_output
+from .compaction import canonical_frame
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_BATCH_SIZE = 5000
+DELETE_BATCH_SIZE = 1000
+HASH_COLUMN = "_row_hash"
+
+# -------------------------
+# Adapters
+# -------------------------
+class MySQLAdapter:
+    """MySQL behind a reusable connection pool (one pool per db_config)."""
+    placeholder = "%s"
+    errors = (Error,)
+    supports_infile = True
+    types = {"integer": "BIGINT", "float": "DOUBLE", "boolean": "BOOLEAN",
+             "datetime": "DATETIME", "categorical": "VARCHAR(255)", "string": "TEXT"}
+    id_column = "id INT AUTO_INCREMENT PRIMARY KEY"
+
+    def __init__(self, db_config, pool_size=4):
+        config = dict(db_config)
+        config.setdefault("allow_local_infile", True)
+        name = hashlib.blake2b(repr(sorted(config.items())).encode(), digest_size=8).hexdigest()
+        self.pool = pooling.MySQLConnectionPool(pool_name=f"dq_{name}", pool_size=pool_size, **config)
+
+    def connect(self):
+        return self.pool.get_connection()
+
+    def release(self, conn):
+        conn.close()  # returns the connection to the pool
+
+    def quote(self, name):
+        return "`" + str(name).replace("`", "``") + "`"
+
+    def existing_columns(self, cur, table):
+        cur.execute(f"SHOW COLUMNS FROM {self.quote(table)}")
+        return {row[0] for row in cur.fetchall()}
+
+    def truncate(self, cur, table):
+        cur.execute(f"TRUNCATE TABLE {self.quote(table)}")
+
+    def ensure_index(self, cur, table, column):
+        cur.execute(f"SHOW INDEX FROM {self.quote(table)} WHERE Column_name = %s", (column,))
+        if cur.fetchall():
+            return
+        cur.execute(f"SHOW COLUMNS FROM {self.quote(table)} WHERE Field = %s", (column,))
+        row = cur.fetchone()
+        col_type = row[1] if row else ""
+        col_type = (col_type.decode() if isinstance(col_type, bytes) else str(col_type)).lower()
+        # TEXT / BLOB keys need a prefix length; MySQL rejects one on numeric / date columns
+        prefix = "(64)" if any(t in col_type for t in ("char", "text", "blob", "binary")) else ""
+        cur.execute(f"CREATE INDEX {self.quote('ix_' + column)} ON {self.quote(table)} "
+                    f"({self.quote(column)}{prefix})")
+
+
+class SQLiteAdapter:
+    """Local stand-in with the same interface, for tests and offline runs."""
+    placeholder = "?"
+    errors = (sqlite3.Error,)
+    supports_infile = False
+    types = {"integer": "INTEGER", "float": "REAL", "boolean": "INTEGER",
+             "datetime": "TEXT", "categorical": "TEXT", "string": "TEXT"}
+    id_column = "id INTEGER PRIMARY KEY AUTOINCREMENT"
+
+    def __init__(self, db_config):
+        self.conn = sqlite3.connect(db_config.get("database", ":memory:"), check_same_thread=False)
+
+    def connect(self):
+        return self.conn
+
+    def release(self, conn):
+        pass  # single long-lived connection
+
+    def quote(self, name):
+        return '"' + str(name).replace('"', '""') + '"'
+
+    def existing_columns(self, cur, table):
+        cur.execute(f"PRAGMA table_info({self.quote(table)})")
+        return {row[1] for row in cur.fetchall()}
+
+    def truncate(self, cur, table):
+        cur.execute(f"DELETE FROM {self.quote(table)}")
+
+    def ensure_index(self, cur, table, column):
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {self.quote(f'ix_{table}_{column}')} "
+                    f"ON {self.quote(table)} ({self.quote(column)})")
+
+
+_ADAPTERS = {}
+# errors of every engine, for handlers that must also cover creating the adapter
+DB_ERRORS = MySQLAdapter.errors + SQLiteAdapter.errors
+
+def get_adapter(db_config):
+    """
+    Adapter for db_config, created once and reused across loads.
+    `{"engine": "sqlite", "database": path}` selects SQLite, anything else MySQL.
+    """
+    key = repr(sorted(db_config.items()))
+    if key not in _ADAPTERS:
+        config = dict(db_config)
+        if config.pop("engine", "mysql") == "sqlite":
+            _ADAPTERS[key] = SQLiteAdapter(config)
+        else:
+            if mysql is None:
+                raise ImportError("mysql-connector-python is required for MySQL loads")
+            _ADAPTERS[key] = MySQLAdapter(config, pool_size=config.pop("pool_size", 4))
+    return _ADAPTERS[key]
+
+# -------------------------
+# Typed columns
+# -------------------------
+def column_types(df, schema=None):
+    """{column: generic SQL type} from the detect_schema types and the column dtypes."""
+    schema = schema or detect_schema(df)
+    types = {}
+    for col in df.columns:
+        kind = schema.get(col, "string")
+        if kind == "numeric":
+            if pd.api.types.is_bool_dtype(df[col]):
+                kind = "boolean"
+            elif pd.api.types.is_integer_dtype(df[col]):
+                kind = "integer"
+            else:
+                kind = "float"
+        types[col] = kind
+    return types
+
+def _batch_rows(df, types):
+    """
+    Rows of one batch as tuples of plain Python values, NaN -> None.
+    Datetime columns are parsed like the rule engine's datetime check; a
+    non-null value that still is no date loads as NULL and is logged.
+    """
+    out = df.copy()
+    for col, kind in types.items():
+        if kind == "datetime":
+            parsed = parse_datetimes(out[col])
+            lost = parsed.isna() & out[col].notna()
+            if lost.any():
+                logger.warning(f"{col}: {int(lost.sum())} value(s) are not dates and load as NULL "
+                               f"(e.g. {out[col][lost].iloc[0]!r})")
+            out[col] = parsed.dt.strftime("%Y-%m-%d %H:%M:%S")
+    out = out.astype(object).where(out.notna(), None)
+    return list(out.itertuples(index=False, name=None))
+
+def _prepare_table(adapter, cur, table_name, columns, types):
+    q = adapter.quote
+    create_cols = ", ".join(f"{q(col)} {adapter.types[types[col]]}" for col in columns)
+    cur.execute(f"CREATE TABLE IF NOT EXISTS {q(table_name)} ({adapter.id_column}, {create_cols})")
+
+    existing_cols = adapter.existing_columns(cur, table_name)
+    for col in columns:
+        if col not in existing_cols:
+            cur.execute(f"ALTER TABLE {q(table_name)} ADD COLUMN {q(col)} {adapter.types[types[col]]}")
+
+# -------------------------
+# Load paths
+# -------------------------
+def _insert_batches(adapter, conn, cur, table_name, frames, types, batch_size, commit=True):
+    """executemany in batches; commit=False leaves committing to the caller's transaction."""
+    q = adapter.quote
+    loaded = 0
+    insert_sql = None
+    for frame in frames:
+        if insert_sql is None:
+            cols = ", ".join(q(c) for c in frame.columns)
+            placeholders = ", ".join([adapter.placeholder] * len(frame.columns))
+            insert_sql = f"INSERT INTO {q(table_name)} ({cols}) VALUES ({placeholders})"
+        for start in range(0, len(frame), batch_size):
+            cur.executemany(insert_sql, _batch_rows(frame.iloc[start:start + batch_size], types))
+            if commit:
+                conn.commit()
+            loaded += min(batch_size, len(frame) - start)
+    return loaded
+
+def _load_infile(adapter, conn, cur, table_name, frames, types):
+    """Spool the frames to one temp CSV and send it with LOAD DATA LOCAL INFILE."""
+    fd, tmp_path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    loaded = 0
+    columns = None
+    try:
+        for i, frame in enumerate(frames):
+            columns = list(frame.columns)
+            rows = pd.DataFrame(_batch_rows(frame, types), columns=columns)
+            for col in rows.columns:
+                if rows[col].dtype == object:
+                    # backslash is MySQL's escape char; \N (na_rep) stays the NULL marker
+                    rows[col] = rows[col].map(lambda v: v.replace("\\", "\\\\") if isinstance(v, str) else v)
+            rows.to_csv(tmp_path, mode="w" if i == 0 else "a", header=False, index=False,
+                        na_rep="\\N", quoting=csv.QUOTE_MINIMAL, lineterminator="\n")
+            loaded += len(frame)
+        if columns:
+            cols = ", ".join(adapter.quote(c) for c in columns)
+            cur.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {adapter.quote(table_name)} "
+                "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+                f"LINES TERMINATED BY '\\n' ({cols})",
+                (tmp_path,),
+            )
+            conn.commit()
+    finally:
+        os.remove(tmp_path)
+    return loaded
+
+def bulk_load(frames, table_name, db_config, schema=None, batch_size=DEFAULT_BATCH_SIZE,
+              method="batch", truncate=True):
+    """
+    Load an iterable of DataFrames (a whole frame or CSV chunks) into
+    `table_name` with typed columns derived from the schema of the first
+    frame. method="batch" sends executemany batches of `batch_size` rows,
+    method="infile" spools one file for LOAD DATA LOCAL INFILE (MySQL only,
+    falls back to batches elsewhere). Returns the number of rows loaded.
+    """
+    adapter = get_adapter(db_config)
+    frames = iter(frames)
+    first = next(frames, None)
+    if first is None:
+        return 0
+
+    def all_frames():
+        yield first
+        yield from frames
+
+    types = column_types(first, schema)
+    conn = adapter.connect()
     try:
-        conn = mysql.connector.connect(**db_config)
         cur = conn.cursor()
+        _prepare_table(adapter, cur, table_name, list(first.columns), types)
+        if truncate:
+            adapter.truncate(cur, table_name)
+            conn.commit()
 
-        # Create table if not exists
-        create_cols = ", ".join([f"{col} TEXT" for col in df.columns])
-        cur.execute(f"""
-            CREATE TABLE IF NOT EXISTS {table_name} (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                {create_cols}
-            )
-        """)
+        if method == "infile" and adapter.supports_infile:
+            loaded = _load_infile(adapter, conn, cur, table_name, all_frames(), types)
+        else:
+            loaded = _insert_batches(adapter, conn, cur, table_name, all_frames(), types, batch_size)
+        cur.close()
+    finally:
+        adapter.release(conn)
+    return loaded
 
-        # Ensure all columns exist
-        cur.execute(f"SHOW COLUMNS FROM {table_name}")
-        existing_cols = {row[0] for row in cur.fetchall()}
+def load_to_mysql(df, table_name, db_config, schema=None, batch_size=DEFAULT_BATCH_SIZE,
+                  method="batch", key=None):
+    """
+    Full reload (truncate + bulk insert) by default; with `key` set, a delta
+    load that only sends rows inserted, changed or deleted since the last load.
+    """
+    try:
+        if key:
+            return delta_load(df, table_name, db_config, key, schema=schema, batch_size=batch_size)
+        loaded = bulk_load([df], table_name, db_config, schema=schema, batch_size=batch_size, method=method)
+        print(f"Loaded {loaded} rows into {table_name}")
+        return loaded
+    except DB_ERRORS as e:
+        print("MYSQL ERROR:", e)
+        return 0
 
-        for col in df.columns:
-            if col not in existing_cols:
-                cur.execute(f"ALTER TABLE {table_name} ADD COLUMN {col} TEXT")
+def load_output_to_mysql(path, table_name, db_config, columns=None, filters=None, chunksize=50000,
+                         schema=None, batch_size=DEFAULT_BATCH_SIZE, method="batch"):
+    """
+    Load a pipeline output (CSV file or Parquet / Arrow run directory) in
+    chunks, so it is never fully in memory. For columnar outputs only
+    `columns` are read and `filters` ([(col, op, value), ...]) skip row
+    groups by their statistics.
+    """
+    try:
+        frames = iter_output(path, columns=columns, filters=filters, batch_rows=chunksize)
+        loaded = bulk_load(frames, table_name, db_config, schema=schema,
+                           batch_size=batch_size, method=method)
+        print(f"Loaded {loaded} rows into {table_name}")
+        return loaded
+    except DB_ERRORS as e:
+        print("MYSQL ERROR:", e)
+        return 0
 
-        # Truncate before reload
-        cur.execute(f"TRUNCATE TABLE {table_name}")
+def load_csv_to_mysql(path, table_name, db_config, chunksize=50000, schema=None,
+                      batch_size=DEFAULT_BATCH_SIZE, method="batch"):
+    """Load a (cleaned output) CSV in chunks, so the file is never fully in memory."""
+    return load_output_to_mysql(path, table_name, db_config, chunksize=chunksize, schema=schema,
+                                batch_size=batch_size, method=method)
 
-        # Insert data
-        cols = ", ".join(df.columns)
-        placeholders = ", ".join(["%s"] * len(df.columns))
+# -------------------------
+# Delta (upsert) loads
+# -------------------------
+def row_hashes(df, key):
+    """
+    Vectorized 64-bit content hash per row over every non-key column (sorted by
+    name, so column order does not matter), as signed int64 to fit BIGINT.
+    Dtypes are normalized first (compaction.canonical_frame), so a compacted
+    frame hashes like the uncompacted one it was loaded from before.
+    """
+    value_cols = sorted(c for c in df.columns if c != key and c != HASH_COLUMN)
+    hashes = pd.util.hash_pandas_object(canonical_frame(df[value_cols]), index=False)
+    return hashes.to_numpy().view("int64")
 
-        insert_sql = f"INSERT INTO {table_name} ({cols}) VALUES ({placeholders})"
-        cur.executemany(insert_sql, df.astype(str).values.tolist())
+def plan_delta(df, previous, key):
+    """
+    df       -> new frame (must contain `key`)
+    previous -> frame of (key, HASH_COLUMN) from the last load
+    Returns (to_insert, to_update, delete_keys): new rows, changed rows and
+    the stored key values of changed + vanished rows (to delete first).
+    """
+    new = df.drop_duplicates(subset=[key], keep="last").copy()
+    new[HASH_COLUMN] = row_hashes(new, key)
+    new_keys = new[key].astype(str)
 
+    prev_keys = previous[key].astype(str)
+    prev_hash = pd.Series(previous[HASH_COLUMN].to_numpy(), index=prev_keys)
+    prev_hash = prev_hash[~prev_hash.index.duplicated(keep="last")]
+
+    known = new_keys.isin(prev_hash.index)
+    old_hash = prev_hash.reindex(new_keys[known]).to_numpy()
+    changed = new.loc[known, HASH_COLUMN].to_numpy() != old_hash
+
+    to_insert = new[~known.to_numpy()]
+    to_update = new[known.to_numpy()][changed]
+
+    gone = ~prev_keys.isin(new_keys)
+    stale = prev_keys.isin(to_update[key].astype(str))
+    delete_keys = previous.loc[(gone | stale).to_numpy(), key].tolist()
+    return to_insert, to_update, delete_keys
+
+def delta_load(df, table_name, db_config, key, schema=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Incremental load keyed by the business column `key` (e.g. customer_id).
+    Each stored row carries a content hash; only inserted, changed and deleted
+    rows are sent (changed rows as delete + insert, which works the same on
+    every adapter). The deletes and inserts are one transaction, so a load
+    that fails partway leaves the table as it was.
+    Returns a dict of inserted / updated / deleted / unchanged counts.
+    """
+    if key not in df.columns:
+        raise ValueError(f"Delta key column not in frame: {key}")
+
+    adapter = get_adapter(db_config)
+    q = adapter.quote
+    types = column_types(df, schema)
+    types[HASH_COLUMN] = "integer"
+
+    conn = adapter.connect()
+    try:
+        cur = conn.cursor()
+        _prepare_table(adapter, cur, table_name, list(df.columns) + [HASH_COLUMN], types)
+        adapter.ensure_index(cur, table_name, key)
         conn.commit()
+
+        cur.execute(f"SELECT {q(key)}, {q(HASH_COLUMN)} FROM {q(table_name)}")
+        previous = pd.DataFrame(cur.fetchall(), columns=[key, HASH_COLUMN])
+
+        to_insert, to_update, delete_keys = plan_delta(df, previous, key)
+
+        try:
+            for start in range(0, len(delete_keys), DELETE_BATCH_SIZE):
+                batch = delete_keys[start:start + DELETE_BATCH_SIZE]
+                placeholders = ", ".join([adapter.placeholder] * len(batch))
+                cur.execute(f"DELETE FROM {q(table_name)} WHERE {q(key)} IN ({placeholders})", batch)
+            changed = pd.concat([to_insert, to_update])
+            _insert_batches(adapter, conn, cur, table_name, [changed], types, batch_size, commit=False)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
         cur.close()
-        conn.close()
-        print(f"Loaded {len(df)} rows into {table_name}")
+    finally:
+        adapter.release(conn)
 
-    except Error as e:
-        print("MYSQL ERROR:", e)
+    stats = {
+        "inserted": len(to_insert),
+        "updated": len(to_update),
+        "deleted": len(delete_keys) - len(to_update),
+        "unchanged": len(df) - len(to_insert) - len(to_update),
+    }
+    print(f"Delta load into {table_name}: {stats}")
+    return stats
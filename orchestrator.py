@@ -1,38 +1,166 @@
 # src/pipeline/orchestrator.py
 import os
+import copy
+import uuid
 import yaml
 import pandas as pd
 from datetime import datetime
 
-from .rule_engine import apply_rules
-from .schema_detector import detect_schema
-from .ml_anomaly import detect_anomalies
-from .quarantine import quarantine_rows
+from .rule_engine import apply_plan, compile_rules, load_rules
+from .schema_detector import detect_schema_cached, schema_types, ZERO_PADDED, SAMPLE_SIZE
+from .fingerprint import file_fingerprint, rules_version, result_key
+from .ml_anomaly import ChunkedAnomalyDetector, ml_options, numeric_columns
+from .quarantine import quarantine_rows, new_quarantine_path, append_quarantine
+from .quality_report import build_report, save_report, check_gates
+from .profiling import StageProfiler
+from .compaction import compact_frame, compact_options
+from .outputs import output_options, output_path, write_part, touch_output, read_output
+from .run_history import record_run, record_profile, recent_profiles
+from .result_cache import load_cached_result, save_cached_result, link_artifact
+from .reference_index import reference_versions
+from .dedup import Deduplicator
+from .failure_codes import ReasonCodes, CODE_COLUMN, render_reasons
+from .column_profile import FrameProfile
+from .drift import baseline_profile, compare_profiles, drift_options
 
 # -------------------------
 # Paths (resolve from file)
 # -------------------------
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 CONFIG_PATH = os.path.join(BASE_DIR, "config", "default_rules.yml")
+RULES_DIR = os.path.join(BASE_DIR, "config", "rules")
 RAW_DIR = os.path.join(BASE_DIR, "data", "raw")
 CLEAN_DIR = os.path.join(BASE_DIR, "data", "clean")
 QUARANTINE_DIR = os.path.join(BASE_DIR, "data", "quarantine")
+REPORTS_DIR = os.path.join(BASE_DIR, "data", "reports")
+SCHEMA_CACHE_DIR = os.path.join(BASE_DIR, "data", "cache", "schema")
+RESULT_CACHE_DIR = os.path.join(BASE_DIR, "data", "cache", "results")
+MODELS_DIR = os.path.join(BASE_DIR, "data", "models")
+HISTORY_DB = os.path.join(REPORTS_DIR, "history.sqlite")
+PREVIEW_ROWS = 200
 os.makedirs(RAW_DIR, exist_ok=True)
 os.makedirs(CLEAN_DIR, exist_ok=True)
 os.makedirs(QUARANTINE_DIR, exist_ok=True)
 
+def data_paths(data_dir=None):
+    """
+    Where a run writes: outputs, reports + history, caches and the model
+    store. data_dir=None is the project's data/ directory; any other root
+    (e.g. a benchmark's scratch dir) gets the same layout beneath it.
+    """
+    if data_dir is None:
+        return {"clean": CLEAN_DIR, "quarantine": QUARANTINE_DIR, "reports": REPORTS_DIR,
+                "schema_cache": SCHEMA_CACHE_DIR, "result_cache": RESULT_CACHE_DIR,
+                "models": MODELS_DIR, "history": HISTORY_DB}
+    reports = os.path.join(data_dir, "reports")
+    return {"clean": os.path.join(data_dir, "clean"),
+            "quarantine": os.path.join(data_dir, "quarantine"),
+            "reports": reports,
+            "schema_cache": os.path.join(data_dir, "cache", "schema"),
+            "result_cache": os.path.join(data_dir, "cache", "results"),
+            "models": os.path.join(data_dir, "models"),
+            "history": os.path.join(reports, "history.sqlite")}
+
 # -------------------------
 # Robust CSV loader
 # -------------------------
-def load_csv_safely(path):
+ENCODING_SAMPLE_BYTES = 1 << 20
+FALLBACK_ENCODINGS = ["utf-8", "utf-8-sig", "latin1", "cp1252", "ISO-8859-1", "macroman"]
+
+def detect_encoding(path, sample_size=ENCODING_SAMPLE_BYTES):
+    """
+    Pick the encoding from the first `sample_size` bytes without parsing:
+    BOM -> utf-8-sig, valid UTF-8 -> utf-8, anything else -> latin1 (which is
+    where the old try-every-encoding chain ended up for non-UTF-8 input).
+    """
+    import codecs
+    with open(path, "rb") as f:
+        sample = f.read(sample_size)
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        # a sample cut mid-character is fine unless it is the whole file
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=len(sample) < sample_size)
+    except UnicodeDecodeError:
+        return "latin1"
+    return "utf-8"
+
+def zero_padded_columns(path, encoding, sample_rows=SAMPLE_SIZE):
+    """
+    Columns whose text in the first `sample_rows` rows has zero-padded
+    numbers ("007", "-0012"). Every reader (pyarrow, C engine, chunks) reads
+    them as strings: parsed as numbers the padding would be gone before
+    schema detection could keep them as identifiers.
+    """
+    try:
+        sample = pd.read_csv(path, encoding=encoding, encoding_errors="replace", nrows=sample_rows,
+                             dtype=str, keep_default_na=False)
+    except (pd.errors.EmptyDataError, pd.errors.ParserError):
+        return []
+    return [col for col in sample.columns if sample[col].str.match(ZERO_PADDED).any()]
+
+def _read_csv_arrow(path, encoding, text_columns=()):
+    """
+    Multithreaded pyarrow parse, converted to the frame the C engine would
+    give: empty fields become NaN and date/time columns stay as the original
+    text. pyarrow infers column types from the first block; columns it would
+    read as dates, times or timestamps are read as strings instead, since
+    casting them back to text would rewrite it ("2024-01-05T10:00" ->
+    "2024-01-05 10:00:00"). `text_columns` are read as strings as well.
     """
-    Try multiple encodings and return a pandas.DataFrame.
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+
+    read_options = pacsv.ReadOptions(encoding=encoding, use_threads=True)
+    with pacsv.open_csv(path, read_options=read_options) as reader:
+        column_types = {field.name: pa.string() for field in reader.schema
+                        if pa.types.is_temporal(field.type) or field.name in text_columns}
+    table = pacsv.read_csv(
+        path,
+        read_options=read_options,
+        convert_options=pacsv.ConvertOptions(strings_can_be_null=True, column_types=column_types),
+    )
+    # pyarrow does not fail on bytes invalid in `encoding`: the column comes out binary
+    binary = [field.name for field in table.schema if pa.types.is_binary(field.type)]
+    if binary:
+        raise UnicodeError(f"columns {binary} are not valid {encoding}")
+    return table.to_pandas()
+
+def _default_engine():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return "c"
+    return "pyarrow"
+
+def load_csv_safely(path, engine=None):
+    """
+    Detect the encoding once from a byte sample, then parse the file a single
+    time with the pyarrow reader (when installed) or pandas' C engine.
+    Bytes invalid in the detected encoding further into the file make the
+    fast parse retry as latin1; any other failure falls back to trying
+    multiple encodings. Zero-padded columns are read as strings.
     Raises ValueError if none succeed.
     """
-    encodings = ["utf-8", "utf-8-sig", "latin1", "cp1252", "ISO-8859-1", "macroman"]
-    for enc in encodings:
+    engine = engine or _default_engine()
+    encoding = detect_encoding(path)
+    text_columns = zero_padded_columns(path, encoding)
+    dtype = {col: str for col in text_columns}
+    # UTF-8 in the sample but not further in: latin1, as stream_encoding decides
+    for enc in [encoding] + (["latin1"] if encoding != "latin1" else []):
         try:
-            return pd.read_csv(path, encoding=enc, engine="python")
+            if engine == "pyarrow":
+                return _read_csv_arrow(path, enc, text_columns)
+            return pd.read_csv(path, encoding=enc, engine=engine, dtype=dtype)
+        except UnicodeError:
+            continue
+        except Exception:
+            break
+
+    # Slow path: the sample guessed wrong (or the fast parser choked)
+    for enc in FALLBACK_ENCODINGS:
+        try:
+            return pd.read_csv(path, encoding=enc, engine="python", dtype=dtype)
         except Exception:
             continue
     # As a last resort, try reading as binary and decoding manually (very permissive)
@@ -41,65 +169,548 @@ def load_csv_safely(path):
             raw = f.read()
         text = raw.decode("utf-8", errors="replace")
         from io import StringIO
-        return pd.read_csv(StringIO(text))
+        return pd.read_csv(StringIO(text), dtype=dtype)
     except Exception as e:
         raise ValueError(f"Could not decode CSV file {path}: {e}")
 
+_STREAM_ENCODINGS = {}
+
+def stream_encoding(path, block_bytes=ENCODING_SAMPLE_BYTES):
+    """
+    Encoding for a chunked read, checked over the whole file: a file that is
+    UTF-8 in the byte sample but not further in is read as latin1, the
+    encoding the whole-file loader falls back to for it. Decoding only, no
+    parse; memoized on (path, size, mtime) since a streaming run reads the
+    file more than once.
+    """
+    import codecs
+    st = os.stat(path)
+    key = (path, st.st_size, st.st_mtime_ns)
+    if key not in _STREAM_ENCODINGS:
+        encoding = detect_encoding(path)
+        if encoding != "latin1" and st.st_size > ENCODING_SAMPLE_BYTES:
+            decoder = codecs.getincrementaldecoder(encoding)()
+            try:
+                with open(path, "rb") as f:
+                    for block in iter(lambda: f.read(block_bytes), b""):
+                        decoder.decode(block)
+                decoder.decode(b"", final=True)
+            except UnicodeDecodeError:
+                encoding = "latin1"
+        _STREAM_ENCODINGS[key] = encoding
+    return _STREAM_ENCODINGS[key]
+
+def iter_csv_chunks(path, chunksize):
+    """
+    Yield DataFrames of at most `chunksize` rows from the CSV at `path`, in
+    the encoding stream_encoding checked over the whole file (decoding is
+    strict: no byte is silently replaced), zero-padded columns as strings
+    like the whole-file loader.
+    """
+    encoding = stream_encoding(path)
+    dtype = {col: str for col in zero_padded_columns(path, encoding)}
+    try:
+        reader = pd.read_csv(path, encoding=encoding, chunksize=chunksize, dtype=dtype)
+    except pd.errors.EmptyDataError:
+        return
+    with reader:
+        for chunk in reader:
+            yield chunk
+
 # -------------------------
 # Load YAML rules
 # -------------------------
+_RULES_CACHE = {}
+
 def load_default_rules():
     if not os.path.exists(CONFIG_PATH):
         raise FileNotFoundError(f"Rules file not found: {CONFIG_PATH}")
     with open(CONFIG_PATH, "r") as f:
         return yaml.safe_load(f)
 
+def _cached_rules(paths):
+    """
+    load_rules memoized on the (path, mtime) of every file involved, so a
+    long-lived process (batch worker, dashboard) parses the YAML once.
+    """
+    stamp = tuple((p, os.path.getmtime(p)) for p in paths if p and os.path.exists(p))
+    if stamp not in _RULES_CACHE:
+        _RULES_CACHE[stamp] = load_rules(paths[0], override_paths=paths[1:])
+    return copy.deepcopy(_RULES_CACHE[stamp])
+
+def dataset_name(path):
+    """Dataset name used for per-dataset config: the input file name without extension."""
+    return os.path.splitext(os.path.basename(path))[0]
+
+def load_pipeline_rules(path, rules_path=None):
+    """
+    Default rules, then config/rules/<dataset>.yml if present, then an explicit
+    `rules_path` override on top.
+    """
+    if not os.path.exists(CONFIG_PATH):
+        raise FileNotFoundError(f"Rules file not found: {CONFIG_PATH}")
+    dataset_rules = os.path.join(RULES_DIR, f"{dataset_name(path)}.yml")
+    return _cached_rules([CONFIG_PATH, dataset_rules, rules_path])
+
+def new_run_id():
+    """UTC timestamp plus a short random suffix: unique even for parallel runs in the same second."""
+    return f"{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}_{uuid.uuid4().hex[:6]}"
+
 # -------------------------
 # Main pipeline
 # -------------------------
-def run_pipeline(path):
+def _schema_for(df, path, rules, paths):
+    """
+    (schema, confidence) for this input, inferred once and cached per
+    (file fingerprint, rules version, rows inferred from): a streaming run
+    infers from its first chunk, a whole-file run from every row, and the
+    two must not serve each other's schema.
+    """
+    key = f"{file_fingerprint(path)}_{rules_version(rules)}_{len(df)}"
+    info, _ = detect_schema_cached(df, key, paths["schema_cache"])
+    return schema_types(info), {col: meta["confidence"] for col, meta in info.items()}
+
+def _anomaly_stage(df, path, rules, schema, paths, n_jobs=None):
+    """
+    ChunkedAnomalyDetector for this run, or None when ML is disabled or the
+    schema has no numeric columns to score.
+    """
+    config = rules.get("ml") or {}
+    if not config.get("enabled", True):
+        return None
+    columns = numeric_columns(df, schema)
+    if not columns:
+        return None
+    options = ml_options(config)
+    if n_jobs is not None:
+        options["n_jobs"] = n_jobs
+    return ChunkedAnomalyDetector(columns, dataset_name(path), paths["models"], **options)
+
+def _rule_options(rules):
+    """Parallelism settings for rule evaluation from the `pipeline:` section."""
+    config = rules.get("pipeline") or {}
+    return {"workers": int(config.get("rule_workers") or 1),
+            "executor": config.get("rule_executor") or "thread"}
+
+def _process_frame(df, plan, detector, rule_options, profiler, codes):
+    """Rules then ML on one frame (whole file or one chunk) -> (clean, bad, anomalies)."""
+    with profiler.stage("rules", rows=len(df)):
+        df_clean, df_bad = apply_plan(df, plan, codes=codes, **rule_options)
+    if detector is None:
+        return df_clean, df_bad, pd.DataFrame()
+    with profiler.stage("ml_score", rows=len(df_clean)):
+        df_clean, df_anomalies = detector.split(df_clean, codes=codes)
+    return df_clean, df_bad, df_anomalies
+
+def _compact(df, schema, rules, profiler):
+    """Ingest-time dtype compaction (see compaction.compact_frame) unless switched off."""
+    options = compact_options(rules.get("pipeline"))
+    if not options["enabled"]:
+        return df
+    with profiler.stage("compact", rows=len(df)):
+        return compact_frame(df, schema, arrow_strings=options["arrow_strings"])
+
+def _dedup_stage(rules):
+    """Deduplicator configured from the `dedup:` section, or None when switched off."""
+    config = rules.get("dedup") or {}
+    if not config.get("enabled", True):
+        return None
+    return Deduplicator(**config)
+
+def _dedup(df, deduplicator, profiler, codes):
+    """Split exact / near duplicates off `df` -> (kept, duplicates)."""
+    if deduplicator is None:
+        return df, pd.DataFrame()
+    with profiler.stage("dedup", rows=len(df)):
+        return deduplicator.split(df, codes=codes)
+
+def _column_profile(rules, schema):
+    """FrameProfile for the run's input, or None when `pipeline.column_profile` is off."""
+    if not (rules.get("pipeline") or {}).get("column_profile", True):
+        return None
+    return FrameProfile(schema)
+
+def _update_profile(column_profile, df, profiler):
+    """Fold one frame (whole input or one chunk) into the column profile."""
+    if column_profile is not None:
+        with profiler.stage("column_profile", rows=len(df)):
+            column_profile.update(df)
+
+def _check_report(report, column_profile, path, rules, profiler, paths):
+    """
+    Add the column profile to the report, compare it with the rolling
+    baseline of this dataset's stored profiles (report["drift"], from the
+    sketches only) and apply the pipeline's quality gates (report["gates"]).
+    """
+    if column_profile is not None:
+        report["columns"] = column_profile.to_dict()
+        options = drift_options(rules.get("drift"))
+        if options["enabled"]:
+            with profiler.stage("drift"):
+                stored = recent_profiles(paths["history"], dataset_name(path), options["baseline_runs"])
+                if stored and len(stored) >= options["min_baseline_runs"]:
+                    report["drift"] = compare_profiles(column_profile, baseline_profile(stored),
+                                                       options, baseline_runs=len(stored))
+    report["gates"] = check_gates(report, rules.get("pipeline"))
+
+def _fit_detector(detector, df_clean, profiler):
+    """Fit the anomaly model on this frame unless a stored one is being reused."""
+    if detector is not None and detector.needs_fit:
+        with profiler.stage("ml_fit", rows=len(df_clean)):
+            detector.observe(df_clean)
+            detector.fit()
+
+def _profiler(rules, progress=None):
+    """
+    StageProfiler configured from `pipeline.profile_memory`. `progress`, if
+    given, is called with {"stage", "state", "rows"} as stages start and end.
+    """
+    config = rules.get("pipeline") or {}
+    listener = None
+    if progress is not None:
+        listener = lambda stage, state, rows: progress({"stage": stage, "state": state, "rows": rows})
+    return StageProfiler(memory=config.get("profile_memory") or "rss", listener=listener)
+
+def _finish_profile(profiler, rules, report, ts, paths):
+    """
+    Attach stage metrics to the report, log them and, if `pipeline.chrome_trace`
+    is set, export a Chrome trace next to the report -> trace path or None.
+    """
+    profiler.close()
+    report["stages"] = profiler.summary()
+    profiler.log()
+    if not (rules.get("pipeline") or {}).get("chrome_trace"):
+        return None
+    return profiler.save_chrome_trace(os.path.join(paths["reports"], f"trace_{ts}.json"))
+
+def _extend_preview(preview, frames, n):
+    """Top up `preview` (a frame or None) with leading rows from `frames` until it has n rows."""
+    have = 0 if preview is None else len(preview)
+    parts = [preview] if preview is not None else []
+    for frame in frames:
+        if have >= n:
+            break
+        if frame is not None and len(frame):
+            parts.append(frame.head(n - have))
+            have += len(parts[-1])
+    return pd.concat(parts, ignore_index=True) if parts else preview
+
+def _tally_codes(codes, tally, frames):
+    """Add the failure_code counts of `frames` onto `tally` (rows per code, see ReasonCodes.tally)."""
+    for frame in frames:
+        if frame is not None and CODE_COLUMN in frame.columns:
+            tally = codes.tally(frame[CODE_COLUMN].to_numpy(), tally)
+    return tally
+
+def _failure_summary(codes, tally, report):
+    """
+    Store the reason dictionary (with rows per code) in the report, so the
+    quarantine's failure codes stay readable -> (rows per reason, rows per column).
+    """
+    tally = tally if tally is not None else codes.tally([])
+    report["failure_codes"] = codes.to_dict(tally)
+    return codes.reason_counts(tally), codes.column_counts(tally)
+
+def _publish_report(report, ts, path, paths):
     """
-    path -> CSV file path (absolute or relative)
-    Returns dict with summary and output paths.
+    Write the report JSON, append the run to the indexed history and store its
+    column profile as a drift baseline for later runs -> report path.
+    """
+    report_path = save_report(report, paths["reports"], ts)
+    record_run(paths["history"], report, report_path, input_path=path, run_id=ts)
+    if report.get("columns"):
+        record_profile(paths["history"], ts, dataset_name(path), report["timestamp"], report["columns"])
+    return report_path
+
+def _profiled_chunks(path, chunksize, profiler):
+    """iter_csv_chunks with the read of each chunk timed as `load_csv`."""
+    chunks = iter_csv_chunks(path, chunksize)
+    while True:
+        with profiler.stage("load_csv") as rec:
+            chunk = next(chunks, None)
+            rec["rows"] = 0 if chunk is None else len(chunk)
+        if chunk is None:
+            return
+        yield chunk
+
+def run_pipeline(path, rules_path=None, chunksize=None, n_jobs=None, preview_rows=PREVIEW_ROWS,
+                 progress=None, use_cache=True, data_dir=None):
+    """
+    path         -> CSV file path (absolute or relative)
+    rules_path   -> optional YAML file layered on top of the default and dataset rules
+    chunksize    -> if set, stream the file in chunks of this many rows with flat memory
+    n_jobs       -> overrides ml.n_jobs (batch workers pin it to 1)
+    preview_rows -> size of the clean / quarantine preview frames in the result
+    progress     -> optional callable({"stage", "state", "rows"}) for live progress
+    use_cache    -> reuse the artifacts of an earlier run on identical input bytes,
+                    rules and code (pipeline.result_cache); False always runs
+    data_dir     -> root for outputs, reports, run history, caches and models
+                    (default: the project's data/, see data_paths)
+    Returns dict with summary, output paths, previews and failure reason counts,
+    so callers never need to re-read the outputs.
     """
     path = os.path.abspath(path)
     if not os.path.exists(path):
         raise FileNotFoundError(f"Input file not found: {path}")
 
+    # Load validation rules (defaults + dataset / explicit overrides)
+    rules = load_pipeline_rules(path, rules_path)
+    paths = data_paths(data_dir)
+
+    # Content-addressed result cache: a hit costs one pass of hashing the input
+    profiler = _profiler(rules, progress)
+    cache = _cache_options(rules) if use_cache else {"enabled": False}
+    key = None
+    if cache["enabled"]:
+        with profiler.stage("cache_lookup"):
+            key = result_key(path, rules, f"chunksize={chunksize or 0}", *reference_versions(rules))
+            cached = load_cached_result(paths["result_cache"], key)
+        if cached is not None:
+            return _cache_hit(cached, path, profiler, preview_rows, paths)
+
+    if chunksize:
+        result = _run_streaming(path, rules, chunksize, profiler, paths, n_jobs=n_jobs,
+                                preview_rows=preview_rows)
+    else:
+        result = _run_whole(path, rules, profiler, paths, n_jobs=n_jobs, preview_rows=preview_rows)
+    result["cache_hit"] = False
+    if key is not None:
+        save_cached_result(paths["result_cache"], key, result, cache["max_bytes"])
+    return result
+
+def _cache_options(rules):
+    """Result cache settings from the `pipeline:` section."""
+    config = rules.get("pipeline") or {}
+    max_mb = config.get("result_cache_max_mb")
+    return {"enabled": bool(config.get("result_cache", True)),
+            "max_bytes": int(max_mb * 2**20) if max_mb else None}
+
+def _restore_artifact(src, base_dir, stem, ts):
+    """
+    Hard-link a cached output to where a run `ts` would have written it
+    (None stays None). Columnar outputs are run directories whatever the
+    format, so only csv vs. directory matters for the path.
+    """
+    if not src:
+        return None
+    dst = output_path(base_dir, stem, ts, "csv" if os.path.isfile(src) else "parquet")
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    link_artifact(src, dst)
+    return dst
+
+def _cache_hit(cached, path, profiler, preview_rows, paths):
+    """
+    Result of an earlier identical run: its artifacts linked back into the
+    data directory under a new run id (the history never points into the
+    cache, which eviction may empty), a copy of its report flagged cache_hit,
+    and previews read back from the artifacts.
+    """
+    profiler.close()
+    ts = new_run_id()
+    report = dict(cached["report"] or {}, timestamp=datetime.utcnow().isoformat(),
+                  cache_hit=True, stages=profiler.summary())
+    clean_out = _restore_artifact(cached["clean_path"], paths["clean"], "clean_output", ts)
+    quarantine_out = _restore_artifact(cached["quarantine_path"], paths["quarantine"], "quarantine", ts)
+    # like a rerun: report, history and (profiles being stored once, not in the
+    # report JSON) the column profile under the new run id
+    report_path = _publish_report(report, ts, path, paths)
+    if profiler.listener is not None:
+        profiler.listener("cache_hit", "done", report.get("total_records", 0))
+
+    result = dict(cached, input_path=path, report=report, stages=report["stages"], trace_path=None,
+                  cache_hit=True, clean_path=clean_out, quarantine_path=quarantine_out,
+                  report_path=report_path)
+    result["clean_preview"] = read_output(clean_out, limit=preview_rows) \
+        if clean_out else pd.DataFrame()
+    result["quarantine_preview"] = render_reasons(
+        read_output(quarantine_out, limit=preview_rows),
+        ReasonCodes.from_dict(report.get("failure_codes"))
+    ) if quarantine_out else pd.DataFrame()
+    return result
+
+def _run_whole(path, rules, profiler, paths, n_jobs=None, preview_rows=PREVIEW_ROWS):
+    """Whole-file run: the input is loaded once and every stage works on the full frame."""
+
     # 0. Load CSV robustly
-    df = load_csv_safely(path)
+    with profiler.stage("load_csv") as rec:
+        df = load_csv_safely(path)
+        rec["rows"] = len(df)
 
-    # 1. Detect schema (optional, useful for UI)
-    try:
-        schema = detect_schema(path)
-    except Exception:
-        schema = None
+    # 1. Detect schema once from the loaded frame; every later stage reuses it
+    with profiler.stage("schema", rows=len(df)):
+        schema, confidence = _schema_for(df, path, rules, paths)
+    df = _compact(df, schema, rules, profiler)
+    column_profile = _column_profile(rules, schema)
+    _update_profile(column_profile, df, profiler)
+
+    # 1b. Duplicates are quarantined before any rule sees them; every stage
+    #     records failures as codes into one run-wide reason dictionary
+    codes = ReasonCodes()
+    df_kept, df_dups = _dedup(df, _dedup_stage(rules), profiler, codes)
+
+    # 2. Compile the rules against the schema
+    plan = compile_rules(rules, schema)
 
-    # 2. Load validation rules
-    rules = load_default_rules()
+    # 3. Rule-based validation (ML is only fit once the rule-clean rows are known)
+    detector = _anomaly_stage(df, path, rules, schema, paths, n_jobs)
+    with profiler.stage("rules", rows=len(df_kept)):
+        df_clean, df_bad = apply_plan(df_kept, plan, codes=codes, **_rule_options(rules))
 
-    # 3. Apply rule-based validation
-    df_clean, df_bad = apply_rules(df, rules)
+    # 4. ML anomaly detection on the rule-clean rows (stored model or fit now)
+    _fit_detector(detector, df_clean, profiler)
+    df_anomalies = pd.DataFrame()
+    if detector is not None:
+        with profiler.stage("ml_score", rows=len(df_clean)):
+            df_clean, df_anomalies = detector.split(df_clean, codes=codes)
 
-    # 4. ML anomaly detection (on numeric columns by default)
-    df_anomalies = detect_anomalies(df_clean)
+    # 5. Quarantine combined bad + anomalies + duplicates
+    ts = new_run_id()
+    output = output_options(rules.get("pipeline"))
+    quarantined = len(df_bad) + len(df_anomalies) + len(df_dups)
+    with profiler.stage("quarantine_write", rows=quarantined):
+        quarantine_path = quarantine_rows(df_bad, df_anomalies, paths["quarantine"], ts,
+                                          df_duplicates=df_dups, **output)
 
-    # 5. Quarantine combined bad + anomalies
-    quarantine_path = quarantine_rows(df_bad, df_anomalies, QUARANTINE_DIR)
+    # 6. Save clean data with timestamp (CSV file or a Parquet / Arrow run directory)
+    clean_out = output_path(paths["clean"], "clean_output", ts, output["fmt"])
+    with profiler.stage("clean_write", rows=len(df_clean)):
+        write_part(df_clean, clean_out, **output)
 
-    # 6. Save clean data with timestamp
-    ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-    clean_out = os.path.join(CLEAN_DIR, f"clean_output_{ts}.csv")
-    df_clean.to_csv(clean_out, index=False)
+    # 7. Quality report (with per-stage timings)
+    report = build_report(len(df), len(df_clean), quarantined)
+    failure_reasons, failure_columns = _failure_summary(
+        codes, _tally_codes(codes, None, [df_bad, df_anomalies, df_dups]), report
+    )
+    _check_report(report, column_profile, path, rules, profiler, paths)
+    trace_path = _finish_profile(profiler, rules, report, ts, paths)
+    report_path = _publish_report(report, ts, path, paths)
 
     return {
         "input_path": path,
         "clean_path": clean_out,
         "quarantine_path": quarantine_path,
+        "report_path": report_path,
+        "report": report,
         "clean_rows": len(df_clean),
         "bad_rows": len(df_bad),
         "anomaly_rows": len(df_anomalies),
-        "schema_sample": schema
+        "duplicate_rows": len(df_dups),
+        "schema_sample": schema,
+        "schema_confidence": confidence,
+        "stages": report["stages"],
+        "trace_path": trace_path,
+        "clean_preview": df_clean.head(preview_rows),
+        "quarantine_preview": render_reasons(
+            _extend_preview(None, [df_bad, df_anomalies, df_dups], preview_rows), codes
+        ),
+        "failure_reasons": failure_reasons,
+        "failure_columns": failure_columns
+    }
+
+def _run_streaming(path, rules, chunksize, profiler, paths, n_jobs=None, preview_rows=PREVIEW_ROWS):
+    """
+    Chunked variant of run_pipeline: each chunk goes through rules and ML and
+    is appended to the clean / quarantine files straight away, so only one
+    chunk is in memory at a time. Schema and rule plan come from the first
+    chunk; fillna statistics are per chunk. Exact duplicates are caught
+    across chunks, near duplicates within each chunk.
+
+    When the anomaly model has to be (re)fit, a first pass over the file feeds
+    the rule-clean rows into a reservoir sample; the model fit on it gives one
+    global threshold that the second pass applies to every chunk.
+    """
+    ts = new_run_id()
+    output = output_options(rules.get("pipeline"))
+    clean_out = output_path(paths["clean"], "clean_output", ts, output["fmt"])
+    quarantine_out = new_quarantine_path(paths["quarantine"], ts, output["fmt"])
+
+    schema = confidence = plan = detector = quarantine_columns = None
+    rule_options = _rule_options(rules)
+    head = next(_profiled_chunks(path, chunksize, profiler), None)
+    if head is not None:
+        with profiler.stage("schema", rows=len(head)):
+            schema, confidence = _schema_for(head, path, rules, paths)
+        head = _compact(head, schema, rules, profiler)
+        plan = compile_rules(rules, schema)
+        detector = _anomaly_stage(head, path, rules, schema, paths, n_jobs)
+        quarantine_columns = list(head.columns) + [CODE_COLUMN, "anomaly_score"]
+        if _dedup_stage(rules) is not None:
+            quarantine_columns.append("duplicate_of")
+    del head
+
+    # Pass 1 (only without a reusable stored model): reservoir sample for the fit
+    if detector is not None and detector.needs_fit:
+        deduplicator, sample_codes = _dedup_stage(rules), ReasonCodes()
+        for chunk in _profiled_chunks(path, chunksize, profiler):
+            chunk = _compact(chunk, schema, rules, profiler)
+            chunk, _ = _dedup(chunk, deduplicator, profiler, sample_codes)
+            with profiler.stage("rules", rows=len(chunk)):
+                df_clean, _ = apply_plan(chunk, plan, codes=sample_codes, **rule_options)
+            with profiler.stage("ml_sample", rows=len(df_clean)):
+                detector.observe(df_clean)
+        with profiler.stage("ml_fit"):
+            detector.fit()
+
+    # Pass 2: rules + scoring, appended to the outputs chunk by chunk
+    totals = {"total": 0, "clean": 0, "bad": 0, "anomaly": 0, "duplicate": 0, "quarantined": 0, "chunks": 0}
+    clean_preview = quarantine_preview = tally = None
+    codes = ReasonCodes()
+    deduplicator = _dedup_stage(rules)
+    column_profile = _column_profile(rules, schema) if plan is not None else None
+    for chunk in (_profiled_chunks(path, chunksize, profiler) if plan is not None else []):
+        chunk = _compact(chunk, schema, rules, profiler)
+        _update_profile(column_profile, chunk, profiler)
+        df_kept, df_dups = _dedup(chunk, deduplicator, profiler, codes)
+        df_clean, df_bad, df_anomalies = _process_frame(df_kept, plan, detector, rule_options, profiler, codes)
+
+        with profiler.stage("clean_write", rows=len(df_clean)):
+            write_part(df_clean, clean_out, part=totals["chunks"], **output)
+        with profiler.stage("quarantine_write") as rec:
+            rec["rows"] = append_quarantine(
+                [df_bad, df_anomalies, df_dups], quarantine_out, columns=quarantine_columns,
+                part=totals["chunks"] if totals["quarantined"] else 0, **output
+            )
+        totals["quarantined"] += rec["rows"]
+        clean_preview = _extend_preview(clean_preview, [df_clean], preview_rows)
+        quarantine_preview = _extend_preview(quarantine_preview, [df_bad, df_anomalies, df_dups], preview_rows)
+        tally = _tally_codes(codes, tally, [df_bad, df_anomalies, df_dups])
+
+        totals["total"] += len(chunk)
+        totals["clean"] += len(df_clean)
+        totals["bad"] += len(df_bad)
+        totals["anomaly"] += len(df_anomalies)
+        totals["duplicate"] += len(df_dups)
+        totals["chunks"] += 1
+
+    if totals["chunks"] == 0:
+        touch_output(clean_out, output["fmt"])
+
+    report = build_report(totals["total"], totals["clean"], totals["quarantined"])
+    failure_reasons, failure_columns = _failure_summary(codes, tally, report)
+    _check_report(report, column_profile, path, rules, profiler, paths)
+    trace_path = _finish_profile(profiler, rules, report, ts, paths)
+    report_path = _publish_report(report, ts, path, paths)
+
+    return {
+        "input_path": path,
+        "clean_path": clean_out,
+        "quarantine_path": quarantine_out if totals["quarantined"] else None,
+        "report_path": report_path,
+        "report": report,
+        "clean_rows": totals["clean"],
+        "bad_rows": totals["bad"],
+        "anomaly_rows": totals["anomaly"],
+        "duplicate_rows": totals["duplicate"],
+        "chunks": totals["chunks"],
+        "schema_sample": schema,
+        "schema_confidence": confidence,
+        "stages": report["stages"],
+        "trace_path": trace_path,
+        "clean_preview": clean_preview if clean_preview is not None else pd.DataFrame(),
+        "quarantine_preview": render_reasons(quarantine_preview, codes)
+        if quarantine_preview is not None else pd.DataFrame(),
+        "failure_reasons": failure_reasons,
+        "failure_columns": failure_columns
     }
 
 # CLI helper
@@ -107,6 +718,13 @@ if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="Run data quality pipeline on a CSV")
     parser.add_argument("csv", help="path to CSV file")
+    parser.add_argument("--rules", default=None, help="optional rules override YAML")
+    parser.add_argument("--chunksize", type=int, default=None, help="stream the file in chunks of N rows")
     args = parser.parse_args()
-    result = run_pipeline(args.csv)
-    print(result)
+    result = run_pipeline(args.csv, rules_path=args.rules, chunksize=args.chunksize)
+    summary = {k: v for k, v in result.items() if not k.endswith("_preview")}
+    summary["report"] = {k: v for k, v in result["report"].items() if k != "columns"}  # sketches are bulky
+    print(summary)
+    gates = result["report"].get("gates") or {}
+    if not gates.get("passed", True):
+        raise SystemExit(f"Quality gates failed: {'; '.join(gates['failures'])}")
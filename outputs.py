@@ -0,0 +1,164 @@
+# src/pipeline/outputs.py
+import os
+import pandas as pd
+
+# format -> file extension of one part file
+OUTPUT_FORMATS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+DEFAULT_COMPRESSION = "zstd"
+# smaller row groups let filtered reads skip more of the file via min/max statistics
+ROW_GROUP_ROWS = 128 * 1024
+
+def output_options(config):
+    """Output settings from the `pipeline:` section of the rules."""
+    config = config or {}
+    fmt = (config.get("output_format") or "csv").lower()
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"output_format must be one of {sorted(OUTPUT_FORMATS)}, got {fmt!r}")
+    return {"fmt": fmt,
+            "partition_by": config.get("partition_by") or None,
+            "compression": config.get("output_compression") or DEFAULT_COMPRESSION}
+
+def output_path(base_dir, stem, ts, fmt="csv"):
+    """
+    csv      -> <base_dir>/<stem>_<ts>.csv (one file)
+    columnar -> <base_dir>/<stem>/run=<ts> (a directory of part files, hive
+                partitioned by run so the <stem> root reads as one dataset)
+    """
+    if fmt == "csv":
+        os.makedirs(base_dir, exist_ok=True)
+        return os.path.join(base_dir, f"{stem}_{ts}.csv")
+    return os.path.join(base_dir, stem, f"run={ts}")
+
+def is_columnar(path):
+    return os.path.isdir(path)
+
+# -------------------------
+# Writing
+# -------------------------
+def write_part(df, path, fmt="csv", part=0, partition_by=None, compression=DEFAULT_COMPRESSION):
+    """
+    Write one frame (a whole output or one streamed chunk) to `path`.
+    csv appends to the single file (part 0 truncates and writes the header);
+    parquet / arrow write part file `part` into the run directory, under
+    <partition_by>=<value>/ subdirectories when a partition column is given.
+    Category, downcast numeric and Arrow string dtypes are stored as they are.
+    Returns the number of rows written.
+    """
+    if fmt == "csv":
+        df.to_csv(path, mode="w" if part == 0 else "a", header=part == 0, index=False)
+        return len(df)
+
+    os.makedirs(path, exist_ok=True)
+    if df.empty:
+        return 0
+
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if fmt == "parquet":
+        file_format = ds.ParquetFileFormat()
+        file_options = file_format.make_write_options(compression=compression)
+    else:
+        file_format = ds.IpcFileFormat()
+        file_options = file_format.make_write_options(compression=compression)
+    ds.write_dataset(
+        table, path, format=file_format, file_options=file_options,
+        basename_template=f"part-{part:05d}-{{i}}{OUTPUT_FORMATS[fmt]}",
+        partitioning=[partition_by] if partition_by else None,
+        partitioning_flavor="hive" if partition_by else None,
+        existing_data_behavior="overwrite_or_ignore",
+        max_rows_per_group=ROW_GROUP_ROWS,
+    )
+    return len(df)
+
+def touch_output(path, fmt="csv"):
+    """Create an empty output (a run that produced no rows still leaves one behind)."""
+    if fmt == "csv":
+        open(path, "w").close()
+    else:
+        os.makedirs(path, exist_ok=True)
+    return path
+
+# -------------------------
+# Reading
+# -------------------------
+def _dataset(path):
+    """
+    pyarrow dataset over a columnar output directory. Streamed chunks may
+    have been compacted to different widths (int8 vs int16, float32 vs
+    float64), so the part schemas are unified with widening promotion.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    fmt = "parquet" if any(name.endswith(".parquet") for _, _, files in os.walk(path) for name in files) else "ipc"
+    dataset = ds.dataset(path, format=fmt, partitioning="hive")
+    schemas = {f.physical_schema for f in dataset.get_fragments()}
+    if len(schemas) > 1:
+        unified = pa.unify_schemas(list(schemas), promote_options="permissive")
+        for field in dataset.schema:
+            if unified.get_field_index(field.name) < 0:
+                unified = unified.append(field)
+        dataset = ds.dataset(path, format=fmt, partitioning="hive", schema=unified)
+    return dataset
+
+def _filter_expression(filters):
+    """[(column, op, value), ...] (pyarrow / pandas read_parquet style) -> dataset expression"""
+    if not filters:
+        return None
+    import pyarrow.parquet as pq
+    return pq.filters_to_expression(filters)
+
+def _filter_frame(df, filters):
+    """Apply filters to an in-memory frame (the CSV fallback has nothing to push down to)."""
+    import pyarrow as pa
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    return table.filter(_filter_expression(filters)).to_pandas()
+
+def read_output(path, columns=None, filters=None, limit=None):
+    """
+    Read a clean / quarantine output as a DataFrame. For columnar outputs only
+    `columns` are read, and `filters` are pushed down so row groups whose
+    statistics rule them out are skipped. `limit` stops after that many rows.
+    CSV outputs fall back to pandas with usecols / nrows (filters applied after).
+    """
+    if not is_columnar(path):
+        df = pd.read_csv(path, usecols=columns, nrows=None if filters else limit)
+        if filters:
+            df = _filter_frame(df, filters)
+            df = df.head(limit) if limit is not None else df
+        return df
+
+    dataset = _dataset(path)
+    expression = _filter_expression(filters)
+    if limit is not None:
+        table = dataset.head(limit, columns=columns, filter=expression)
+    else:
+        table = dataset.to_table(columns=columns, filter=expression)
+    return table.to_pandas()
+
+def iter_output(path, columns=None, filters=None, batch_rows=50000):
+    """
+    Yield an output as DataFrames of at most `batch_rows` rows (bounded memory).
+    Columnar outputs push `columns` and `filters` down to the scan.
+    """
+    if not is_columnar(path):
+        with pd.read_csv(path, usecols=columns, chunksize=batch_rows) as reader:
+            for chunk in reader:
+                yield _filter_frame(chunk, filters) if filters else chunk
+        return
+
+    scanner = _dataset(path).scanner(columns=columns, filter=_filter_expression(filters),
+                                     batch_size=batch_rows)
+    for batch in scanner.to_batches():
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+def count_output_rows(path, filters=None):
+    """Row count; columnar outputs answer from file metadata without reading data."""
+    if not is_columnar(path):
+        if filters:
+            return sum(len(c) for c in iter_output(path, filters=filters, batch_rows=200_000))
+        return sum(len(c) for c in pd.read_csv(path, usecols=[0], chunksize=200_000))
+    return _dataset(path).count_rows(filter=_filter_expression(filters))
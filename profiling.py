@@ -0,0 +1,148 @@
+# src/pipeline/profiling.py
+import os
+import sys
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from ..utils.logger import get_logger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = get_logger(__name__)
+
+MEMORY_MODES = ("rss", "tracemalloc", "off")
+
+def _peak_rss_mb():
+    """Process high-water mark RSS in MB (ru_maxrss is KB on Linux, bytes on macOS)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+class StageProfiler:
+    """
+    Wall time, CPU time, peak memory delta and rows/sec per pipeline stage.
+
+    memory -> "rss": growth of the process peak RSS during the stage (free,
+              but only shows stages that push the high-water mark up);
+              "tracemalloc": peak traced Python allocations above the stage
+              start (exact for pandas/numpy, slows pure-Python code, blind to
+              pyarrow buffers); "off": no memory numbers.
+
+    A stage entered several times (once per chunk when streaming) is
+    accumulated: seconds and rows add up, peak memory is the maximum.
+
+    listener -> optional callable(stage, state, rows) called when a stage
+                starts ("running", rows so far) and ends ("done", rows
+                including this call); used for progress reporting.
+    """
+
+    def __init__(self, memory="rss", listener=None):
+        if memory not in MEMORY_MODES:
+            raise ValueError(f"memory must be one of {MEMORY_MODES}, got {memory!r}")
+        self.memory = memory
+        self.listener = listener
+        self.stages = {}
+        self.events = []
+        self._origin = time.perf_counter()
+        self._own_tracing = False
+        if memory == "tracemalloc" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._own_tracing = True
+
+    def _memory_start(self):
+        if self.memory == "tracemalloc":
+            tracemalloc.reset_peak()
+            return tracemalloc.get_traced_memory()[0] / 2**20
+        if self.memory == "rss":
+            return _peak_rss_mb()
+        return None
+
+    def _memory_delta(self, start):
+        if start is None:
+            return None
+        if self.memory == "tracemalloc":
+            return tracemalloc.get_traced_memory()[1] / 2**20 - start
+        return _peak_rss_mb() - start
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """
+        with profiler.stage("rules", rows=len(df)): ...
+        rows -> rows processed by the stage; may also be set afterwards via
+                the yielded dict (rec["rows"] = n) when only known at the end.
+        """
+        rec = {"rows": rows}
+        self._notify(name, "running")
+        mem = self._memory_start()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield rec
+        finally:
+            end = time.perf_counter()
+            self._record(name, end - wall, time.process_time() - cpu,
+                         self._memory_delta(mem), rec["rows"])
+            self.events.append({
+                "name": name, "ph": "X", "pid": os.getpid(), "tid": 0,
+                "ts": round((wall - self._origin) * 1e6),
+                "dur": round((end - wall) * 1e6),
+                "args": {"rows": rec["rows"]},
+            })
+            self._notify(name, "done")
+
+    def _notify(self, name, state):
+        if self.listener is not None:
+            self.listener(name, state, (self.stages.get(name) or {}).get("rows") or 0)
+
+    def _record(self, name, seconds, cpu_seconds, peak_mb, rows):
+        entry = self.stages.setdefault(name, {
+            "seconds": 0.0, "cpu_seconds": 0.0, "peak_mb_delta": None, "rows": None, "calls": 0
+        })
+        entry["seconds"] += seconds
+        entry["cpu_seconds"] += cpu_seconds
+        entry["calls"] += 1
+        if peak_mb is not None:
+            entry["peak_mb_delta"] = max(entry["peak_mb_delta"] or 0.0, peak_mb)
+        if rows is not None:
+            entry["rows"] = (entry["rows"] or 0) + int(rows)
+
+    def summary(self):
+        """JSON-serialisable {stage: metrics}, in the order stages first ran."""
+        out = {}
+        for name, entry in self.stages.items():
+            seconds = entry["seconds"]
+            rows = entry["rows"]
+            out[name] = {
+                "seconds": round(seconds, 4),
+                "cpu_seconds": round(entry["cpu_seconds"], 4),
+                "peak_mb_delta": None if entry["peak_mb_delta"] is None else round(entry["peak_mb_delta"], 2),
+                "rows": rows,
+                "rows_per_sec": round(rows / seconds) if rows and seconds > 0 else None,
+                "calls": entry["calls"],
+            }
+        return out
+
+    def log(self, log=logger):
+        for name, m in self.summary().items():
+            log.info(
+                f"stage {name}: {m['seconds']:.3f}s wall, {m['cpu_seconds']:.3f}s cpu, "
+                f"peak +{m['peak_mb_delta']} MB, {m['rows_per_sec']} rows/s"
+            )
+
+    def save_chrome_trace(self, path):
+        """Write the recorded stages as a Chrome trace (chrome://tracing, Perfetto)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+        logger.info(f"Chrome trace saved: {path}")
+        return path
+
+    def close(self):
+        if self._own_tracing:
+            tracemalloc.stop()
+            self._own_tracing = False
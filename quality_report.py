@@ -2,14 +2,29 @@ import pandas as pd
 from datetime import datetime
 import os
 from ..utils.logger import get_logger
+from .column_profile import FrameProfile
 
 logger = get_logger(__name__)
 
-def generate_report(raw_df, clean_df, quarantine_df, output_dir="data/reports"):
-    os.makedirs(output_dir, exist_ok=True)
-    total = len(raw_df)
-    cleaned = len(clean_df)
-    quarantined = len(quarantine_df)
+def generate_report(raw_df, clean_df, quarantine_df, output_dir="data/reports", stages=None,
+                    profile=None, schema=None):
+    """
+    profile -> FrameProfile of the input (e.g. merged from chunks), or True to
+               profile raw_df here in one pass (typed by `schema` when given);
+               stored under report["columns"] with its mergeable sketches
+    """
+    report = build_report(len(raw_df), len(clean_df), len(quarantine_df))
+    if stages:
+        report["stages"] = stages
+    if profile is True:
+        profile = FrameProfile(schema).update(raw_df)
+    if profile is not None:
+        report["columns"] = profile.to_dict()
+    path = save_report(report, output_dir)
+    return report, path
+
+def build_report(total, cleaned, quarantined):
+    """Report dict from row counts, so streaming runs can report without holding frames."""
     pass_rate = (cleaned / total * 100) if total > 0 else 0.0
 
     report = {
@@ -19,11 +34,35 @@ def generate_report(raw_df, clean_df, quarantine_df, output_dir="data/reports"):
         "quarantined_records": int(quarantined),
         "pass_rate_pct": round(pass_rate, 2)
     }
+    return report
 
-    path = os.path.join(output_dir, f"report_{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.json")
+def check_gates(report, config):
+    """
+    Quality gates from the `pipeline:` section, checked against a finished
+    report -> {"passed": bool, "failures": [messages]}.
+      fail_if_pass_rate_below       -> minimum pass_rate_pct
+      fail_if_drifted_columns_above -> most columns report["drift"] may flag
+    """
+    config = config or {}
+    failures = []
+    min_pass_rate = config.get("fail_if_pass_rate_below")
+    if min_pass_rate is not None and report.get("pass_rate_pct", 0.0) < min_pass_rate:
+        failures.append(f"pass rate {report.get('pass_rate_pct')}% below {min_pass_rate}%")
+    max_drifted = config.get("fail_if_drifted_columns_above")
+    drifted = (report.get("drift") or {}).get("drifted_columns") or []
+    if max_drifted is not None and len(drifted) > max_drifted:
+        failures.append(f"{len(drifted)} drifted columns ({', '.join(drifted)}) above {max_drifted}")
+    for failure in failures:
+        logger.warning(f"Quality gate failed: {failure}")
+    return {"passed": not failures, "failures": failures}
+
+def save_report(report, output_dir="data/reports", ts=None):
+    os.makedirs(output_dir, exist_ok=True)
+    ts = ts or datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
+    path = os.path.join(output_dir, f"report_{ts}.json")
     import json
     with open(path, "w") as f:
         json.dump(report, f, indent=2)
 
     logger.info(f"Quality report saved: {path}")
-    return report, path
+    return path
@@ -3,6 +3,8 @@ import os
 import pandas as pd
 from datetime import datetime
 
+from .outputs import output_path, write_part, DEFAULT_COMPRESSION
+
 def _to_dataframe(maybe_df):
     """
     Ensure the input is a pandas.DataFrame.
@@ -43,34 +45,62 @@ def _to_dataframe(maybe_df):
         return None
 
 
-def quarantine_rows(df_bad, df_anomalies, quarantine_dir):
+def quarantine_rows(df_bad, df_anomalies, quarantine_dir, ts=None, fmt="csv", df_duplicates=None,
+                    **write_options):
     """
-    Combine df_bad and df_anomalies (deduplicated), write to a timestamped CSV
-    in `quarantine_dir` and return the path to the file.
+    Combine df_bad, df_anomalies and df_duplicates, write to a timestamped CSV (or, with
+    fmt="parquet" / "arrow", a run directory; see outputs.write_part) in
+    `quarantine_dir` and return the path.
+
+    apply_rules already emits one row per failing record (all its reasons in
+    one `failure_code` / `failure_reason`) and anomalies are scored on the rule-clean rows only,
+    so the two inputs are disjoint. Duplicates are split off by the dedup
+    stage before the rules run, so they are disjoint from both.
 
     This function is defensive: it will unwrap tuples/lists and coerce dicts
     into DataFrames so pd.concat only receives DataFrame objects.
     """
-    os.makedirs(quarantine_dir, exist_ok=True)
+    parts = _collect_parts(df_bad, df_anomalies, df_duplicates)
+    if not parts:
+        # nothing to quarantine - return None
+        return None
+
+    out_path = new_quarantine_path(quarantine_dir, ts, fmt)
+    append_quarantine(parts, out_path, fmt=fmt, **write_options)
+    return out_path
 
+
+def _collect_parts(*candidates):
     parts = []
-    for candidate, name in [(df_bad, "df_bad"), (df_anomalies, "df_anomalies")]:
+    for candidate in candidates:
         df_candidate = _to_dataframe(candidate)
         if df_candidate is not None and len(df_candidate) > 0:
             parts.append(df_candidate)
-        else:
-            # optional: you can log or print here for debugging
-            # print(f"[quarantine] skipping {name} (not a DataFrame or empty)")
-            pass
+    return parts
 
-    if not parts:
-        # nothing to quarantine - return None
-        return None
 
-    # Now it's safe to concatenate
-    combined = pd.concat(parts, ignore_index=True).drop_duplicates().reset_index(drop=True)
+def new_quarantine_path(quarantine_dir, ts=None, fmt="csv"):
+    """Timestamped quarantine output path inside `quarantine_dir` (created if missing)."""
+    os.makedirs(quarantine_dir, exist_ok=True)
+    ts = ts or datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    return output_path(quarantine_dir, "quarantine", ts, fmt)
 
-    ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-    out_path = os.path.join(quarantine_dir, f"quarantine_{ts}.csv")
-    combined.to_csv(out_path, index=False)
-    return out_path
+
+def append_quarantine(parts, out_path, columns=None, part=0, fmt="csv", partition_by=None,
+                      compression=DEFAULT_COMPRESSION):
+    """
+    Write quarantined rows to `out_path`. Part 0 truncates the CSV and emits
+    the header, later parts append (columnar formats add one part file each),
+    so streaming runs can add every chunk to the same output. `columns` pins
+    the column order so every chunk lines up with the header.
+    Returns the number of rows written.
+    """
+    parts = _collect_parts(*parts)
+    if not parts:
+        return 0
+
+    combined = pd.concat(parts, ignore_index=True)
+    if columns is not None:
+        combined = combined.reindex(columns=columns)
+    return write_part(combined, out_path, fmt, part=part, partition_by=partition_by,
+                      compression=compression)
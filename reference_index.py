@@ -0,0 +1,132 @@
+# src/pipeline/reference_index.py
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+
+from .fingerprint import file_fingerprint
+from .outputs import iter_output
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+REFERENCE_CACHE_DIR = os.path.join(BASE_DIR, "data", "cache", "reference")
+READ_CHUNK_ROWS = 500_000
+
+# (abs path, column) -> ReferenceIndex, valid while the fingerprint matches
+_LOADED_INDEXES = {}
+
+def _key_strings(series):
+    """
+    Keys as strings, so 42, 42.0 and "42" all match. Float columns holding
+    whole numbers (ints that picked up NaN) are printed without the ".0".
+    """
+    series = series.dropna()
+    if pd.api.types.is_float_dtype(series) and len(series) and (series % 1 == 0).all():
+        series = series.astype("int64")
+    return series.astype(str).to_numpy(dtype=object)
+
+def hash_keys(series):
+    """uint64 hash per non-null key (pandas' vectorized hashing)."""
+    return pd.util.hash_array(_key_strings(series))
+
+def _resolve(path):
+    return path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
+
+def reference_fingerprint(path):
+    """file_fingerprint of a reference file, or of every part file of an output directory."""
+    if os.path.isfile(path):
+        return file_fingerprint(path)
+    h = hashlib.blake2b(digest_size=16)
+    for root, _, files in sorted(os.walk(path)):
+        for name in sorted(files):
+            h.update(file_fingerprint(os.path.join(root, name)).encode())
+    return h.hexdigest()
+
+class ReferenceIndex:
+    """
+    Sorted, de-duplicated uint64 hashes of a reference key column: 8 bytes per
+    key, built once, saved as .npy and probed with np.searchsorted. (With
+    64-bit hashes a false match needs a collision; ~n*m / 2**64.)
+    """
+
+    def __init__(self, hashes, name):
+        self.hashes = hashes
+        self.name = name
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def contains(self, series):
+        """Boolean ndarray: True where the value is a known key. Nulls count as present."""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # probe each category once, then broadcast through the codes
+            known = np.append(self._probe(pd.Series(series.cat.categories)), True)
+            return known[series.cat.codes.to_numpy()]  # code -1 (null) -> the appended True
+        out = np.ones(len(series), dtype=bool)
+        present = series.notna().to_numpy()
+        out[present] = self._probe(series[present])
+        return out
+
+    def _probe(self, series):
+        hashes = hash_keys(series)
+        if len(self.hashes) == 0:
+            return np.zeros(len(hashes), dtype=bool)
+        pos = np.searchsorted(self.hashes, hashes)
+        pos[pos == len(self.hashes)] = 0
+        return self.hashes[pos] == hashes
+
+def build_reference_index(path, column):
+    """Read only `column` of the reference (CSV or columnar output) in chunks and hash it."""
+    parts = [np.unique(hash_keys(chunk[column]))
+             for chunk in iter_output(path, columns=[column], batch_rows=READ_CHUNK_ROWS)]
+    hashes = np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.uint64)
+    return ReferenceIndex(hashes, f"{os.path.basename(path.rstrip(os.sep))}.{column}")
+
+def load_reference_index(path, column, cache_dir=REFERENCE_CACHE_DIR):
+    """
+    ReferenceIndex for `column` of the reference at `path` (relative paths are
+    taken from the project root). Reused in memory and from <cache_dir> across
+    runs until the reference's fingerprint changes.
+    """
+    path = _resolve(path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Reference dataset not found: {path}")
+    fp = reference_fingerprint(path)
+    memo_key = (path, column)
+    memo = _LOADED_INDEXES.get(memo_key)
+    if memo is not None and memo[0] == fp:
+        return memo[1]
+
+    name = hashlib.blake2b(f"{path}|{column}".encode(), digest_size=8).hexdigest()
+    cache_path = os.path.join(cache_dir, f"ref_{name}_{fp}.npy")
+    label = f"{os.path.basename(path.rstrip(os.sep))}.{column}"
+    if os.path.exists(cache_path):
+        index = ReferenceIndex(np.load(cache_path), label)
+    else:
+        index = build_reference_index(path, column)
+        os.makedirs(cache_dir, exist_ok=True)
+        for stale in os.listdir(cache_dir):
+            if stale.startswith(f"ref_{name}_"):
+                os.remove(os.path.join(cache_dir, stale))
+        tmp = f"{cache_path}.{os.getpid()}.tmp.npy"
+        np.save(tmp, index.hashes)
+        os.replace(tmp, cache_path)
+        logger.info(f"Reference index built: {label} ({len(index):,} keys)")
+    _LOADED_INDEXES[memo_key] = (fp, index)
+    return index
+
+def foreign_keys(rules):
+    """[(column, reference path, reference column), ...] declared in the rules' `columns:` section."""
+    out = []
+    for col, col_rules in ((rules or {}).get("columns") or {}).items():
+        fk = (col_rules or {}).get("foreign_key")
+        if fk:
+            out.append((col, _resolve(fk["reference"]), fk.get("column") or col))
+    return out
+
+def reference_versions(rules):
+    """Fingerprints of every referenced dataset, for cache keys that must follow reference changes."""
+    return [f"{ref}:{ref_col}:{reference_fingerprint(ref)}"
+            for _, ref, ref_col in foreign_keys(rules) if os.path.exists(ref)]
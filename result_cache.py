@@ -0,0 +1,142 @@
+# src/pipeline/result_cache.py
+import os
+import json
+import shutil
+import uuid
+from datetime import datetime
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ENTRY_FILE = "entry.json"
+# result fields kept in the cache entry (previews are re-read from the artifacts)
+CACHED_FIELDS = ["report", "clean_rows", "bad_rows", "anomaly_rows", "duplicate_rows", "chunks",
+                 "schema_sample", "schema_confidence", "failure_reasons", "failure_columns", "stages"]
+# result field -> artifact name inside the entry (files keep their extension, e.g. clean.csv)
+ARTIFACTS = {"clean_path": "clean", "quarantine_path": "quarantine", "report_path": "report"}
+
+def link_artifact(src, dst):
+    """Hard-link a file or directory tree to `dst` (copy where links are not possible)."""
+    def link_file(s, d):
+        try:
+            os.link(s, d)
+        except OSError:
+            shutil.copy2(s, d)
+    if os.path.isdir(src):
+        shutil.copytree(src, dst, copy_function=link_file)
+    else:
+        link_file(src, dst)
+
+def _tree_bytes(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, files in os.walk(path) for name in files)
+
+def _read_entry(entry_dir):
+    try:
+        with open(os.path.join(entry_dir, ENTRY_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_entry(entry_dir, entry):
+    tmp = os.path.join(entry_dir, f"{ENTRY_FILE}.{uuid.uuid4().hex[:6]}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(entry, f, default=str)
+    os.replace(tmp, os.path.join(entry_dir, ENTRY_FILE))
+
+# -------------------------
+# Lookup / store
+# -------------------------
+def load_cached_result(cache_dir, key):
+    """
+    Cached result for `key` (artifact paths pointing into the cache) or None.
+    A hit refreshes the entry's last_used time for LRU eviction; eviction may
+    delete the entry at any time, so callers link the artifacts out of the
+    cache (link_artifact) before handing their paths on.
+    """
+    entry_dir = os.path.join(cache_dir, key)
+    entry = _read_entry(entry_dir)
+    if entry is None:
+        return None
+    for field in ARTIFACTS:
+        if entry.get(field) and not os.path.exists(os.path.join(entry_dir, entry[field])):
+            return None  # partially evicted / removed by hand
+    entry["last_used"] = datetime.utcnow().isoformat()
+    entry["hits"] = entry.get("hits", 0) + 1
+    _write_entry(entry_dir, entry)
+
+    result = {field: entry.get(field) for field in CACHED_FIELDS}
+    for field in ARTIFACTS:
+        result[field] = os.path.join(entry_dir, entry[field]) if entry.get(field) else None
+    return result
+
+def save_cached_result(cache_dir, key, result, max_bytes=None):
+    """
+    Store the artifacts of `result` under <cache_dir>/<key>/ (hard links, so
+    no extra disk while the originals exist) plus its summary fields, then
+    evict least recently used entries beyond `max_bytes`.
+    """
+    entry_dir = os.path.join(cache_dir, key)
+    if os.path.exists(os.path.join(entry_dir, ENTRY_FILE)):
+        return entry_dir
+
+    # build in a temp dir and rename, so a parallel run of the same input never sees half an entry
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_dir = os.path.join(cache_dir, f".{key}.{uuid.uuid4().hex[:6]}.tmp")
+    os.makedirs(tmp_dir)
+    entry = {field: result.get(field) for field in CACHED_FIELDS}
+    size = 0
+    for field, name in ARTIFACTS.items():
+        src = result.get(field)
+        if src and os.path.exists(src):
+            if os.path.isfile(src):
+                name += os.path.splitext(src)[1]
+            link_artifact(src, os.path.join(tmp_dir, name))
+            size += _tree_bytes(src)
+            entry[field] = name
+        else:
+            entry[field] = None
+    now = datetime.utcnow().isoformat()
+    entry.update(key=key, bytes=size, created_at=now, last_used=now, hits=0)
+    _write_entry(tmp_dir, entry)
+
+    try:
+        os.rename(tmp_dir, entry_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)  # another run stored it first
+    if max_bytes:
+        evict(cache_dir, max_bytes)
+    return entry_dir
+
+# -------------------------
+# Eviction
+# -------------------------
+def cache_entries(cache_dir):
+    """[(last_used, bytes, entry_dir), ...] for every complete entry."""
+    if not os.path.isdir(cache_dir):
+        return []
+    entries = []
+    for name in os.listdir(cache_dir):
+        entry_dir = os.path.join(cache_dir, name)
+        entry = _read_entry(entry_dir) if not name.startswith(".") else None
+        if entry is not None:
+            entries.append((entry.get("last_used", ""), int(entry.get("bytes") or 0), entry_dir))
+    return entries
+
+def evict(cache_dir, max_bytes):
+    """Drop least recently used entries until the cache holds at most `max_bytes`. Returns entries removed."""
+    entries = sorted(cache_entries(cache_dir))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, entry_dir in entries:
+        if total <= max_bytes:
+            break
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        total -= size
+        removed += 1
+    if removed:
+        logger.info(f"Result cache: evicted {removed} entries, {total / 2**20:.1f} MB left")
+    return removed
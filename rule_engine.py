@@ -1,8 +1,17 @@
+import re
+import copy
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, BrokenExecutor
 import pandas as pd
+import numpy as np
 import yaml
 import os
 
 from .schema_detector import detect_schema
+from .reference_index import load_reference_index
+from .failure_codes import ReasonCodes, attach_failures, NO_FAILURE
+
+FILL_STRATEGIES = ("mean", "median", "mode")
+PARALLEL_MIN_COLUMNS = 32
 
 def load_default_rules(path="config/default_rules.yml"):
     if not os.path.exists(path):
@@ -11,28 +20,286 @@ def load_default_rules(path="config/default_rules.yml"):
     with open(path, "r") as f:
         return yaml.safe_load(f)
 
-def apply_rules(df, rules):
-    if isinstance(df, str):
-        df = pd.read_csv(df)
+# -------------------------
+# Rule layering
+# -------------------------
+def merge_rules(base, override):
+    """
+    Deep-merge `override` on top of `base` and return a new dict.
+    Nested dicts are merged key by key, any other value replaces the base one.
+    """
+    merged = copy.deepcopy(base) if base else {}
+    for key, value in (override or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_rules(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
 
-    if df.empty:
-        return df, pd.DataFrame()
+def load_rules(path="config/default_rules.yml", override_paths=None):
+    """
+    Load the default rules file and layer each existing override file on top,
+    in order. Override files use the same layout as default_rules.yml plus an
+    optional `columns:` section keyed by column name, e.g.
+
+        columns:
+          age: {min: 0, max: 120, drop_nulls: true}
+          status: {type: categorical, allowed_values: [PENDING, COMPLETE]}
+    """
+    rules = load_default_rules(path)
+    for override_path in override_paths or []:
+        if override_path and os.path.exists(override_path):
+            with open(override_path, "r") as f:
+                rules = merge_rules(rules, yaml.safe_load(f) or {})
+    return rules
+
+# -------------------------
+# Rule compiler
+# -------------------------
+def _column_rules(rules, col, col_type):
+    rules = rules or {}
+    col_rules = dict((rules.get("columns") or {}).get(col) or {})
+    col_type = col_rules.pop("type", col_type)
+    merged = dict((rules.get("default_rules") or {}).get(col_type) or {})
+    merged.update(col_rules)
+    return col_type, merged
+
+def compile_column(col, col_type, col_rules):
+    """
+    Turn the rules of one column into a plan entry. Checks are plain
+    (reason, kind, arg) tuples so a plan can be pickled and shipped to workers;
+    regexes and allowed-value sets are built here once instead of per row.
+    """
+    checks = []
+    if col_rules.get("drop_nulls"):
+        checks.append((f"{col}: NULL not allowed", "null", None))
+
+    fk = col_rules.get("foreign_key")
+    if fk:
+        index = load_reference_index(fk["reference"], fk.get("column") or col)
+        checks.append((f"{col}: not found in {index.name}", "foreign_key", index))
 
-    schema = detect_schema(df)
-    quarantined = []
-    valid_mask = pd.Series(True, index=df.index)
+    if col_type == "numeric":
+        checks.append((f"{col}: not numeric", "numeric", None))
+        if col_rules.get("min") is not None:
+            checks.append((f"{col}: below min {col_rules['min']}", "min", col_rules["min"]))
+        if col_rules.get("max") is not None:
+            checks.append((f"{col}: above max {col_rules['max']}", "max", col_rules["max"]))
+        if col_rules.get("allow_negative") is False:
+            checks.append((f"{col}: negative not allowed", "negative", None))
+    elif col_type == "string":
+        if col_rules.get("max_length") is not None:
+            checks.append((f"{col}: longer than {col_rules['max_length']} chars", "max_length", int(col_rules["max_length"])))
+        if col_rules.get("regex"):
+            checks.append((f"{col}: does not match regex", "regex", re.compile(col_rules["regex"])))
+    elif col_type == "categorical":
+        if col_rules.get("allowed_values") is not None:
+            checks.append((f"{col}: value not in allowed_values", "allowed", frozenset(col_rules["allowed_values"])))
+    elif col_type == "datetime":
+        fmt = col_rules.get("format")
+        checks.append((f"{col}: invalid datetime", "datetime", None if fmt in (None, "auto") else fmt))
 
+    fillna = None if col_rules.get("drop_nulls") else col_rules.get("fillna")
+    return {"column": col, "type": col_type, "checks": checks, "fillna": fillna}
+
+def compile_rules(rules, schema):
+    """
+    rules  -> dict loaded from default_rules.yml (plus overrides)
+    schema -> {column: type} as returned by detect_schema
+    Returns the execution plan: one entry per column, in schema order.
+    """
+    plan = []
     for col, col_type in schema.items():
-        # simple baseline rules: drop nulls for string
-        if df[col].isnull().any():
-            mask = df[col].isnull()
-            for idx in df[mask].index:
-                r = df.loc[idx].to_dict()
-                r["failure_reason"] = f"{col}: NULL not allowed"
-                quarantined.append(r)
-            valid_mask &= ~mask
-
-    df_good = df[valid_mask].reset_index(drop=True)
-    df_bad = pd.DataFrame(quarantined)
+        col_type, col_rules = _column_rules(rules, col, col_type)
+        plan.append(compile_column(col, col_type, col_rules))
+    return plan
+
+# -------------------------
+# Plan execution
+# -------------------------
+def parse_datetimes(series, fmt=None):
+    """
+    Parse a column as datetimes (NaT where a value is not one). fmt=None is
+    "auto": one format is inferred from the first value, and values written
+    in another valid format get a per-value parse ("mixed") instead of
+    failing. The rule check and the database loaders parse the same way.
+    """
+    parsed = pd.to_datetime(series, errors="coerce", format=fmt)
+    retry = parsed.isna() & series.notna()
+    if fmt is None and retry.any():
+        parsed = parsed.copy()
+        parsed[retry] = pd.to_datetime(series[retry], errors="coerce", format="mixed")
+    return parsed
+
+def _violation_mask(series, kind, arg):
+    """
+    Vectorized evaluation of one compiled check. Nulls only ever fail the
+    `null` check; every other check treats them as passing.
+    """
+    if kind == "null":
+        return series.isna()
+
+    if kind in ("numeric", "min", "max", "negative"):
+        is_numeric = pd.api.types.is_numeric_dtype(series)
+        if kind == "numeric" and is_numeric:
+            return np.zeros(len(series), dtype=bool)
+        values = series if is_numeric else pd.to_numeric(series, errors="coerce")
+        if kind == "numeric":
+            return values.isna() & series.notna()
+        if kind == "min":
+            return values < arg
+        if kind == "max":
+            return values > arg
+        return values < 0
+
+    if kind == "max_length":
+        return series.astype("string").str.len().gt(arg).fillna(False)
+    if kind == "regex":
+        return ~series.astype("string").str.fullmatch(arg).fillna(True)
+    if kind == "allowed":
+        return ~series.isin(arg) & series.notna()
+    if kind == "foreign_key":
+        return ~arg.contains(series)
+    if kind == "datetime":
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return np.zeros(len(series), dtype=bool)
+        return parse_datetimes(series, arg).isna() & series.notna()
+
+    raise ValueError(f"Unknown rule check: {kind}")
+
+def evaluate_column(series, entry):
+    """Return the list of (reason, boolean ndarray) failures for one plan entry."""
+    failures = []
+    for reason, kind, arg in entry["checks"]:
+        mask = np.asarray(_violation_mask(series, kind, arg), dtype=bool)
+        if mask.any():
+            failures.append((reason, mask))
+    return failures
+
+def _fill_value(series, how):
+    if how in FILL_STRATEGIES:
+        if not pd.api.types.is_numeric_dtype(series) and how != "mode":
+            return None
+        if how == "mode":
+            modes = series.mode()
+            return modes.iloc[0] if not modes.empty else None
+        value = getattr(series, how)()
+        return None if pd.isna(value) else value
+    return how
+
+def _failure_codes(failures, n, codes, columns):
+    """
+    failures -> list of (reason, boolean ndarray) pairs in evaluation order.
+    Returns each row's int32 failure code in `codes` (NO_FAILURE for rows
+    that passed); `columns` maps a reason to the column it checks.
+    """
+    if not failures:
+        return np.full(n, NO_FAILURE, dtype=np.int32)
+    reason_ids = [codes.reason_id(reason, columns.get(reason)) for reason, _ in failures]
+    matrix = np.column_stack([mask for _, mask in failures])
+    return codes.encode(matrix, reason_ids)
+
+def _evaluate_block(df, entries):
+    """Failures of a block of plan entries, in plan order (runs inside a worker)."""
+    failures = []
+    for entry in entries:
+        failures.extend(evaluate_column(df[entry["column"]], entry))
+    return failures
+
+_POOLS = {}
+
+def _pool(executor, workers):
+    """
+    Thread / process pool memoized per (process, executor, workers): every
+    chunk of a streaming run, and every run of a long-lived worker, reuses
+    the same pool instead of starting one per call. Keyed by pid so a forked
+    child never submits to a pool whose threads stayed in the parent.
+    """
+    key = (os.getpid(), executor, workers)
+    if key not in _POOLS:
+        pool_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+        _POOLS[key] = pool_class(max_workers=workers)
+    return _POOLS[key]
+
+def evaluate_plan(df, plan, workers=1, executor="thread"):
+    """
+    All (reason, mask) failures of `plan` over df, in plan order. With
+    workers > 1 and a wide frame, the plan is cut into contiguous column
+    blocks evaluated on a thread or process pool; blocks are concatenated in
+    order, so combined failure reasons match the serial path exactly.
+    """
+    entries = [entry for entry in plan if entry["column"] in df.columns]
+    if workers <= 1 or len(entries) < PARALLEL_MIN_COLUMNS:
+        return _evaluate_block(df, entries)
+
+    block_size = -(-len(entries) // (workers * 4))  # a few blocks per worker to even out cost
+    blocks = [entries[i:i + block_size] for i in range(0, len(entries), block_size)]
+    pool = _pool(executor, workers)
+    try:
+        if executor == "process":
+            # each process only receives its block's columns
+            futures = [pool.submit(_evaluate_block, df[[e["column"] for e in block]], block)
+                       for block in blocks]
+            results = [f.result() for f in futures]
+        else:
+            results = list(pool.map(lambda block: _evaluate_block(df, block), blocks))
+    except BrokenExecutor:
+        _POOLS.pop((os.getpid(), executor, workers), None)  # the next call starts a fresh pool
+        raise
+
+    failures = []
+    for block_failures in results:
+        failures.extend(block_failures)
+    return failures
+
+def apply_plan(df, plan, workers=1, executor="thread", codes=None):
+    """
+    Run a compiled plan over df and return (df_good, df_bad). Bad rows keep
+    their original values plus a `failure_code` into `codes` (a run-wide
+    failure_codes.ReasonCodes) or, without one, the combined `failure_reason`
+    text; good rows get the configured fillna values, computed from the good
+    rows (quarantined outliers do not shift a mean). `workers` / `executor`
+    fan column blocks out over a pool (see evaluate_plan).
+    """
+    failures = evaluate_plan(df, plan, workers=workers, executor=executor)
+    fills = {entry["column"]: entry["fillna"] for entry in plan
+             if entry["column"] in df.columns and entry["fillna"] is not None}
+
+    book = codes if codes is not None else ReasonCodes()
+    columns = {reason: entry["column"] for entry in plan for reason, _, _ in entry["checks"]}
+    row_codes = _failure_codes(failures, len(df), book, columns)
+    bad_mask = row_codes != NO_FAILURE
+
+    df_good = df[~bad_mask].reset_index(drop=True)
+    for col, how in fills.items():
+        if not df_good[col].isna().any():
+            continue
+        source = df_good[col]  # statistics of the passing rows only
+        if source.dtype == np.float32:
+            # compacted column: fill at full precision, as the uncompacted frame would
+            source = source.astype(np.float64)
+            df_good[col] = df_good[col].astype(np.float64)
+        value = _fill_value(source, how)
+        if value is not None:
+            if isinstance(df_good[col].dtype, pd.CategoricalDtype) and value not in df_good[col].cat.categories:
+                df_good[col] = df_good[col].cat.add_categories([value])
+            df_good[col] = df_good[col].fillna(value)
+
+    df_bad = df[bad_mask].copy()
+    if not df_bad.empty:
+        attach_failures(df_bad, row_codes[bad_mask], book, coded=codes is not None)
+    df_bad = df_bad.reset_index(drop=True)
 
     return df_good, df_bad
+
+def apply_rules(df, rules, schema=None, workers=1, executor="thread"):
+    if isinstance(df, str):
+        df = pd.read_csv(df)
+
+    if df.empty:
+        return df, pd.DataFrame()
+
+    if schema is None:
+        schema = detect_schema(df)
+    plan = compile_rules(rules, schema)
+    return apply_plan(df, plan, workers=workers, executor=executor)
@@ -1,9 +1,16 @@
+import os
 import sys
 from src.pipeline.orchestrator import run_pipeline
+from src.pipeline.batch_runner import run_batch
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python run.py <csv-file-path>")
+        print("Usage: python run.py <csv-file-path | directory | glob> [more ...]")
         sys.exit(1)
 
-    run_pipeline(sys.argv[1])
+    targets = sys.argv[1:]
+    if len(targets) == 1 and os.path.isfile(targets[0]):
+        run_pipeline(targets[0])
+    else:
+        summary, summary_path = run_batch(targets)
+        print(f"{summary['succeeded']}/{summary['files']} files succeeded, summary: {summary_path}")
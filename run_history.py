@@ -0,0 +1,201 @@
+# src/pipeline/run_history.py
+import os
+import json
+import sqlite3
+from glob import glob
+
+import pandas as pd
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+HISTORY_COLUMNS = ["run_id", "timestamp", "input_path", "total", "cleaned", "quarantined",
+                   "pass_rate_pct", "report_path"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id        TEXT PRIMARY KEY,
+    timestamp     TEXT NOT NULL,
+    input_path    TEXT,
+    total         INTEGER,
+    cleaned       INTEGER,
+    quarantined   INTEGER,
+    pass_rate_pct REAL,
+    report_path   TEXT,
+    report_json   TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_timestamp ON runs (timestamp);
+CREATE TABLE IF NOT EXISTS profiles (
+    run_id        TEXT PRIMARY KEY,
+    dataset       TEXT NOT NULL,
+    timestamp     TEXT NOT NULL,
+    profile_json  TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_profiles_dataset ON profiles (dataset, timestamp);
+"""
+
+# -------------------------
+# Store
+# -------------------------
+_INITIALIZED = set()
+
+def _connect(db_path):
+    """Connection to the history store; the schema DDL runs once per database and process."""
+    path = os.path.abspath(db_path)
+    if not os.path.exists(path):
+        _INITIALIZED.discard(path)  # removed (or never created) since: create the tables again
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # batch workers record runs concurrently; wait for the write lock instead of failing
+    conn = sqlite3.connect(path, timeout=30)
+    if path not in _INITIALIZED:
+        conn.executescript(_SCHEMA)
+        _INITIALIZED.add(path)
+    return conn
+
+def run_id_from_report(report_path):
+    """report_<run_id>.json -> run_id"""
+    name = os.path.splitext(os.path.basename(report_path))[0]
+    return name[len("report_"):] if name.startswith("report_") else name
+
+def record_run(db_path, report, report_path, input_path=None, run_id=None):
+    """
+    Append one run (summary columns + the report JSON) to the history.
+    The column profile is left out of the JSON: it is stored once, in the
+    profiles table (record_profile), and get_report puts it back.
+    Re-recording the same run_id replaces it.
+    """
+    run_id = run_id or run_id_from_report(report_path)
+    row = (
+        run_id,
+        report.get("timestamp", ""),
+        input_path,
+        report.get("total_records"),
+        report.get("cleaned_records"),
+        report.get("quarantined_records"),
+        report.get("pass_rate_pct"),
+        report_path,
+        json.dumps({k: v for k, v in report.items() if k != "columns"}),
+    )
+    conn = _connect(db_path)
+    try:
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+    finally:
+        conn.close()
+    return run_id
+
+def record_profile(db_path, run_id, dataset, timestamp, columns):
+    """Store a run's column profile (report["columns"], sketches included) as a drift baseline."""
+    conn = _connect(db_path)
+    try:
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO profiles VALUES (?, ?, ?, ?)",
+                         (run_id, dataset, timestamp, json.dumps(columns)))
+    finally:
+        conn.close()
+
+def recent_profiles(db_path, dataset, limit=10):
+    """Column profiles of the dataset's last `limit` runs, newest first (an index range scan)."""
+    if not os.path.exists(db_path):
+        return []
+    conn = _connect(db_path)
+    try:
+        rows = conn.execute("SELECT profile_json FROM profiles WHERE dataset = ? "
+                            "ORDER BY timestamp DESC LIMIT ?", (dataset, int(limit))).fetchall()
+    finally:
+        conn.close()
+    return [json.loads(row[0]) for row in rows]
+
+def import_reports(db_path, reports_dir):
+    """
+    Backfill the history from existing report_*.json files (runs already in
+    the store are skipped). Returns the number of reports imported.
+    """
+    conn = _connect(db_path)
+    try:
+        known = {r[0] for r in conn.execute("SELECT run_id FROM runs")}
+        rows = []
+        for path in glob(os.path.join(reports_dir, "report_*.json")):
+            run_id = run_id_from_report(path)
+            if run_id in known:
+                continue
+            try:
+                with open(path) as f:
+                    report = json.load(f)
+            except Exception:
+                continue
+            rows.append((run_id, report.get("timestamp", ""), None, report.get("total_records"),
+                         report.get("cleaned_records"), report.get("quarantined_records"),
+                         report.get("pass_rate_pct"), path, json.dumps(report)))
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    finally:
+        conn.close()
+    if rows:
+        logger.info(f"Imported {len(rows)} reports into run history: {db_path}")
+    return len(rows)
+
+# -------------------------
+# Queries
+# -------------------------
+def history_version(db_path):
+    """Changes whenever a run is recorded; use it as a cache key."""
+    try:
+        return os.stat(db_path).st_mtime_ns
+    except OSError:
+        return None
+
+def _time_filter(start, end):
+    """start / end -> ISO timestamps (inclusive start, exclusive end) or None"""
+    clauses, params = [], []
+    if start:
+        clauses.append("timestamp >= ?")
+        params.append(str(start))
+    if end:
+        clauses.append("timestamp < ?")
+        params.append(str(end))
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+def count_runs(db_path, start=None, end=None):
+    if not os.path.exists(db_path):
+        return 0
+    where, params = _time_filter(start, end)
+    conn = _connect(db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM runs{where}", params).fetchone()[0]
+    finally:
+        conn.close()
+
+def query_runs(db_path, start=None, end=None, limit=50, offset=0):
+    """
+    One page of run summaries, newest first, from the timestamp index.
+    The full report JSON is left out; fetch it with get_report.
+    """
+    if not os.path.exists(db_path):
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+    where, params = _time_filter(start, end)
+    sql = (f"SELECT {', '.join(HISTORY_COLUMNS)} FROM runs{where} "
+           f"ORDER BY timestamp DESC LIMIT ? OFFSET ?")
+    conn = _connect(db_path)
+    try:
+        return pd.read_sql_query(sql, conn, params=params + [int(limit), int(offset)])
+    finally:
+        conn.close()
+
+def get_report(db_path, run_id):
+    """Stored report dict for one run (column profile re-attached from the profiles table), or None."""
+    if not os.path.exists(db_path):
+        return None
+    conn = _connect(db_path)
+    try:
+        row = conn.execute("SELECT report_json FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        profile = conn.execute("SELECT profile_json FROM profiles WHERE run_id = ?", (run_id,)).fetchone()
+    finally:
+        conn.close()
+    if not row:
+        return None
+    report = json.loads(row[0])
+    if profile:
+        report["columns"] = json.loads(profile[0])
+    return report
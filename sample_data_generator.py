@@ -2,62 +2,176 @@ import pandas as pd
 import numpy as np
 import os
 
-def generate_sample_customers(n=200, outfile="data/samples/sample_customers.csv"):
-    os.makedirs("data/samples", exist_ok=True)
+FIRST_NAMES = np.array(["Liam","Olivia","Noah","Emma","Oliver","Ava","Elijah","Sophia"])
+LAST_NAMES = np.array(["Smith","Jones","Brown","Miller","Davis","Garcia"])
+COUNTRIES = np.array(["USA","CAN","UK","IND"])
+US_STATES = np.array(["NY","CA","TX","FL"])
+STATUSES = np.array(["PENDING","COMPLETE","CANCELLED"])
+CITIES = np.array(["New York","Toronto","London","Mumbai","Austin","Leeds"])
 
-    ids = [f"C{str(i+1).zfill(5)}" for i in range(n)]
-    first = np.random.choice(["Liam","Olivia","Noah","Emma","Oliver","Ava","Elijah","Sophia"], size=n)
-    last  = np.random.choice(["Smith","Jones","Brown","Miller","Davis","Garcia"], size=n)
-    age   = np.random.randint(18, 90, size=n)
-    country = np.random.choice(["USA","CAN","UK","IND"], size=n)
-    state = [np.random.choice(["NY","CA","TX","FL"]) if c=="USA" else "" for c in country]
-    email = [f"{f[0].lower()}.{l.lower()}@example.com" for f,l in zip(first,last)]
+# Share of rows receiving each kind of defect (all off by default)
+DEFAULT_DEFECTS = {
+    "null_rate": 0.0,            # nulls in the nullable columns
+    "out_of_range_rate": 0.0,    # age outside 18-90 / negative amounts
+    "bad_regex_rate": 0.0,       # malformed emails / order statuses outside the known set
+    "duplicate_rate": 0.0,       # exact copies of earlier rows
+    "near_duplicate_rate": 0.0,  # copies with a re-cased free-text field (email / ship_city)
+    "outlier_rate": 0.0,         # extreme numeric values
+}
+
+def _defects(defects):
+    merged = dict(DEFAULT_DEFECTS)
+    merged.update(defects or {})
+    return merged
+
+def _pick(rng, n, rate):
+    """Boolean mask selecting ~rate of n rows."""
+    return rng.random(n) < rate if rate > 0 else np.zeros(n, dtype=bool)
+
+def _ids(prefix, start, n, width):
+    return prefix + pd.Series(np.arange(start + 1, start + n + 1)).astype(str).str.zfill(width)
+
+def _add_duplicates(df, rng, defects, text_col):
+    """
+    Replace some rows with copies of other rows of the chunk: exact, or with
+    `text_col` case-swapped (so a near duplicate never equals its original).
+    """
+    n = len(df)
+    df = df.reset_index(drop=True)
+    for rate, near in ((defects["duplicate_rate"], False), (defects["near_duplicate_rate"], True)):
+        targets = np.flatnonzero(_pick(rng, n, rate))
+        if len(targets) == 0:
+            continue
+        order = np.arange(n)
+        order[targets] = rng.integers(0, n, size=len(targets))
+        df = df.iloc[order].reset_index(drop=True)
+        if near:
+            df.loc[targets, text_col] = df.loc[targets, text_col].str.swapcase()
+    return df
+
+# -------------------------
+# Vectorized frame builders
+# -------------------------
+def make_customers(n, start=0, seed=None, defects=None, id_width=5):
+    """Customers frame of n rows (ids start+1..start+n) with injected defects."""
+    rng = np.random.default_rng(seed)
+    defects = _defects(defects)
+
+    first = FIRST_NAMES[rng.integers(0, len(FIRST_NAMES), n)]
+    last = LAST_NAMES[rng.integers(0, len(LAST_NAMES), n)]
+    country = COUNTRIES[rng.integers(0, len(COUNTRIES), n)]
+    state = np.where(country == "USA", US_STATES[rng.integers(0, len(US_STATES), n)], "")
+    age = rng.integers(18, 90, n).astype(float)
+    email = (pd.Series(np.char.lower(np.char.add(np.char.add(first.astype("U1"), "."), last)))
+             + "@example.com")
 
     df = pd.DataFrame({
-        "customer_id": ids,
+        "customer_id": _ids("C", start, n, id_width),
         "first_name": first,
         "last_name": last,
         "age": age,
         "country": country,
         "state": state,
-        "email": email
+        "email": email,
     })
-    df.to_csv(outfile, index=False)
-    print("Sample customers saved to:", outfile)
-
-
-def generate_sample_orders(n=500, customers_file="data/samples/sample_customers.csv",
-                           outfile="data/samples/sample_orders.csv"):
-    os.makedirs("data/samples", exist_ok=True)
-
-    df_cust = pd.read_csv(customers_file)
-    customer_ids = df_cust["customer_id"].tolist()
 
-    order_ids = [f"O{str(i+1).zfill(6)}" for i in range(n)]
+    bad_age = _pick(rng, n, defects["out_of_range_rate"])
+    df.loc[bad_age, "age"] = rng.choice([-5.0, 150.0, 999.0], size=bad_age.sum())
+    outliers = _pick(rng, n, defects["outlier_rate"])
+    df.loc[outliers, "age"] = rng.uniform(1e4, 1e6, size=outliers.sum()).round()
+    bad_email = _pick(rng, n, defects["bad_regex_rate"])
+    df.loc[bad_email, "email"] = df.loc[bad_email, "email"].str.replace("@", "_at_", regex=False)
+    for col in ("age", "email", "country"):
+        nulls = _pick(rng, n, defects["null_rate"])
+        df.loc[nulls, col] = np.nan
+    df["age"] = df["age"].astype("Int64")  # whole years, nulls written as empty fields
 
-    valid_count = int(n * 0.9)
-    invalid_count = n - valid_count
+    return _add_duplicates(df, rng, defects, "email")
 
-    valid_customers = np.random.choice(customer_ids, size=valid_count)
-    invalid_customers = [f"C9999X{i}" for i in range(invalid_count)]
+def make_orders(n, n_customers, start=0, seed=None, defects=None, orphan_rate=0.1, id_width=6):
+    """Orders frame of n rows; ~orphan_rate of them point at customer ids that do not exist."""
+    rng = np.random.default_rng(seed)
+    defects = _defects(defects)
 
-    cust_list = np.concatenate([valid_customers, invalid_customers])
-    np.random.shuffle(cust_list)
+    cust_idx = rng.integers(1, max(n_customers, 1) + 1, n)
+    customer_ids = "C" + pd.Series(cust_idx).astype(str).str.zfill(max(5, len(str(n_customers))))
+    orphans = np.flatnonzero(_pick(rng, n, orphan_rate))
+    customer_ids.iloc[orphans] = "C9999X" + pd.Series(np.arange(len(orphans))).astype(str).to_numpy()
 
-    statuses = ["PENDING","COMPLETE","CANCELLED"]
-    amounts = [round(float(np.random.uniform(5,500)),2) for _ in range(n)]
-    dates = pd.date_range(start="2024-01-01", periods=n).strftime("%Y-%m-%d")
+    amounts = rng.uniform(5, 500, n).round(2)
+    dates = (pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(start, start + n) % 3650, unit="D"))
 
     df = pd.DataFrame({
-        "order_id": order_ids,
-        "customer_id": cust_list,
+        "order_id": _ids("O", start, n, id_width),
+        "customer_id": customer_ids.to_numpy(),
         "total_amount": amounts,
-        "status": np.random.choice(statuses, size=n),
-        "order_date": dates
+        "status": STATUSES[rng.integers(0, len(STATUSES), n)],
+        "ship_city": CITIES[rng.integers(0, len(CITIES), n)],
+        "order_date": dates.strftime("%Y-%m-%d"),
     })
 
-    df.to_csv(outfile, index=False)
+    negative = _pick(rng, n, defects["out_of_range_rate"])
+    df.loc[negative, "total_amount"] = -df.loc[negative, "total_amount"]
+    outliers = _pick(rng, n, defects["outlier_rate"])
+    df.loc[outliers, "total_amount"] = (df.loc[outliers, "total_amount"] * 1000).round(2)
+    bad_status = _pick(rng, n, defects["bad_regex_rate"])
+    df.loc[bad_status, "status"] = "UNKNOWN"
+    for col in ("total_amount", "status", "ship_city", "order_date"):
+        nulls = _pick(rng, n, defects["null_rate"])
+        df.loc[nulls, col] = np.nan
+
+    return _add_duplicates(df, rng, defects, "ship_city")
+
+# -------------------------
+# Chunked writers (10M+ rows in bounded memory)
+# -------------------------
+def write_customers(n, outfile, seed=42, defects=None, chunk_rows=1_000_000):
+    os.makedirs(os.path.dirname(outfile) or ".", exist_ok=True)
+    width = max(5, len(str(n)))
+    for i, start in enumerate(range(0, n, chunk_rows)):
+        rows = min(chunk_rows, n - start)
+        df = make_customers(rows, start=start, seed=None if seed is None else seed + i,
+                            defects=defects, id_width=width)
+        df.to_csv(outfile, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    return outfile
+
+def write_orders(n, n_customers, outfile, seed=43, defects=None, orphan_rate=0.1, chunk_rows=1_000_000):
+    os.makedirs(os.path.dirname(outfile) or ".", exist_ok=True)
+    width = max(6, len(str(n)))
+    for i, start in enumerate(range(0, n, chunk_rows)):
+        rows = min(chunk_rows, n - start)
+        df = make_orders(rows, n_customers, start=start, seed=None if seed is None else seed + i,
+                         defects=defects, orphan_rate=orphan_rate, id_width=width)
+        df.to_csv(outfile, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    return outfile
+
+# -------------------------
+# Original small samples
+# -------------------------
+def generate_sample_customers(n=200, outfile="data/samples/sample_customers.csv", seed=None, defects=None):
+    write_customers(n, outfile, seed=seed, defects=defects)
+    print("Sample customers saved to:", outfile)
+
+
+def generate_sample_orders(n=500, customers_file="data/samples/sample_customers.csv",
+                           outfile="data/samples/sample_orders.csv", seed=None, defects=None):
+    n_customers = len(pd.read_csv(customers_file, usecols=["customer_id"]))
+    write_orders(n, n_customers, outfile, seed=seed, defects=defects)
     print("Sample orders saved to:", outfile)
+
 if __name__ == "__main__":
-    generate_sample_customers()
-    generate_sample_orders()
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate synthetic customers / orders CSVs")
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--outdir", default="data/samples")
+    parser.add_argument("--seed", type=int, default=None)
+    for name, value in DEFAULT_DEFECTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float, default=value)
+    args = parser.parse_args()
+    defects = {name: getattr(args, name) for name in DEFAULT_DEFECTS}
+
+    customers_file = os.path.join(args.outdir, "sample_customers.csv")
+    generate_sample_customers(args.customers, customers_file, seed=args.seed, defects=defects)
+    generate_sample_orders(args.orders, customers_file, os.path.join(args.outdir, "sample_orders.csv"),
+                           seed=args.seed, defects=defects)
@@ -1,21 +1,123 @@
 import pandas as pd
+import numpy as np
 import os
+import json
 
-def detect_schema(obj):
+CATEGORICAL_MAX_DISTINCT = 20
+SAMPLE_SIZE = 10000
+DISTINCT_BLOCK_ROWS = 1 << 16
+PARSE_MIN_RATIO = 0.95
+ZERO_PADDED = r"^\s*[+-]?0\d"   # "00123", "-007": identifiers / codes, not numbers
+DATE_LIKE = r"^\s*(?:\d{4}[-/.]\d{1,2}[-/.]\d{1,2}|\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4})"
+
+def _sample(series, size=SAMPLE_SIZE):
+    """Non-null values at evenly spaced positions: bounded cost, deterministic, no full shuffle."""
+    values = series.dropna() if len(series) <= size else series.iloc[
+        np.linspace(0, len(series) - 1, size).astype(np.int64)
+    ].dropna()
+    return values
+
+def _parse_ratio(sample, kind):
+    """Fraction of sampled values that parse as `kind` ("numeric" or "datetime")."""
+    if sample.empty:
+        return 0.0
+    text = sample.astype(str)
+    if kind == "numeric":
+        parsed = pd.to_numeric(text, errors="coerce")
+        # zero-padded values would not survive a numeric round trip
+        return float((parsed.notna() & ~text.str.match(ZERO_PADDED)).mean())
+    looks_like_date = text.str.match(DATE_LIKE)
+    if looks_like_date.mean() < PARSE_MIN_RATIO:
+        return 0.0
+    parsed = pd.to_datetime(text, errors="coerce")
+    return float(parsed.notna().mean())
+
+def _has_at_least_distinct(series, sample, threshold=CATEGORICAL_MAX_DISTINCT):
+    """
+    True once `threshold` distinct values are seen. The sample is checked first
+    (its distinct count is a lower bound for the column), then the column is
+    scanned in blocks with an early exit, instead of a full nunique().
+    """
+    seen = set(pd.unique(sample))
+    if len(seen) >= threshold or len(series) <= len(sample):
+        return len(seen) >= threshold
+    for start in range(0, len(series), DISTINCT_BLOCK_ROWS):
+        block = series.iloc[start:start + DISTINCT_BLOCK_ROWS].dropna()
+        seen.update(pd.unique(block))
+        if len(seen) >= threshold:
+            return True
+    return False
+
+def infer_column(series):
+    """Return {"type": ..., "confidence": ...} for one column."""
+    if pd.api.types.is_numeric_dtype(series):
+        return {"type": "numeric", "confidence": 1.0}
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return {"type": "datetime", "confidence": 1.0}
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return {"type": "categorical", "confidence": 1.0}
+
+    sample = _sample(series)
+    if sample.empty:
+        return {"type": "categorical", "confidence": 0.0}
+
+    for kind in ("numeric", "datetime"):
+        ratio = _parse_ratio(sample, kind)
+        if ratio >= PARSE_MIN_RATIO:
+            return {"type": kind, "confidence": round(ratio, 4)}
+
+    if _has_at_least_distinct(series, sample):
+        return {"type": "string", "confidence": 1.0}
+    return {"type": "categorical", "confidence": 1.0}
+
+def infer_schema(obj):
+    """
+    Per-column type plus confidence: the share of sampled values consistent with
+    the chosen type (1.0 when it comes straight from the dtype or the exact
+    distinct check).
+    """
     if isinstance(obj, str):
         obj = pd.read_csv(obj)
+    return {col: infer_column(obj[col]) for col in obj.columns}
+
+def schema_types(info):
+    """{column: type} view of infer_schema output, the shape the rest of the pipeline uses."""
+    return {col: meta["type"] for col, meta in info.items()}
+
+def detect_schema(obj):
+    return schema_types(infer_schema(obj))
 
-    schema = {}
-    for col in obj.columns:
-        series = obj[col]
+# -------------------------
+# Schema cache
+# -------------------------
+def load_cached_schema(cache_dir, key):
+    path = os.path.join(cache_dir, f"schema_{key}.json")
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception:
+        return None
 
-        if pd.api.types.is_numeric_dtype(series):
-            schema[col] = "numeric"
-        elif pd.api.types.is_datetime64_any_dtype(series):
-            schema[col] = "datetime"
-        elif series.nunique() < 20:
-            schema[col] = "categorical"
-        else:
-            schema[col] = "string"
+def save_cached_schema(cache_dir, key, schema):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"schema_{key}.json")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(schema, f)
+    os.replace(tmp, path)
 
-    return schema
+def detect_schema_cached(df, key, cache_dir):
+    """
+    infer_schema with a JSON cache: `key` identifies the input (file
+    fingerprint + rules version), so a repeat run skips inference entirely.
+    Returns (schema_info, cache_hit).
+    """
+    info = load_cached_schema(cache_dir, key)
+    if isinstance(info, dict) and list(info) == list(df.columns) and \
+            all(isinstance(meta, dict) for meta in info.values()):
+        return info, True
+    info = infer_schema(df)
+    save_cached_schema(cache_dir, key, info)
+    return info, False
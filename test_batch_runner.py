@@ -0,0 +1,39 @@
+# tests/test_batch_runner.py
+import os
+
+from src.pipeline import batch_runner
+from src.pipeline.batch_runner import collect_inputs, run_batch
+
+_run_one = batch_runner._run_one
+
+def _fake_run(path, rules_path, chunksize, n_jobs):
+    """Stand-in for a pipeline run: kills its worker process on "crash" files."""
+    if "crash" in os.path.basename(path):
+        os._exit(1)
+    return {"input_path": path, "status": "ok", "error": None, "seconds": 0.0, "total_records": 10,
+            "cleaned_records": 9, "quarantined_records": 1, "pass_rate_pct": 90.0,
+            "clean_path": None, "quarantine_path": None, "report_path": None}
+
+def _inputs(tmp_path, names):
+    for name in names:
+        (tmp_path / name).write_text("id\n1\n")
+    return str(tmp_path)
+
+def test_collect_inputs_expands_dirs_globs_and_files(tmp_path):
+    _inputs(tmp_path, ["a.csv", "b.csv", "notes.txt"])
+    (tmp_path / "sub").mkdir()
+    _inputs(tmp_path / "sub", ["c.csv"])
+    found = collect_inputs([str(tmp_path), str(tmp_path / "sub" / "*.csv"), str(tmp_path / "a.csv")])
+    assert [os.path.relpath(p, tmp_path) for p in found] == ["a.csv", "b.csv", os.path.join("sub", "c.csv")]
+
+def test_crashing_worker_fails_only_its_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_runner, "_run_one", _fake_run)  # forked workers see the patch
+    folder = _inputs(tmp_path, ["a.csv", "b_crash.csv", "c.csv", "d.csv", "e_crash.csv", "f.csv"])
+    summary, summary_path = run_batch(folder, workers=3, output_dir=str(tmp_path / "reports"))
+
+    status = {os.path.basename(f["input_path"]): f["status"] for f in summary["results"]}
+    assert status == {"a.csv": "ok", "b_crash.csv": "failed", "c.csv": "ok", "d.csv": "ok",
+                      "e_crash.csv": "failed", "f.csv": "ok"}
+    assert summary["succeeded"] == 4 and summary["failed"] == 2
+    assert summary["total_records"] == 40
+    assert os.path.exists(summary_path)
@@ -0,0 +1,57 @@
+# tests/test_column_profile.py
+import numpy as np
+import pandas as pd
+
+from src.pipeline.column_profile import QuantileDigest, DistinctCounter, FrameProfile
+
+def test_hll_merge_matches_whole_stream_and_true_count():
+    rng = np.random.default_rng(3)
+    values = pd.Series(rng.integers(0, 50_000, 200_000))
+    whole = DistinctCounter().update_hashes(pd.util.hash_array(values.to_numpy()))
+    merged = DistinctCounter()
+    for part in np.array_split(values.to_numpy(), 7):
+        merged.merge(DistinctCounter().update_hashes(pd.util.hash_array(part)))
+
+    assert merged.count() == whole.count()  # register-wise max: merging is exact
+    true = values.nunique()
+    assert abs(merged.count() - true) / true < 0.05  # ~1.6% standard error at p=12
+
+def test_hll_survives_serialisation():
+    counter = DistinctCounter().update_hashes(pd.util.hash_array(np.arange(1000)))
+    assert DistinctCounter.from_string(counter.to_string()).count() == counter.count()
+
+def test_digest_merge_quantiles_close_to_exact():
+    rng = np.random.default_rng(5)
+    values = rng.lognormal(3, 1, 100_000)
+    merged = QuantileDigest()
+    for part in np.array_split(values, 10):
+        merged.merge(QuantileDigest().update(part))
+
+    qs = [0.01, 0.25, 0.5, 0.75, 0.99]
+    estimates = merged.quantiles(qs, values.min(), values.max())
+    # rank error: the estimate sits within half a percent of the target quantile
+    ranks = np.searchsorted(np.sort(values), estimates) / len(values)
+    assert np.abs(ranks - np.array(qs)).max() < 0.005
+    assert merged.weights.sum() == len(values)
+
+def test_frame_profile_of_chunks_equals_whole_frame():
+    rng = np.random.default_rng(11)
+    df = pd.DataFrame({
+        "amount": np.where(rng.random(10_000) < 0.02, np.nan, rng.normal(100, 15, 10_000)),
+        "status": rng.choice(["NEW", "PAID", "SHIPPED"], 10_000),
+    })
+    schema = {"amount": "numeric", "status": "categorical"}
+    whole = FrameProfile(schema).update(df).to_dict()
+    chunked = FrameProfile(schema)
+    for start in range(0, len(df), 1234):
+        chunked.merge(FrameProfile(schema).update(df.iloc[start:start + 1234]))
+    chunked = chunked.to_dict()
+
+    for col in ("amount", "status"):
+        assert chunked[col]["count"] == whole[col]["count"]
+        assert chunked[col]["nulls"] == whole[col]["nulls"]
+        assert chunked[col]["distinct"] == whole[col]["distinct"]
+    assert np.isclose(chunked["amount"]["mean"], whole["amount"]["mean"])
+    assert np.isclose(chunked["amount"]["std"], whole["amount"]["std"])
+    assert chunked["amount"]["min"] == whole["amount"]["min"]
+    assert chunked["status"]["top"] == whole["status"]["top"]
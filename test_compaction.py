@@ -0,0 +1,38 @@
+# tests/test_compaction.py
+import numpy as np
+import pandas as pd
+
+from src.pipeline.compaction import compact_frame, canonical_frame
+from src.pipeline.dedup import row_hashes
+
+def _frame(n=1000):
+    rng = np.random.default_rng(4)
+    return pd.DataFrame({
+        "qty": rng.integers(0, 100, n),
+        "price": rng.integers(0, 1000, n) / 4,          # exact in float32
+        "ratio": rng.random(n),                          # not exact in float32
+        "status": rng.choice(["NEW", "PAID", "SHIPPED"], n).astype(object),
+        "note": [f"note {i}" for i in range(n)],
+    })
+
+SCHEMA = {"qty": "numeric", "price": "numeric", "ratio": "numeric", "status": "categorical",
+          "note": "categorical"}
+
+def test_compaction_shrinks_dtypes_without_changing_values():
+    df = _frame()
+    compact = compact_frame(df, SCHEMA)
+
+    assert compact["qty"].dtype == np.int8
+    assert compact["price"].dtype == np.float32
+    assert compact["ratio"].dtype == np.float64       # float32 would round it
+    assert isinstance(compact["status"].dtype, pd.CategoricalDtype)
+    assert not isinstance(compact["note"].dtype, pd.CategoricalDtype)  # all distinct: no gain
+    assert compact.memory_usage(deep=True).sum() < df.memory_usage(deep=True).sum()
+    pd.testing.assert_frame_equal(compact.astype(object), df.astype(object))
+
+def test_compacted_rows_hash_like_the_original():
+    df = _frame()
+    df.loc[::7, "qty"] = np.nan                        # ints that picked up NaN
+    compact = compact_frame(df, SCHEMA)
+    assert (row_hashes(df) == row_hashes(compact)).all()
+    pd.testing.assert_frame_equal(canonical_frame(df), canonical_frame(compact))
@@ -0,0 +1,58 @@
+# tests/test_dedup.py
+import numpy as np
+import pandas as pd
+
+from src.pipeline.dedup import Deduplicator, SeenHashes, minhash_signatures, near_duplicate_groups
+
+def _people():
+    return pd.DataFrame({
+        "person_id": ["P1", "P2", "P3", "P4", "P5", "P6"],
+        "last_name": ["Barr", "Barr", "Barr", "Stone", "Stone", "Stone"],
+        "email": ["jerry.barr@x.com", "Jerry.Barr@X.com", "tina.barr@x.com",
+                  "ann.stone@y.org", "ann.stone@y.org", "bob.stone@y.org"],
+    })
+
+def test_exact_duplicates_are_caught_across_chunks_with_their_survivor():
+    df = pd.DataFrame({"order_id": np.arange(300), "amount": np.arange(300) % 100})
+    dedup = Deduplicator(ignore_columns=["order_id"])
+    kept, dups = [], []
+    for start in range(0, len(df), 70):
+        k, d = dedup.split(df.iloc[start:start + 70])
+        kept.append(k)
+        dups.append(d)
+    kept, dups = pd.concat(kept), pd.concat(dups)
+
+    assert kept["order_id"].tolist() == list(range(100))
+    assert len(dups) == 200
+    assert (dups["duplicate_of"] == dups["order_id"] % 100).all()
+    assert set(dups["failure_reason"]) == {"exact duplicate"}
+
+def test_seen_hashes_keep_ids_out_of_python_objects():
+    seen = SeenHashes()
+    for start in range(0, 1000, 100):
+        hashes = np.arange(start, start + 100, dtype=np.uint64) * np.uint64(2654435761)
+        seen.add(hashes, np.array([f"C{i:05d}" for i in range(start, start + 100)], dtype=object))
+    assert len(seen) == 1000
+    assert all(ids.dtype.kind == "U" for _, ids in seen._runs)
+
+    found, ids = seen.lookup(np.array([5, 999, 1000], dtype=np.uint64) * np.uint64(2654435761))
+    assert found.tolist() == [True, True, False]
+    assert ids.tolist() == ["C00005", "C00999", None]
+
+def test_near_duplicates_link_to_the_earliest_row_in_their_block():
+    survivors = near_duplicate_groups(_people(), ["email"], block_on=["last_name"])
+    # re-cased email matches P1; P5 repeats P4; different people stay apart
+    assert survivors.tolist() == [0, 0, 2, 3, 3, 5]
+
+def test_near_duplicates_need_a_shared_block():
+    df = _people()
+    df.loc[1, "last_name"] = "Other"
+    assert near_duplicate_groups(df, ["email"], block_on=["last_name"])[1] == 1
+
+def test_minhash_agreement_estimates_jaccard_similarity():
+    text = pd.Series(["abcdefghijklmnopqrst", "abcdefghijklmnopqrsu", "zyxwvutsrqponmlkjihg"])
+    signatures = minhash_signatures(text, num_perm=256)
+    close = (signatures[0] == signatures[1]).mean()
+    far = (signatures[0] == signatures[2]).mean()
+    assert abs(close - 17 / 19) < 0.1  # 18 shingles each, 17 shared
+    assert far < 0.05
@@ -0,0 +1,59 @@
+# tests/test_drift.py
+import numpy as np
+import pandas as pd
+import yaml
+
+from src.pipeline.column_profile import FrameProfile
+from src.pipeline.drift import baseline_profile, compare_profiles
+from src.pipeline.quality_report import check_gates
+from src.pipeline.orchestrator import run_pipeline
+
+SCHEMA = {"amount": "numeric", "status": "categorical"}
+
+def _orders(seed, n=5000, shift=0.0, statuses=("NEW", "PAID", "SHIPPED"), null_rate=0.0):
+    rng = np.random.default_rng(seed)
+    amount = rng.normal(100 + shift, 15, n)
+    amount[rng.random(n) < null_rate] = np.nan
+    return pd.DataFrame({"amount": amount, "status": rng.choice(list(statuses), n)})
+
+def _profile(df):
+    return FrameProfile(SCHEMA).update(df)
+
+def test_same_distribution_does_not_drift():
+    baseline = baseline_profile([_profile(_orders(seed)).to_dict() for seed in range(3)])
+    drift = compare_profiles(_profile(_orders(9)), baseline, baseline_runs=3)
+    assert drift["drifted_columns"] == []
+    assert drift["baseline_runs"] == 3
+
+def test_shift_new_values_and_nulls_are_flagged():
+    baseline = baseline_profile([_profile(_orders(1)).to_dict()])
+    current = _orders(2, shift=30, statuses=("NEW", "PAID", "SHIPPED", "LOST"), null_rate=0.2)
+    current["region"] = "EU"
+    profile = FrameProfile(dict(SCHEMA, region="categorical")).update(current)
+    drift = compare_profiles(profile, baseline)
+
+    assert set(drift["columns"]["amount"]["flags"]) == {"null_rate", "distribution"}
+    assert drift["columns"]["status"]["new_values"] == ["LOST"]
+    assert drift["columns"]["region"]["flags"] == ["new_column"]
+    assert drift["drifted_columns"] == ["amount", "status", "region"]
+
+def test_gates_check_pass_rate_and_drifted_columns():
+    report = {"pass_rate_pct": 80.0, "drift": {"drifted_columns": ["amount"]}}
+    assert check_gates(report, {"fail_if_pass_rate_below": 70})["passed"]
+    gates = check_gates(report, {"fail_if_pass_rate_below": 90, "fail_if_drifted_columns_above": 0})
+    assert not gates["passed"] and len(gates["failures"]) == 2
+
+def test_pipeline_fails_the_drift_gate_against_earlier_runs(tmp_path):
+    rules_path = tmp_path / "rules.yml"
+    rules_path.write_text(yaml.safe_dump({"ml": {"enabled": False},
+                                          "pipeline": {"fail_if_drifted_columns_above": 0}}))
+    data_dir = str(tmp_path / "data")
+    path = tmp_path / "orders.csv"
+    first = None
+    for seed, shift in ((1, 0), (2, 40)):
+        _orders(seed, n=2000, shift=shift).to_csv(path, index=False)
+        result = run_pipeline(str(path), rules_path=str(rules_path), data_dir=data_dir)
+        first = first or result
+    assert "drift" not in first["report"] and first["report"]["gates"]["passed"]
+    assert result["report"]["drift"]["drifted_columns"] == ["amount"]
+    assert not result["report"]["gates"]["passed"]
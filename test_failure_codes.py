@@ -0,0 +1,41 @@
+# tests/test_failure_codes.py
+import numpy as np
+import pandas as pd
+
+from src.pipeline.failure_codes import ReasonCodes, REASON_SEP, NO_FAILURE, render_reasons, CODE_COLUMN
+
+def _book():
+    codes = ReasonCodes()
+    ids = [codes.reason_id("amount: below min 0", "amount"), codes.reason_id("email: NULL not allowed", "email")]
+    matrix = np.array([[True, False], [False, False], [True, True], [True, False], [False, True]])
+    return codes, codes.encode(matrix, ids)
+
+def test_one_code_per_failure_pattern():
+    codes, row_codes = _book()
+    assert row_codes[1] == NO_FAILURE
+    assert row_codes[0] == row_codes[3]
+    assert len(set(row_codes[[0, 2, 4]])) == 3 == len(codes)
+    assert codes.render(row_codes).tolist() == [
+        "amount: below min 0", "", REASON_SEP.join(["amount: below min 0", "email: NULL not allowed"]),
+        "amount: below min 0", "email: NULL not allowed",
+    ]
+
+def test_counts_per_reason_and_column_across_tallies():
+    codes, row_codes = _book()
+    tally = codes.tally(row_codes[:2])
+    dups = codes.encode_labels(["exact duplicate", "exact duplicate"])
+    tally = codes.tally(np.concatenate([row_codes[2:], dups]), tally)  # a later chunk, new codes too
+
+    assert codes.reason_counts(tally) == {"amount: below min 0": 3, "email: NULL not allowed": 2,
+                                          "exact duplicate": 2}
+    assert codes.column_counts(tally) == {"amount": 3, "email": 2}
+
+def test_dictionary_round_trips_through_the_report():
+    codes, row_codes = _book()
+    restored = ReasonCodes.from_dict(codes.to_dict(codes.tally(row_codes)))
+    assert restored.render(row_codes).tolist() == codes.render(row_codes).tolist()
+
+    quarantine = pd.DataFrame({"id": [1, 3, 5], CODE_COLUMN: row_codes[[0, 2, 4]]})
+    shown = render_reasons(quarantine, restored)
+    assert shown.columns.tolist() == ["id", CODE_COLUMN, "failure_reason"]
+    assert shown["failure_reason"].iloc[2] == "email: NULL not allowed"
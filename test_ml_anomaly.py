@@ -0,0 +1,36 @@
+# tests/test_ml_anomaly.py
+import numpy as np
+import pandas as pd
+
+from src.pipeline.ml_anomaly import ReservoirSample
+
+def _stream(n, chunk_sizes):
+    start = 0
+    while start < n:
+        for size in chunk_sizes:
+            if start >= n:
+                return
+            yield pd.DataFrame({"x": np.arange(start, min(start + size, n), dtype=float)})
+            start += size
+
+def test_reservoir_holds_at_most_size_distinct_rows():
+    reservoir = ReservoirSample(["x"], size=1000, random_state=1)
+    for chunk in _stream(20_000, [7, 900, 3000]):
+        reservoir.add(chunk)
+    sample = reservoir.frame()["x"]
+    assert reservoir.seen == 20_000
+    assert len(sample) == 1000
+    assert sample.is_unique
+
+def test_reservoir_sample_is_uniform_over_the_stream():
+    """Every tenth of the stream ends up in the sample equally often, whatever the chunk sizes."""
+    n, size, trials = 10_000, 1000, 200
+    per_decile = np.zeros(10)
+    for seed in range(trials):
+        reservoir = ReservoirSample(["x"], size=size, random_state=seed)
+        for chunk in _stream(n, [333, 50, 2500]):
+            reservoir.add(chunk)
+        per_decile += np.bincount((reservoir.frame()["x"].to_numpy() * 10 // n).astype(int), minlength=10)
+
+    expected = trials * size / 10
+    assert np.abs(per_decile / expected - 1).max() < 0.05
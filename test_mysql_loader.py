@@ -0,0 +1,57 @@
+# tests/test_mysql_loader.py
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.mysql_loader import bulk_load, delta_load, plan_delta, row_hashes, HASH_COLUMN
+
+def _customers(n=10):
+    return pd.DataFrame({"customer_id": np.arange(n), "name": [f"c{i}" for i in range(n)],
+                         "score": np.arange(n, dtype=float) / 2})
+
+def _table(db, table="customers"):
+    with sqlite3.connect(db) as conn:
+        return pd.read_sql(f"SELECT customer_id, name, score FROM {table} ORDER BY customer_id", conn)
+
+def test_delta_load_counts_and_final_table(tmp_path):
+    db = {"engine": "sqlite", "database": str(tmp_path / "delta.sqlite")}
+    first = _customers(10)
+    assert delta_load(first, "customers", db, "customer_id") == \
+        {"inserted": 10, "updated": 0, "deleted": 0, "unchanged": 0}
+
+    second = first[first["customer_id"] != 3].copy()                      # 1 deleted
+    second.loc[second["customer_id"].isin([1, 5]), "score"] += 100        # 2 updated
+    second = pd.concat([second, _customers(12).iloc[10:]])                # 2 inserted
+    assert delta_load(second, "customers", db, "customer_id") == \
+        {"inserted": 2, "updated": 2, "deleted": 1, "unchanged": 7}
+
+    stored = _table(db["database"])
+    expected = second.sort_values("customer_id").reset_index(drop=True)
+    pd.testing.assert_frame_equal(stored, expected, check_dtype=False)
+
+    # a second identical load changes nothing
+    assert delta_load(second, "customers", db, "customer_id") == \
+        {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 11}
+
+def test_row_hashes_ignore_dtype_and_column_order():
+    df = _customers()
+    compact = df[["score", "name", "customer_id"]].copy()
+    compact["score"] = compact["score"].astype(np.float32)
+    compact["name"] = compact["name"].astype("category")
+    assert (row_hashes(df, "customer_id") == row_hashes(compact, "customer_id")).all()
+
+    previous = pd.DataFrame({"customer_id": df["customer_id"], HASH_COLUMN: row_hashes(df, "customer_id")})
+    to_insert, to_update, delete_keys = plan_delta(compact, previous, "customer_id")
+    assert to_insert.empty and to_update.empty and delete_keys == []
+
+def test_bulk_load_keeps_dates_the_rules_accept(tmp_path, caplog):
+    db = {"engine": "sqlite", "database": str(tmp_path / "dates.sqlite")}
+    df = pd.DataFrame({"order_id": [1, 2, 3, 4],
+                       "order_date": ["2024-01-05", "05/02/2024", "Jan 3 2024", "not a date"]})
+    assert bulk_load([df], "orders", db, schema={"order_id": "numeric", "order_date": "datetime"}) == 4
+
+    with sqlite3.connect(db["database"]) as conn:
+        stored = [r[0] for r in conn.execute("SELECT order_date FROM orders ORDER BY order_id")]
+    assert stored == ["2024-01-05 00:00:00", "2024-05-02 00:00:00", "2024-01-03 00:00:00", None]
+    assert "1 value(s) are not dates" in caplog.text
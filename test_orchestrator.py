@@ -0,0 +1,108 @@
+# tests/test_orchestrator.py
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from src.pipeline.orchestrator import run_pipeline, load_csv_safely, iter_csv_chunks, ENCODING_SAMPLE_BYTES
+from src.pipeline.outputs import read_output
+from src.pipeline.failure_codes import ReasonCodes, CODE_COLUMN
+
+# Rules that make a chunked run well defined: no per-chunk fill statistics
+# (nulls are quarantined), no model (a chunk-sampled fit may differ) and no
+# near duplicates (only looked for within a chunk).
+RULES = {
+    "default_rules": {
+        "numeric": {"drop_nulls": True, "min": 0},
+        "string": {"drop_nulls": True, "max_length": 20},
+        "categorical": {"drop_nulls": True, "allowed_values": ["NEW", "PAID", "SHIPPED"]},
+    },
+    "ml": {"enabled": False},
+    "dedup": {"near": None},
+    "pipeline": {"result_cache": False},
+}
+
+@pytest.fixture
+def orders(tmp_path):
+    rng = np.random.default_rng(21)
+    n = 1000
+    df = pd.DataFrame({
+        "order_id": np.arange(n),
+        "amount": rng.normal(50, 30, n).round(2),
+        "status": rng.choice(["NEW", "PAID", "SHIPPED", "LOST"], n, p=[0.3, 0.3, 0.35, 0.05]),
+        "email": [f"buyer{i}@shop.com" if i % 97 else f"buyer{i}@a-very-long-domain.com" for i in range(n)],
+    })
+    df.loc[rng.random(n) < 0.03, "amount"] = np.nan
+    # exact duplicates, some far from their original (other chunks)
+    dups = df.sample(40, random_state=1)
+    df = pd.concat([df, dups]).sample(frac=1, random_state=2).reset_index(drop=True)
+    path = tmp_path / "invariant_orders.csv"
+    df.to_csv(path, index=False)
+    rules_path = tmp_path / "rules.yml"
+    rules_path.write_text(yaml.safe_dump(RULES))
+    return str(path), str(rules_path)
+
+def _outputs(result):
+    clean = read_output(result["clean_path"]).sort_values("order_id").reset_index(drop=True)
+    quarantine = read_output(result["quarantine_path"])
+    codes = ReasonCodes.from_dict(result["report"]["failure_codes"])
+    reasons = sorted(zip(quarantine["order_id"], codes.render(quarantine[CODE_COLUMN].to_numpy())))
+    return clean, reasons
+
+@pytest.mark.parametrize("chunksize", [37, 250])
+def test_chunked_run_matches_whole_file_run(orders, tmp_path, chunksize):
+    path, rules_path = orders
+    whole = run_pipeline(path, rules_path=rules_path, data_dir=str(tmp_path / "whole"))
+    chunked = run_pipeline(path, rules_path=rules_path, chunksize=chunksize,
+                           data_dir=str(tmp_path / f"chunked_{chunksize}"))
+
+    for key in ("clean_rows", "bad_rows", "anomaly_rows", "duplicate_rows"):
+        assert chunked[key] == whole[key]
+    assert whole["duplicate_rows"] == 40
+    assert chunked["failure_reasons"] == whole["failure_reasons"]
+
+    clean_whole, reasons_whole = _outputs(whole)
+    clean_chunked, reasons_chunked = _outputs(chunked)
+    pd.testing.assert_frame_equal(clean_chunked, clean_whole, check_dtype=False)
+    assert reasons_chunked == reasons_whole
+
+def test_arrow_reader_keeps_date_and_time_text(tmp_path):
+    path = tmp_path / "times.csv"
+    path.write_text("id,day,at,stamp\n1,2024-01-05,10:00:00,2024-01-05T10:00\n2,,11:30:00,2024-01-06T08:15\n")
+    arrow = load_csv_safely(str(path), engine="pyarrow")
+    c = load_csv_safely(str(path), engine="c")
+    assert arrow["stamp"].tolist() == ["2024-01-05T10:00", "2024-01-06T08:15"]
+    assert arrow["at"].tolist() == ["10:00:00", "11:30:00"]
+    pd.testing.assert_frame_equal(arrow, c, check_dtype=False)
+
+@pytest.mark.parametrize("engine", ["pyarrow", "c"])
+def test_late_non_utf8_bytes_read_alike_whole_and_chunked(tmp_path, engine):
+    """UTF-8 in the encoding sample, latin1 further in: no replaced bytes, same text both ways."""
+    lines = ["id,name"] + [f"{i},plain{i}" for i in range(ENCODING_SAMPLE_BYTES // 10)]
+    path = tmp_path / "late_latin1.csv"
+    path.write_bytes(("\n".join(lines) + "\n").encode() + "999999,café\n".encode("latin1"))
+    whole = load_csv_safely(str(path), engine=engine)
+    chunked = pd.concat(iter_csv_chunks(str(path), 50_000), ignore_index=True)
+    assert whole["name"].iloc[-1] == chunked["name"].iloc[-1] == "café"
+    pd.testing.assert_frame_equal(whole, chunked, check_dtype=False)
+
+@pytest.mark.parametrize("engine", ["pyarrow", "c"])
+def test_zero_padded_codes_keep_their_padding(tmp_path, engine):
+    path = tmp_path / "codes.csv"
+    path.write_text("id,zip,amount\n1,00501,1.5\n2,90210,2.0\n3,-0012,\n4,,3.25\n")
+    whole = load_csv_safely(str(path), engine=engine)
+    chunked = pd.concat(iter_csv_chunks(str(path), 2), ignore_index=True)
+    for df in (whole, chunked):
+        assert df["zip"].tolist()[:3] == ["00501", "90210", "-0012"] and pd.isna(df["zip"].iloc[3])
+        assert pd.api.types.is_numeric_dtype(df["amount"])
+    pd.testing.assert_frame_equal(whole, chunked, check_dtype=False)
+
+def test_zero_padded_column_is_not_detected_as_numeric(tmp_path):
+    path = tmp_path / "padded_orders.csv"
+    pd.DataFrame({"order_id": [f"{i:06d}" for i in range(1, 51)],
+                  "amount": np.linspace(1, 50, 50)}).to_csv(path, index=False)
+    rules_path = tmp_path / "rules.yml"
+    rules_path.write_text(yaml.safe_dump(RULES))
+    result = run_pipeline(str(path), rules_path=str(rules_path), data_dir=str(tmp_path / "data"))
+    assert result["schema_sample"]["order_id"] != "numeric"
+    assert pd.read_csv(result["clean_path"], dtype=str)["order_id"].str.len().eq(6).all()
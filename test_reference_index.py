@@ -0,0 +1,43 @@
+# tests/test_reference_index.py
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline import rule_engine
+from src.pipeline.reference_index import load_reference_index
+from src.pipeline.rule_engine import apply_plan, compile_column
+
+def _reference(tmp_path, ids):
+    path = tmp_path / "customers.csv"
+    pd.DataFrame({"customer_id": ids, "name": [f"n{i}" for i in range(len(ids))]}).to_csv(path, index=False)
+    return str(path)
+
+def test_keys_match_across_int_float_and_text(tmp_path):
+    index = load_reference_index(_reference(tmp_path, [1, 2, 3, 42]), "customer_id",
+                                 cache_dir=str(tmp_path / "cache"))
+    assert index.contains(pd.Series([42, 7])).tolist() == [True, False]
+    assert index.contains(pd.Series([42.0, np.nan, 7.0])).tolist() == [True, True, False]  # ints with NaN
+    assert index.contains(pd.Series(["42", "7", None])).tolist() == [True, False, True]
+    assert index.contains(pd.Series(["1", "9", None], dtype="category")).tolist() == [True, False, True]
+
+def test_index_is_cached_and_rebuilt_when_the_reference_changes(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    path = _reference(tmp_path, np.arange(100))
+    assert len(load_reference_index(path, "customer_id", cache_dir=cache_dir)) == 100
+    assert len(os.listdir(cache_dir)) == 1
+
+    _reference(tmp_path, np.arange(150))
+    os.utime(path, ns=(0, 10**18))                     # a new fingerprint even within one mtime tick
+    index = load_reference_index(path, "customer_id", cache_dir=cache_dir)
+    assert len(index) == 150
+    assert len(os.listdir(cache_dir)) == 1             # the stale index file was replaced
+
+def test_foreign_key_rule_quarantines_unknown_keys(tmp_path, monkeypatch):
+    monkeypatch.setattr(rule_engine, "load_reference_index",
+                        lambda path, column: load_reference_index(path, column, str(tmp_path / "cache")))
+    path = _reference(tmp_path, ["C001", "C002"])
+    plan = [compile_column("customer_id", "string", {"foreign_key": {"reference": path}})]
+    good, bad = apply_plan(pd.DataFrame({"customer_id": ["C001", "C404", None, "C002"]}), plan)
+    assert good["customer_id"].fillna("").tolist() == ["C001", "", "C002"]  # a null is no dangling key
+    assert bad["failure_reason"].tolist() == ["customer_id: not found in customers.csv.customer_id"]
@@ -0,0 +1,50 @@
+# tests/test_result_cache.py
+import os
+
+import pandas as pd
+import yaml
+
+from src.pipeline.orchestrator import run_pipeline, data_paths
+from src.pipeline.outputs import read_output
+from src.pipeline.result_cache import evict, cache_entries
+from src.pipeline.run_history import query_runs
+
+RULES = {"default_rules": {"numeric": {"drop_nulls": True, "min": 0}}, "ml": {"enabled": False}}
+
+def _inputs(tmp_path):
+    path = tmp_path / "cached_orders.csv"
+    pd.DataFrame({"order_id": range(20), "amount": [5.0, -1.0, None, 7.5] * 5}).to_csv(path, index=False)
+    rules_path = tmp_path / "rules.yml"
+    rules_path.write_text(yaml.safe_dump(RULES))
+    return str(path), str(rules_path)
+
+def test_hit_reuses_outputs_and_survives_eviction(tmp_path):
+    path, rules_path = _inputs(tmp_path)
+    data_dir = str(tmp_path / "data")
+    first = run_pipeline(path, rules_path=rules_path, data_dir=data_dir)
+    hit = run_pipeline(path, rules_path=rules_path, data_dir=data_dir)
+
+    assert not first["cache_hit"] and hit["cache_hit"]
+    assert (hit["clean_rows"], hit["bad_rows"]) == (first["clean_rows"], first["bad_rows"]) == (10, 10)
+    paths = data_paths(data_dir)
+    cache_dir = paths["result_cache"]
+    for field in ("clean_path", "quarantine_path", "report_path"):
+        assert hit[field] != first[field]
+        assert not os.path.abspath(hit[field]).startswith(os.path.abspath(cache_dir))
+
+    assert len(cache_entries(cache_dir)) == 1
+    assert evict(cache_dir, 0) == 1
+    recorded = query_runs(paths["history"])["report_path"].tolist()
+    assert hit["report_path"] in recorded
+    assert all(os.path.exists(p) for p in recorded)
+    pd.testing.assert_frame_equal(read_output(hit["clean_path"]), read_output(first["clean_path"]))
+
+def test_changed_rules_miss_the_cache(tmp_path):
+    path, rules_path = _inputs(tmp_path)
+    data_dir = str(tmp_path / "data")
+    run_pipeline(path, rules_path=rules_path, data_dir=data_dir)
+    with open(rules_path, "w") as f:
+        yaml.safe_dump(dict(RULES, columns={"amount": {"min": 6}}), f)
+    changed = run_pipeline(path, rules_path=rules_path, data_dir=data_dir)
+    assert not changed["cache_hit"]
+    assert changed["clean_rows"] == 5
@@ -0,0 +1,28 @@
+# tests/test_run_history.py
+import json
+import os
+import sqlite3
+
+from src.pipeline.run_history import record_run, record_profile, get_report, query_runs
+
+REPORT = {"timestamp": "2024-05-01T10:00:00", "total_records": 10, "cleaned_records": 8,
+          "quarantined_records": 2, "pass_rate_pct": 80.0,
+          "columns": {"amount": {"count": 10, "nulls": 1, "digest": "x" * 1000}}}
+
+def test_column_profile_is_stored_once_and_reattached(tmp_path):
+    db = str(tmp_path / "history.sqlite")
+    record_run(db, REPORT, "report_r1.json", run_id="r1")
+    record_profile(db, "r1", "orders", REPORT["timestamp"], REPORT["columns"])
+
+    with sqlite3.connect(db) as conn:
+        stored = json.loads(conn.execute("SELECT report_json FROM runs WHERE run_id = 'r1'").fetchone()[0])
+    assert "columns" not in stored
+    assert get_report(db, "r1") == REPORT
+
+def test_history_is_recreated_after_the_file_is_removed(tmp_path):
+    db = str(tmp_path / "history.sqlite")
+    record_run(db, REPORT, "report_r1.json", run_id="r1")
+    os.remove(db)
+    record_run(db, REPORT, "report_r2.json", run_id="r2")
+    assert query_runs(db)["run_id"].tolist() == ["r2"]
+    assert get_report(db, "r2")["total_records"] == 10